@@ -0,0 +1,389 @@
+import re
+from bisect import bisect_right
+
+DEAD = -1  # Estado sumidero: no hay transición posible
+UNKNOWN = -2  # Transición aún no calculada (LazyDFA)
+ASCII_LIMIT = 0x80
+MAX_CODE = 0x10FFFF
+NO_CLASS = 0xFF  # Código de class_codes para caracteres fuera del alfabeto
+MAX_WIDE_CLASSES = 1 << 12  # Caracteres no ASCII que class_of recuerda
+
+
+class CompiledDFA:
+    """
+    Forma compilada de un AFD lista para escanear.
+
+    Los estados se renumeran a enteros 0..N-1 (el inicial siempre es 0) y las
+    transiciones se guardan en una tabla plana, una fila por estado y una
+    columna por clase de caracteres:
+    ``table[estado * num_classes + class_map[char]]`` devuelve el estado
+    destino o ``DEAD`` si no hay transición.
+
+    Cada clase es una tupla de intervalos (lo, hi) de code points, así que
+    una clase como [^\n] sobre todo Unicode ocupa dos pares y no un millón de
+    entradas. ``class_map`` es la fila rápida y sólo contiene los caracteres
+    ASCII; ``class_of`` resuelve el resto por bisección sobre los intervalos
+    ordenados y recuerda los últimos en una caché acotada (se vacía al
+    llenarse), así que un texto con muchos caracteres distintos no hace
+    crecer el autómata.
+
+    ``keywords`` es la tabla de palabras reservadas resueltas después del
+    match (ver lex_compiler.service.keyword_table): para un token del
+    autómata, el token que corresponde a cada lexema reservado. Los
+    escáneres la aplican al lexema reconocido.
+    """
+    def __init__(self, classes, table, accept, initial=0, keywords=None):
+        self.classes = [_class_members(members) for members in classes]
+        self.class_map = {}
+        spans = []
+        for k, members in enumerate(self.classes):
+            for item in members:
+                if isinstance(item, tuple):
+                    spans.append((item[0], item[1], k))
+                else:
+                    # Símbolo que no es un carácter (alfabetos abstractos)
+                    self.class_map[item] = k
+        spans.sort()
+        self._starts = [lo for lo, _, _ in spans]
+        self._ends = [hi for _, hi, _ in spans]
+        self._owners = [k for _, _, k in spans]
+        for lo, hi, k in spans:
+            for code in range(lo, min(hi, ASCII_LIMIT - 1) + 1):
+                self.class_map[chr(code)] = k
+        self.num_classes = len(self.classes)
+        self.table = table                    # lista plana de enteros
+        self.accept = accept                  # token por estado, o None
+        self.initial = initial
+        self.num_states = len(accept)
+        self.keywords = keywords or {}        # token → {lexema: token}
+        self._dispatch = None
+        self._codes = None
+        self._ascii_codes = None
+        self._byte_classes = None
+        self._runs = None
+        self._byte_runs = None
+        self._code_runs = None
+        self._wide = {}                       # caché de class_of fuera de ASCII
+
+    @classmethod
+    def from_dfa(cls, dfa):
+        """Compila un DFA basado en conjuntos de posiciones a su forma entera."""
+        # El estado inicial recibe el número 0, el resto en orden de descubrimiento
+        order = [dfa.initial_state]
+        numbering = {dfa.initial_state: 0}
+        for state in dfa.states:
+            if state not in numbering:
+                numbering[state] = len(order)
+                order.append(state)
+
+        if dfa.classes is not None:
+            # Alfabeto ya comprimido: la columna es el identificador de clase
+            classes = dfa.classes
+            column = {k: k for k in range(len(classes))}
+        else:
+            # Alfabeto de símbolos sueltos: una clase por símbolo
+            symbols = sorted(dfa.alphabet)
+            classes = [(s,) for s in symbols]
+            column = {s: i for i, s in enumerate(symbols)}
+        stride = len(classes)
+
+        table = [DEAD] * (len(order) * stride)
+        for (src, sym), dst in dfa.transitions.items():
+            table[numbering[src] * stride + column[sym]] = numbering[dst]
+
+        accept = [None] * len(order)
+        for state in dfa.accepting_states:
+            accept[numbering[state]] = dfa.state_tokens.get(state, "ACCEPT")
+
+        return cls(classes, table, accept)
+
+    def to_dict(self):
+        """Serializa las tablas a estructuras literales (listas, cadenas, enteros)."""
+        data = {
+            "classes": [[list(item) if isinstance(item, tuple) else item for item in members]
+                        for members in self.classes],
+            "table": self.table,
+            "accept": self.accept,
+            "initial": self.initial,
+        }
+        if self.keywords:
+            data["keywords"] = self.keywords
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruye el autómata a partir de lo producido por `to_dict`."""
+        return cls(data["classes"], list(data["table"]), list(data["accept"]), data["initial"],
+                   data.get("keywords"))
+
+    def class_of(self, char):
+        """
+        Clase (columna) de `char`, o None si no pertenece al alfabeto.
+
+        Es el camino lento de los escáneres: sólo se llama cuando `char` no
+        está en `class_map`. El resultado se recuerda en una caché aparte de
+        a lo sumo MAX_WIDE_CLASSES caracteres.
+        """
+        col = self.class_map.get(char)
+        if col is None and isinstance(char, str) and len(char) == 1:
+            col = self._wide.get(char)
+            if col is None:
+                col = _bisect_class(self, char, self._wide)
+        return col
+
+    def class_codes(self, text):
+        """
+        Clase de cada carácter de `text` como bytes (NO_CLASS fuera del
+        alfabeto), en una sola pasada en C, o None si el autómata tiene
+        demasiadas clases para caber en un byte.
+
+        Un texto ASCII se codifica y traduce con bytes.translate; si no, se
+        usa str.translate con una tabla que trae los caracteres ASCII y
+        resuelve (y memoriza) los demás con class_of la primera vez que
+        aparecen.
+        """
+        if self.num_classes >= NO_CLASS:
+            return None
+        if self._codes is None:
+            self._codes = _ClassCodes(self)
+            self._ascii_codes = bytes(
+                ord(self._codes[code]) if code < ASCII_LIMIT else NO_CLASS for code in range(256)
+            )
+        if text.isascii():
+            return text.encode('ascii').translate(self._ascii_codes)
+        return text.translate(self._codes).encode('latin-1')
+
+    def token_types(self):
+        """Tokens que puede producir el autómata (con las palabras reservadas), en orden de aparición."""
+        tokens = []
+        for token in self.accept:
+            if token is not None and token not in tokens:
+                tokens.append(token)
+        for table in self.keywords.values():
+            for token in table.values():
+                if token not in tokens:
+                    tokens.append(token)
+        return tokens
+
+    def dispatch_table(self):
+        """
+        Caracteres ASCII que son por sí solos un token completo, con su token.
+
+        Desde el estado inicial llevan a un estado de aceptación sin
+        transiciones vivas (como '(' o ';'): el token tiene exactamente un
+        carácter y el escáner lo emite sin recorrer el AFD.
+        """
+        if self._dispatch is None:
+            dispatch = {}
+            stride = self.num_classes
+            row = self.initial * stride
+            for code in range(ASCII_LIMIT):
+                char = chr(code)
+                col = self.class_map.get(char)
+                if col is None:
+                    continue
+                target = self.table[row + col]
+                token = self.accept[target] if target != DEAD else None
+                if token is None:
+                    continue
+                if all(t == DEAD for t in self.table[target * stride:(target + 1) * stride]):
+                    dispatch[char] = self.keywords.get(token, {}).get(char, token)
+            self._dispatch = dispatch
+        return self._dispatch
+
+    def first_classes(self):
+        """
+        Por clase, si puede iniciar un token: tiene transición viva desde el
+        estado inicial. Un carácter fuera de este conjunto sólo produce ERROR.
+        """
+        row = self.initial * self.num_classes
+        return [self.table[row + k] != DEAD for k in range(self.num_classes)]
+
+    def loop_classes(self, state):
+        """Clases con las que `state` vuelve a sí mismo (su lazo)."""
+        row = state * self.num_classes
+        return [k for k in range(self.num_classes) if self.table[row + k] == state]
+
+    def run_matchers(self):
+        """
+        Por estado, el método `match` de un patrón ``[lazo]*`` precompilado, o
+        None si el estado no tiene lazo sobre caracteres.
+
+        ``runs[state](text, i).end()`` salta de una vez (en C) la racha de
+        caracteres que dejan al AFD en `state`, como el cuerpo de un
+        identificador o de un comentario.
+        """
+        if self._runs is None:
+            runs = []
+            for state in range(self.num_states):
+                intervals = _merge_intervals(
+                    item for k in self.loop_classes(state)
+                    for item in self.classes[k] if isinstance(item, tuple)
+                )
+                pattern = ''.join(
+                    f'\\U{lo:08x}' if lo == hi else f'\\U{lo:08x}-\\U{hi:08x}'
+                    for lo, hi in intervals
+                )
+                runs.append(re.compile(f'[{pattern}]*').match if pattern else None)
+            self._runs = runs
+        return self._runs
+
+    def run_code_matchers(self):
+        """Como run_matchers, sobre los códigos de clase de class_codes()."""
+        if self._code_runs is None:
+            runs = []
+            for state in range(self.num_states):
+                loop = bytes(self.loop_classes(state))
+                runs.append(re.compile(b'[' + re.escape(loop) + b']*').match if loop else None)
+            self._code_runs = runs
+        return self._code_runs
+
+    def run_byte_matchers(self):
+        """Como run_matchers, sobre bytes y con las clases de byte_classes()."""
+        if self._byte_runs is None:
+            byte_class = self.byte_classes()
+            runs = []
+            for state in range(self.num_states):
+                loop = set(self.loop_classes(state))
+                pattern = b''.join(
+                    b'\\x%02x' % b for b, col in enumerate(byte_class) if col in loop
+                )
+                runs.append(re.compile(b'[' + pattern + b']*').match if pattern else None)
+            self._byte_runs = runs
+        return self._byte_runs
+
+    def byte_classes(self):
+        """
+        Tabla de 256 entradas byte → clase para escanear bytes sin decodificar.
+
+        Los bytes ASCII usan su propia clase. Los bytes >= 0x80 (secuencias
+        UTF-8 multibyte) no tienen clase si el alfabeto es ASCII; si todos los
+        code points no ASCII caen en una misma clase y repetirla equivale a
+        leerla una vez (p.ej. el cuerpo de [^\n]*), cada byte de la
+        secuencia se trata como esa clase. En otro caso el modo bytes no
+        puede reproducir el escaneo por caracteres y se lanza ValueError.
+        """
+        if self._byte_classes is None:
+            row = [self.class_map.get(chr(b)) for b in range(ASCII_LIMIT)]
+            high = self._non_ascii_class()
+            self._byte_classes = row + [high] * (256 - ASCII_LIMIT)
+        return self._byte_classes
+
+    def _non_ascii_class(self):
+        """Clase común a todos los code points >= 0x80 (o None si no hay ninguna)."""
+        # Los caracteres siempre están en los intervalos
+        spans = [
+            (lo, hi, k) for lo, hi, k in zip(self._starts, self._ends, self._owners)
+            if hi >= ASCII_LIMIT
+        ]
+        if not spans:
+            return None
+
+        owner = spans[0][2]
+        covered = ASCII_LIMIT
+        for lo, hi, k in spans:
+            if k != owner or lo > covered:
+                raise ValueError("El modo bytes requiere una sola clase para los caracteres no ASCII")
+            covered = hi + 1
+        if covered <= MAX_CODE:
+            raise ValueError("El modo bytes requiere una sola clase para los caracteres no ASCII")
+
+        # Un carácter de varios bytes recorre la clase varias veces: sólo es
+        # válido si δ(δ(q, c), c) = δ(q, c) para todo estado q
+        stride = self.num_classes
+        for state in range(self.num_states):
+            target = self.table[state * stride + owner]
+            if target != DEAD and self.table[target * stride + owner] != target:
+                raise ValueError("El modo bytes requiere que la clase no ASCII sea idempotente")
+        return owner
+
+    def step(self, state, char):
+        """Devuelve el estado destino desde `state` con `char`, o DEAD."""
+        col = self.class_of(char)
+        if col is None or state == DEAD:
+            return DEAD
+        return self.table[state * self.num_classes + col]
+
+    def accepts(self, string):
+        """
+        Verifica si la cadena completa es aceptada.
+        Retorna el token correspondiente si es aceptada, None en caso contrario.
+        """
+        table = self.table
+        stride = self.num_classes
+        class_of = self.class_map.get
+        state = self.initial
+        for char in string:
+            col = class_of(char)
+            if col is None:
+                col = self.class_of(char)
+                if col is None:
+                    return None
+            state = table[state * stride + col]
+            if state == DEAD:
+                return None
+        token = self.accept[state]
+        if token in self.keywords:
+            token = self.keywords[token].get(string, token)
+        return token
+
+
+def _merge_intervals(intervals):
+    """Une intervalos (lo, hi) que se solapan o son contiguos."""
+    merged = []
+    for lo, hi in sorted(intervals):
+        if merged and merged[-1][1] + 1 >= lo:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _class_members(members):
+    """
+    Normaliza los miembros de una clase: pares (lo, hi) como tuplas de enteros,
+    caracteres sueltos como intervalos de un solo code point y cualquier otro
+    símbolo tal cual.
+    """
+    result = []
+    for item in members:
+        if isinstance(item, str) and len(item) == 1:
+            result.append((ord(item), ord(item)))
+        elif isinstance(item, (tuple, list)):
+            result.append((item[0], item[1]))
+        else:
+            result.append(item)
+    return tuple(result)
+
+
+def _bisect_class(dfa, char, cache):
+    """
+    Clase de `char` buscada en los intervalos de `dfa` (o None), guardada en
+    `cache`, que se vacía al llegar a MAX_WIDE_CLASSES entradas.
+    """
+    code = ord(char)
+    i = bisect_right(dfa._starts, code) - 1
+    if i < 0 or code > dfa._ends[i]:
+        return None
+    if len(cache) >= MAX_WIDE_CLASSES:
+        cache.clear()
+    cache[char] = col = dfa._owners[i]
+    return col
+
+
+class _ClassCodes(dict):
+    """
+    Tabla de str.translate: code point → carácter con el código de su clase.
+
+    Sólo guarda los códigos ASCII; el resto se pide a class_of en cada
+    aparición, que ya recuerda los últimos en su caché acotada.
+    """
+    def __init__(self, dfa):
+        super().__init__()
+        self.dfa = dfa
+        for code in range(ASCII_LIMIT):
+            self[code] = self.__missing__(code)
+
+    def __missing__(self, code):
+        col = self.dfa.class_of(chr(code))
+        return chr(NO_CLASS if col is None else col)
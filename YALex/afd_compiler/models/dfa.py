@@ -1,32 +1,32 @@
 from graphviz import Digraph
+from chain_compiler.model.charset import describe
+from .compiled_dfa import CompiledDFA
 
 class DFA:
     """Clase que representa un Autómata Finito Determinista (AFD)."""
-    def __init__(self, states, alphabet, transitions, initial_state, accepting_states, state_tokens=None):
+    def __init__(self, states, alphabet, transitions, initial_state, accepting_states, state_tokens=None, classes=None):
         self.states = states
         self.alphabet = alphabet
         self.transitions = transitions
         self.initial_state = initial_state
         self.accepting_states = accepting_states
         self.state_tokens = state_tokens or {}  # Mapeo de estados a tokens
-        
+        # Si el alfabeto está comprimido, classes[k] son los intervalos (lo, hi) de la clase k
+        self.classes = classes
+        self._compiled = None
+
+    def compile(self):
+        """Devuelve (y memoriza) la forma compilada con estados enteros."""
+        if self._compiled is None:
+            self._compiled = CompiledDFA.from_dfa(self)
+        return self._compiled
+
     def accepts(self, string):
         """
         Verifica si la cadena es aceptada por el AFD.
         Retorna el token correspondiente si es aceptada, None en caso contrario.
         """
-        current = self.initial_state
-        for symbol in string:
-            if symbol not in self.alphabet:
-                return None
-            if (current, symbol) not in self.transitions:
-                return None
-            current = self.transitions[(current, symbol)]
-        
-        if current in self.accepting_states:
-            token = self.state_tokens.get(current, "ACCEPT")
-            return token
-        return None
+        return self.compile().accepts(string)
     
     def visualize(self, filename='dfa_graph'):
         """Genera una visualización del AFD usando Graphviz con manejo mejorado de caracteres especiales."""
@@ -65,7 +65,11 @@ class DFA:
         # Agregar aristas para las transiciones con manejo especial de caracteres
         for (src_name, dst_name), symbols in grouped_transitions.items():
             # Sanitizar y escapar caracteres especiales en los símbolos
-            safe_symbols = [self._escape_symbol(s) for s in symbols]
+            if self.classes is not None:
+                # Cada clase se muestra como un rango, p.ej. [a-z]
+                safe_symbols = [self._escape_label(describe(self.classes[k])) for k in symbols]
+            else:
+                safe_symbols = [self._escape_symbol(s) for s in symbols]
             edge_label = ','.join(sorted(safe_symbols))
             dot.edge(src_name, dst_name, edge_label)
         
@@ -0,0 +1,106 @@
+from ..utils.ast_functions import (
+    LEAF_TYPES,
+    traverse_tree,
+    calculate_node_functions,
+    calculate_followpos,
+    position_intervals,
+)
+
+
+class RuleFragment:
+    """
+    Tabla de posiciones de una sola regla, independiente del resto del lexer.
+
+    Las posiciones se numeran localmente 0..P-1 (de izquierda a derecha) y
+    sólo guardan datos literales: los intervalos de code points que las
+    activan, su followpos dentro de la regla, firstpos, lastpos y si la regla
+    es anulable. Al ensamblar el lexer (ver build_from_fragments) cada
+    fragmento se desplaza a su rango de posiciones globales y su lastpos se
+    enlaza con la posición END de la regla, así que el mismo fragmento sirve
+    para cualquier especificación que contenga el patrón.
+    """
+    def __init__(self, symbols, follow, first, last, nullable):
+        self.symbols = symbols      # intervalos (lo, hi) de cada posición
+        self.follow = follow        # followpos local de cada posición
+        self.first = first
+        self.last = last
+        self.nullable = nullable
+
+    @classmethod
+    def from_ast(cls, ast):
+        """Calcula el fragmento del AST de una regla (sin hoja END)."""
+        for node in traverse_tree(ast):
+            node.nullable = False
+            node.firstpos = set()
+            node.lastpos = set()
+        calculate_node_functions(ast)
+        followpos = calculate_followpos(ast)
+
+        positions = [
+            next(iter(node.firstpos)) for node in traverse_tree(ast) if node.type in LEAF_TYPES
+        ]
+        local = {pos: i for i, pos in enumerate(positions)}
+        return cls(
+            [tuple(position_intervals(pos)) for pos in positions],
+            [tuple(sorted(local[p] for p in followpos.get(pos, ()))) for pos in positions],
+            tuple(sorted(local[p] for p in ast.firstpos)),
+            tuple(sorted(local[p] for p in ast.lastpos)),
+            ast.nullable,
+        )
+
+    def literal(self):
+        """
+        Cadena que describe la regla si es un literal (una cadena fija, como
+        "while"), o None si la regla acepta otra cosa.
+        """
+        count = len(self.symbols)
+        if self.nullable or not count or self.first != (0,) or self.last != (count - 1,):
+            return None
+        chars = []
+        for i, symbol in enumerate(self.symbols):
+            if len(symbol) != 1 or symbol[0][0] != symbol[0][1]:
+                return None
+            if self.follow[i] != ((i + 1,) if i + 1 < count else ()):
+                return None
+            chars.append(chr(symbol[0][0]))
+        return "".join(chars)
+
+    def matches(self, word):
+        """Si la regla acepta `word` completa (simulación sobre las posiciones)."""
+        if not word:
+            return self.nullable
+        last = set(self.last)
+        current = self.first
+        for i, char in enumerate(word):
+            code = ord(char)
+            matched = [
+                pos for pos in current
+                if any(lo <= code <= hi for lo, hi in self.symbols[pos])
+            ]
+            if i == len(word) - 1:
+                return any(pos in last for pos in matched)
+            current = {target for pos in matched for target in self.follow[pos]}
+            if not current:
+                return False
+        return False
+
+    def to_dict(self):
+        """Serializa el fragmento a estructuras literales."""
+        return {
+            "symbols": [[list(interval) for interval in symbol] for symbol in self.symbols],
+            "follow": [list(targets) for targets in self.follow],
+            "first": list(self.first),
+            "last": list(self.last),
+            "nullable": self.nullable,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruye el fragmento a partir de lo producido por `to_dict`."""
+        return cls(
+            [tuple((lo, hi) for lo, hi in symbol) for symbol in data["symbols"]],
+            [tuple(targets) for targets in data["follow"]],
+            tuple(data["first"]),
+            tuple(data["last"]),
+            data["nullable"],
+        )
@@ -0,0 +1,207 @@
+
+from ..models.compiled_dfa import ASCII_LIMIT, DEAD, UNKNOWN, _bisect_class, _class_members
+DEFAULT_MAX_CACHED = 1 << 12
+
+
+class LazyDFA:
+    """
+    AFD perezoso: los estados se calculan la primera vez que el escáner los
+    alcanza, a partir de la tabla de posiciones de la construcción directa.
+
+    Cada estado es un bitset de posiciones; al pedir una transición sin
+    calcular se unen los followpos de las posiciones del estado que la clase
+    activa. Los estados descubiertos se numeran y sus transiciones se
+    guardan en una tabla plana como la de CompiledDFA, con UNKNOWN en las
+    celdas pendientes. La caché tiene como máximo `max_states` estados:
+    al llenarse se vacía entera (los ids anteriores dejan de valer) y se
+    sigue desde el estado destino, de modo que la memoria es proporcional a
+    los estados que la entrada visita y no a los del AFD completo, que en
+    patrones como (a|b)*a(a|b)(a|b)… crece exponencialmente.
+    """
+    def __init__(self, classes, start, follow, pos_classes, end_rule, token_names,
+                 max_states=DEFAULT_MAX_CACHED, keywords=None):
+        if max_states < 2:
+            raise ValueError("La caché del AFD perezoso necesita al menos dos estados")
+        self.classes = [_class_members(members) for members in classes]
+        self.class_map = {}
+        spans = sorted(
+            (lo, hi, k) for k, members in enumerate(self.classes) for lo, hi in members
+        )
+        self._starts = [lo for lo, _, _ in spans]
+        self._ends = [hi for _, hi, _ in spans]
+        self._owners = [k for _, _, k in spans]
+        for lo, hi, k in spans:
+            for code in range(lo, min(hi, ASCII_LIMIT - 1) + 1):
+                self.class_map[chr(code)] = k
+        self.num_classes = len(self.classes)
+        self._wide = {}                       # caché de class_of fuera de ASCII
+
+        self.start = start
+        self.follow = follow
+        self.pos_classes = pos_classes
+        self.end_rule = end_rule
+        self.token_names = list(token_names)
+        self.max_states = max_states
+        self.keywords = keywords or {}        # como en CompiledDFA
+        self.flushes = 0
+
+        # Posiciones que activa cada clase y posiciones marcador, como bitsets
+        self._activated = [0] * self.num_classes
+        self._markers = 0
+        for i, (ks, rule) in enumerate(zip(pos_classes, end_rule)):
+            for k in ks:
+                self._activated[k] |= 1 << i
+            if rule is not None:
+                self._markers |= 1 << i
+
+        self.table = []
+        self.accept = []
+        self._sets = []
+        self._ids = {}
+        self.initial = 0
+        self._reset()
+
+    @property
+    def num_states(self):
+        """Estados que hay ahora en la caché."""
+        return len(self._sets)
+
+    def _reset(self):
+        # Se vacían en su lugar: los escáneres guardan referencias a table y accept
+        self.table.clear()
+        self.accept.clear()
+        self._sets.clear()
+        self._ids.clear()
+        self._add(self.start)
+
+    def _add(self, bits):
+        state = len(self._sets)
+        self._ids[bits] = state
+        self._sets.append(bits)
+        self.table.extend([UNKNOWN] * self.num_classes)
+        # El marcador de menor posición es el de la regla de mayor prioridad
+        markers = bits & self._markers
+        if markers:
+            low = markers & -markers
+            self.accept.append(self.token_names[self.end_rule[low.bit_length() - 1]])
+        else:
+            self.accept.append(None)
+        return state
+
+    def next_state(self, state, col):
+        """
+        Calcula (y guarda) la transición de `state` con la clase `col`.
+
+        Si la caché se vacía para hacer lugar al destino, `state` deja de
+        ser válido; el estado devuelto sí lo es.
+        """
+        bits = self._sets[state] & self._activated[col]
+        target = 0
+        while bits:
+            low = bits & -bits
+            target |= self.follow[low.bit_length() - 1]
+            bits ^= low
+        if not target:
+            self.table[state * self.num_classes + col] = DEAD
+            return DEAD
+
+        result = self._ids.get(target)
+        if result is None:
+            if len(self._sets) >= self.max_states:
+                # Caché llena: se descarta entera y se sigue desde el destino
+                self.flushes += 1
+                self._reset()
+                result = self._ids.get(target)
+                return result if result is not None else self._add(target)
+            result = self._add(target)
+        self.table[state * self.num_classes + col] = result
+        return result
+
+    def class_of(self, char):
+        """Clase (columna) de `char`, o None si no pertenece al alfabeto."""
+        col = self.class_map.get(char)
+        if col is None and isinstance(char, str) and len(char) == 1:
+            col = self._wide.get(char)
+            if col is None:
+                col = _bisect_class(self, char, self._wide)
+        return col
+
+    def token_types(self):
+        """Tokens que puede producir el autómata, en orden de reglas."""
+        tokens = []
+        for token in self.token_names:
+            if token not in tokens:
+                tokens.append(token)
+        for table in self.keywords.values():
+            for token in table.values():
+                if token not in tokens:
+                    tokens.append(token)
+        return tokens
+
+    def first_classes(self):
+        """Por clase, si puede iniciar un token (ver CompiledDFA.first_classes)."""
+        return [bool(self.start & activated) for activated in self._activated]
+
+    def accepts(self, string):
+        """Token de la cadena completa si es aceptada, None en caso contrario."""
+        table = self.table
+        stride = self.num_classes
+        state = self.initial
+        for char in string:
+            col = self.class_of(char)
+            if col is None:
+                return None
+            target = table[state * stride + col]
+            if target == UNKNOWN:
+                target = self.next_state(state, col)
+            if target == DEAD:
+                return None
+            state = target
+        token = self.accept[state]
+        if token in self.keywords:
+            token = self.keywords[token].get(string, token)
+        return token
+
+    def to_dict(self):
+        """
+        Serializa la tabla de posiciones (no los estados de la caché). Los
+        bitsets van como listas de posiciones: un entero de miles de bits no
+        se puede escribir como literal decimal.
+        """
+        return {
+            "classes": [[list(item) for item in members] for members in self.classes],
+            "start": _positions(self.start),
+            "follow": [_positions(bits) for bits in self.follow],
+            "pos_classes": [list(ks) for ks in self.pos_classes],
+            "end_rule": list(self.end_rule),
+            "token_names": self.token_names,
+            "max_states": self.max_states,
+            "keywords": self.keywords,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruye el autómata a partir de lo producido por `to_dict`."""
+        return cls(
+            data["classes"], _bits(data["start"]), [_bits(ps) for ps in data["follow"]],
+            data["pos_classes"], data["end_rule"], data["token_names"], data["max_states"],
+            data.get("keywords"),
+        )
+
+
+def _positions(bits):
+    """Índices de los bits encendidos de `bits`."""
+    result = []
+    while bits:
+        low = bits & -bits
+        result.append(low.bit_length() - 1)
+        bits ^= low
+    return result
+
+
+def _bits(positions):
+    """Bitset con los índices de `positions`."""
+    bits = 0
+    for i in positions:
+        bits |= 1 << i
+    return bits
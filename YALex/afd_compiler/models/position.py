@@ -2,10 +2,12 @@ class Position:
     """Representa una posición en una hoja del árbol sintáctico."""
     _next_id = 1
 
-    def __init__(self, symbol):
+    def __init__(self, symbol, rule=None):
         self.id = Position._next_id
         Position._next_id += 1
         self.symbol = symbol
+        # Índice de regla si es la posición de una hoja END (fin de regla)
+        self.rule = rule
 
     def __eq__(self, other):
         return isinstance(other, Position) and self.id == other.id
@@ -14,6 +16,8 @@ class Position:
         return hash(self.id)
 
     def __repr__(self):
+        if self.rule is not None:
+            return f"Pos({self.id}:#{self.rule})"
         return f"Pos({self.id}:{self.symbol})"
 
     @classmethod
@@ -0,0 +1,70 @@
+from array import array
+from bisect import bisect_right
+
+
+class TokenStream:
+    """
+    Secuencia compacta de tokens sobre el texto escaneado.
+
+    En lugar de una tupla (token, lexema) por token se guardan tres arreglos
+    paralelos: el tipo como índice en `names` (``array('H')``) y los offsets
+    de inicio y fin en el texto (``array('I')``), unos 10 bytes por token. Los
+    lexemas sólo se extraen del texto cuando se piden.
+
+    La tabla de inicios de línea se calcula la primera vez que se consulta
+    una posición y permite obtener (línea, columna) por bisección.
+    """
+    def __init__(self, text, names, kinds=None, starts=None, ends=None):
+        self.text = text
+        self.names = list(names)              # nombre de cada tipo de token
+        self.kinds = kinds if kinds is not None else array('H')
+        self.starts = starts if starts is not None else array('I')
+        self.ends = ends if ends is not None else array('I')
+        self._line_starts = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        """Devuelve (token, lexema) del i-ésimo token."""
+        return self.names[self.kinds[i]], self.text[self.starts[i]:self.ends[i]]
+
+    def __iter__(self):
+        names, text = self.names, self.text
+        for kind, start, end in zip(self.kinds, self.starts, self.ends):
+            yield names[kind], text[start:end]
+
+    def kind(self, i):
+        """Nombre del tipo del i-ésimo token (sin extraer el lexema)."""
+        return self.names[self.kinds[i]]
+
+    def lexeme(self, i):
+        """Lexema del i-ésimo token, extraído del texto."""
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def span(self, i):
+        """Offsets (inicio, fin) del i-ésimo token."""
+        return self.starts[i], self.ends[i]
+
+    def line_starts(self):
+        """Offsets donde empieza cada línea del texto (el primero es 0)."""
+        if self._line_starts is None:
+            starts = array('I', [0])
+            text = self.text
+            find = text.find
+            i = find('\n')
+            while i != -1:
+                starts.append(i + 1)
+                i = find('\n', i + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def position(self, offset):
+        """(línea, columna), ambas desde 1, del offset dado."""
+        starts = self.line_starts()
+        line = bisect_right(starts, offset)
+        return line, offset - starts[line - 1] + 1
+
+    def location(self, i):
+        """(línea, columna) donde empieza el i-ésimo token."""
+        return self.position(self.starts[i])
@@ -1,30 +1,99 @@
-from afd_compiler.services.dfa_builder import build_direct_dfa 
+from afd_compiler.services.dfa_builder import (
+    build_direct_dfa, build_from_fragments, build_lazy_from_fragments, StateLimitError
+)
+from afd_compiler.models.lazy_dfa import DEFAULT_MAX_CACHED
+from chain_compiler.model.charset import describe
 from afd_compiler.tools.dfa_optimization import minimize_dfa
+from afd_compiler.services.batch_matcher import match_many
+from afd_compiler.services.parallel_scanner import scan_parallel
+from afd_compiler.services.scanner import scan_tokens, scan_offsets
+from afd_compiler.services.translated_scanner import scan_translated
+from afd_compiler.services.lazy_scanner import scan_lazy
+from afd_compiler.services.stream_scanner import iter_tokens, DEFAULT_CHUNK_SIZE
+from afd_compiler.services.byte_scanner import scan_spans, scan_file_spans
 
 class AFDService:
     def __init__(self):
         self.dfa = None
+        self._loaded = None     # CompiledDFA cargado sin el AFD de conjuntos
+        self.lazy = None        # LazyDFA si el AFD completo superó el límite
 
     def build_dfa_from_ast(self, ast, token_names):
         """
         Construye un AFD y lo almacena, usando token_names para poblar state_tokens.
         """
         self.dfa = build_direct_dfa(ast, token_names)
+        self._loaded = None
+        self.lazy = None
         return self.dfa
 
+    def build_dfa_from_fragments(self, fragments, token_names, max_states=None,
+                                 lazy_states=DEFAULT_MAX_CACHED):
+        """
+        Construye el AFD ensamblando los fragmentos por regla (RuleFragment).
+
+        Si el AFD completo tiene más de `max_states` estados se usa en su
+        lugar un LazyDFA con una caché de `lazy_states` estados (queda en
+        self.lazy y se devuelve ese).
+        """
+        self._loaded = None
+        self.lazy = None
+        try:
+            self.dfa = build_from_fragments(fragments, token_names, max_states)
+        except StateLimitError:
+            self.dfa = None
+            self.lazy = build_lazy_from_fragments(fragments, token_names, lazy_states)
+            return self.lazy
+        return self.dfa
+
+    def load_compiled(self, compiled):
+        """
+        Usa un AFD ya compilado (p.ej. leído de la caché) para escanear,
+        sin reconstruirlo desde el AST.
+        """
+        self.dfa = None
+        self._loaded = compiled
+        self.lazy = None
+        return compiled
+
     def minimize_dfa(self):
         if self.dfa is None:
             raise ValueError("DFA no ha sido construido")
         self.dfa = minimize_dfa(self.dfa)
         return self.dfa
 
-    def match(self, string):
+    def compiled(self):
         """
-        Verifica si una cadena es aceptada por el AFD.
+        Retorna la forma compilada (estados enteros + tabla plana) del AFD actual.
         """
         if self.dfa is None:
+            if self._loaded is not None:
+                return self._loaded
+            if self.lazy is not None:
+                raise ValueError("El AFD es perezoso: no tiene tablas completas")
             raise ValueError("DFA no ha sido construido")
-        return self.dfa.accepts(string)
+        return self.dfa.compile()
+
+    def match(self, string):
+        """
+        Verifica si una cadena es aceptada por el AFD.
+        """
+        if self.lazy is not None:
+            return self.lazy.accepts(string)
+        return self.compiled().accepts(string)
+
+    def match_many(self, strings, token_names=None):
+        """
+        Clasifica muchas cadenas completas a la vez (requiere NumPy).
+
+        Args:
+            strings (list[str]): cadenas a clasificar.
+            token_names (list[str], opcional): orden de los ids de token.
+
+        Returns:
+            numpy.ndarray: id de token por cadena (índice en token_names), -1 si no es aceptada.
+        """
+        return match_many(self.compiled(), strings, token_names)
 
     def get_dfa_info(self):
         """
@@ -33,58 +102,116 @@ class AFDService:
         if self.dfa is None:
             raise ValueError("DFA no ha sido construido")
 
+        classes = self.dfa.classes
+        if classes is not None:
+            # Con clases Unicode el alfabeto puede tener miles de caracteres:
+            # se reporta cada clase como rango
+            alphabet = [describe(members) for members in classes]
+        else:
+            alphabet = sorted(self.dfa.alphabet)
+
         return {
             "states_count": len(self.dfa.states),
-            "alphabet": sorted(list(self.dfa.alphabet)),
+            "alphabet": alphabet,
+            "classes_count": len(self.dfa.alphabet),
             "transitions_count": len(self.dfa.transitions),
             "accepting_states_count": len(self.dfa.accepting_states)
         }
 
-    def scan_input(self, input_str):
+    def scan_input(self, input_str, skip=frozenset(), coalesce_errors=False, max_errors=None):
         """
         Escanea una cadena de entrada utilizando el DFA para extraer tokens junto con su lexema.
 
         Args:
             input_str (str): Cadena de entrada a analizar.
+            skip (set[str]): tipos de token a descartar dentro del escaneo.
+            coalesce_errors (bool): una racha de caracteres sin token da un solo ERROR.
+            max_errors (int, opcional): número de ERROR que aborta con LexerError.
 
         Returns:
             list of tuple: Lista de tuplas (token_type, lexeme).
         """
-        tokens = []
-        index = 0
-        while index < len(input_str):
-            # Si llegamos al SENTINEL ('\x00'), terminamos sin generar ERROR
-            if input_str[index] == '\x00':
-                break
-
-            current_state = self.dfa.initial_state
-            last_accepting_index = -1
-            last_accepting_token = None
-            i = index
-
-            # Avanzamos por el DFA mientras haya transiciones
-            while i < len(input_str):
-                char = input_str[i]
-                # Si el carácter no pertenece al alfabeto, salimos del DFA
-                if char not in self.dfa.alphabet:
-                    break
-                key = (current_state, char)
-                if key not in self.dfa.transitions:
-                    break
-                current_state = self.dfa.transitions[key]
-                if current_state in self.dfa.accepting_states:
-                    last_accepting_index = i
-                    last_accepting_token = self.dfa.state_tokens.get(current_state, "ACCEPT")
-                i += 1
-
-            if last_accepting_index >= index:
-                # Reconocimos un token válido
-                lexeme = input_str[index:last_accepting_index+1]
-                tokens.append((last_accepting_token, lexeme))
-                index = last_accepting_index + 1
-            else:
-                # Ningún estado aceptó → ERROR sobre este carácter
-                tokens.append(("ERROR", input_str[index]))
-                index += 1
-
-        return tokens
+        if self.lazy is not None:
+            return list(scan_lazy(self.lazy, input_str, None, skip, coalesce_errors, max_errors))
+        return scan_tokens(self.compiled(), input_str, skip, coalesce_errors, max_errors)
+
+    def scan_translated(self, input_str, skip=frozenset(), coalesce_errors=False, max_errors=None):
+        """
+        Como scan_input, traduciendo antes toda la cadena a códigos de clase
+        (un byte por carácter) para que el ciclo no busque cada carácter.
+
+        Returns:
+            list of tuple: Lista de tuplas (token_type, lexeme).
+        """
+        if self.lazy is not None:
+            return list(scan_lazy(self.lazy, input_str, None, skip, coalesce_errors, max_errors))
+        return scan_translated(self.compiled(), input_str, skip, coalesce_errors, max_errors)
+
+    def scan_offsets(self, input_str, token_names=None, skip=frozenset(), coalesce_errors=False,
+                     max_errors=None):
+        """
+        Escanea una cadena y devuelve un TokenStream compacto.
+
+        Args:
+            input_str (str): Cadena de entrada a analizar.
+            token_names (list[str], opcional): orden de los ids de token.
+            skip (set[str]): tipos de token que no se guardan.
+            coalesce_errors, max_errors: como en scan_input.
+
+        Returns:
+            TokenStream: tipos y offsets en arreglos; lexemas bajo demanda.
+        """
+        if self.lazy is not None:
+            return scan_lazy(self.lazy, input_str, token_names, skip, coalesce_errors, max_errors)
+        return scan_offsets(self.compiled(), input_str, token_names, skip, coalesce_errors, max_errors)
+
+    def scan_parallel(self, input_str, token_names=None, skip=frozenset(), workers=None):
+        """
+        Escanea una cadena grande repartiéndola entre procesos.
+
+        Args:
+            input_str (str): Cadena de entrada a analizar.
+            token_names (list[str], opcional): orden de los ids de token.
+            skip (set[str]): tipos de token que no se guardan.
+            workers (int, opcional): procesos; por defecto, uno por CPU.
+
+        Returns:
+            TokenStream: igual que scan_offsets.
+        """
+        return scan_parallel(self.compiled(), input_str, token_names, skip, workers)
+
+    def scan_stream(self, stream, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8', skip=frozenset(),
+                    coalesce_errors=False, max_errors=None):
+        """
+        Escanea un archivo (texto o binario) por bloques sin cargarlo completo.
+
+        Args:
+            stream: objeto con read(n), p.ej. el resultado de open().
+            chunk_size (int): tamaño de cada lectura.
+            encoding (str): codificación para flujos binarios.
+            skip (set[str]): tipos de token que no se producen.
+            coalesce_errors, max_errors: como en scan_input.
+
+        Returns:
+            generator: produce tuplas (token_type, lexeme) a medida que se completan.
+        """
+        return iter_tokens(self.compiled(), stream, chunk_size, encoding, skip,
+                           coalesce_errors, max_errors)
+
+    def scan_bytes(self, data, skip=frozenset(), coalesce_errors=False, max_errors=None):
+        """
+        Escanea un buffer de bytes (bytes, mmap, memoryview) sin decodificarlo.
+
+        Returns:
+            list of tuple: Lista de tuplas (token_type, start, end) en bytes.
+        """
+        return scan_spans(self.compiled(), data, skip, coalesce_errors, max_errors)
+
+    def scan_file(self, path, skip=frozenset(), coalesce_errors=False, max_errors=None):
+        """
+        Escanea un archivo ASCII/UTF-8 mapeándolo en memoria, sin decodificarlo.
+
+        Returns:
+            list of tuple: Lista de tuplas (token_type, start, end) en bytes.
+        """
+        return scan_file_spans(self.compiled(), path, skip, coalesce_errors, max_errors)
@@ -0,0 +1,153 @@
+"""
+Clasificación en lote de cadenas completas con NumPy.
+
+`CompiledDFA.accepts` recorre una cadena por vez en Python; con millones de
+cadenas cortas el costo está en el intérprete, no en el autómata. Aquí todas
+las cadenas avanzan juntas por la tabla de transiciones: se codifican a una
+matriz de clases (una fila por cadena, rellenada hasta la más larga del
+bloque) y cada paso es una sola indexación vectorizada sobre una columna.
+
+NumPy es opcional: el resto de YALex (y los lexers generados) no lo
+necesitan. Sin NumPy, `match_many` lanza ImportError.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from ..models.compiled_dfa import ASCII_LIMIT, DEAD
+from .scanner import _kind_names
+
+# Filas por bloque: cada bloque se rellena sólo hasta su cadena más larga
+DEFAULT_BLOCK_ROWS = 1 << 16
+# Celdas (filas x columnas) máximas de la matriz de un bloque
+MAX_BLOCK_CELLS = 1 << 24
+
+
+def kind_names(dfa, token_names=None):
+    """
+    Nombres de los ids que devuelve `match_many`: `token_names` (o el orden de
+    aparición en el autómata) más los tokens del autómata que no estén ahí.
+    """
+    names = _kind_names(dfa, token_names)
+    # Los escáneres agregan "ERROR" al final; match_many no produce errores
+    if "ERROR" not in (token_names or ()) and "ERROR" not in dfa.token_types():
+        names.pop()
+    return names
+
+
+def _extended_table(dfa):
+    """
+    Tabla (estados + 1) x (clases + 2) para avanzar todas las filas a la vez.
+
+    La fila extra es un sumidero que reemplaza a DEAD. La columna `pad`
+    (identidad) deja cada estado como está y sirve de relleno al final de las
+    cadenas cortas; la columna `reject`, para caracteres fuera del alfabeto,
+    lleva siempre al sumidero.
+    """
+    states, classes = dfa.num_states, dfa.num_classes
+    sink, pad, reject = states, classes, classes + 1
+    table = np.array(dfa.table, dtype=np.int32).reshape(states, classes)
+    table[table == DEAD] = sink
+
+    extended = np.empty((states + 1, classes + 2), dtype=np.int32)
+    extended[:states, :classes] = table
+    extended[:, pad] = np.arange(states + 1, dtype=np.int32)
+    extended[:, reject] = sink
+    extended[sink, :] = sink
+    return extended, pad, reject
+
+
+def _class_codes(dfa, text, reject):
+    """Clase de cada carácter de `text`: fila ASCII y bisección para el resto."""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    ascii_row = np.array(
+        [dfa.class_map.get(chr(code), reject) for code in range(ASCII_LIMIT)] + [reject],
+        dtype=np.int32,
+    )
+    classes = ascii_row[np.minimum(codes, ASCII_LIMIT)]
+
+    wide = np.flatnonzero(codes >= ASCII_LIMIT)
+    if len(wide):
+        starts = np.array(dfa._starts, dtype=np.int64)
+        ends = np.array(dfa._ends, dtype=np.int64)
+        owners = np.array(dfa._owners, dtype=np.int32)
+        high = codes[wide]
+        i = np.searchsorted(starts, high, side='right') - 1
+        inside = (i >= 0) & (high <= ends[i])
+        classes[wide] = np.where(inside, owners[i], reject)
+    return classes
+
+
+def match_many(dfa, strings, token_names=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Clasifica cada cadena completa como `CompiledDFA.accepts`, en lote.
+
+    Las cadenas se ordenan por longitud y se procesan en bloques de hasta
+    `block_rows` filas (y MAX_BLOCK_CELLS celdas), de modo que una cadena muy
+    larga no obliga a rellenar todas las demás hasta su tamaño.
+
+    Args:
+        dfa (CompiledDFA): autómata compilado.
+        strings (list[str]): cadenas a clasificar.
+        token_names (list[str], opcional): orden de los ids (ver kind_names).
+        block_rows (int): filas por bloque.
+
+    Returns:
+        numpy.ndarray: id de token (int32) por cadena, índice en
+        kind_names(dfa, token_names); -1 si la cadena no es aceptada.
+    """
+    if np is None:
+        raise ImportError("match_many requiere NumPy")
+
+    names = kind_names(dfa, token_names)
+    kind_of = {name: k for k, name in enumerate(names)}
+    accept = np.array(
+        [kind_of[token] if token is not None else -1 for token in dfa.accept] + [-1],
+        dtype=np.int32,
+    )
+    table, pad, reject = _extended_table(dfa)
+    stride = table.shape[1]
+    flat = table.ravel()
+
+    strings = list(strings)
+    count = len(strings)
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=count)
+    offsets = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    # Todas las cadenas en un solo texto → una clase por carácter
+    codes = _class_codes(dfa, ''.join(strings), reject)
+    kinds = np.empty(count, dtype=np.int32)
+
+    # Con longitudes de 16 bits el orden estable es un radix sort
+    keys = lengths.astype(np.uint16) if count and lengths.max() < 1 << 16 else lengths
+    order = np.argsort(keys, kind='stable')
+    begin = 0
+    while begin < count:
+        end = min(begin + block_rows, count)
+        while end - begin > 1 and (end - begin) * lengths[order[end - 1]] > MAX_BLOCK_CELLS:
+            end = begin + (end - begin) // 2
+        rows = order[begin:end]
+        block_lengths = lengths[rows]
+        width = int(block_lengths[-1])
+
+        # Matriz columna x fila; tras el final de cada cadena, la columna
+        # identidad
+        steps = np.arange(width)[:, None]
+        inside = steps < block_lengths
+        matrix = np.full((width, len(rows)), pad, dtype=np.int32)
+        matrix[inside] = codes[(offsets[rows] + steps)[inside]]
+
+        state = np.full(len(rows), dfa.initial, dtype=np.int32)
+        for column in matrix:
+            state = flat[state * stride + column]
+        kinds[rows] = accept[state]
+        begin = end
+
+    # Palabras reservadas fuera del autómata: se resuelven por cadena
+    for token, table in dfa.keywords.items():
+        kind = kind_of[token]
+        for row in np.flatnonzero(kinds == kind):
+            kinds[row] = kind_of[table.get(strings[row], token)]
+    return kinds
@@ -0,0 +1,94 @@
+"""
+Escáneres sobre bytes ASCII/UTF-8 sin decodificar (buffers y archivos
+mapeados en memoria); devuelven sólo los rangos de cada token.
+"""
+
+import mmap
+import os
+
+from .scanner import LexerError, _Munch, _munch_spans
+
+
+def _utf8_error_end(view, index, n):
+    """Fin del ERROR sobre el carácter completo (byte inicial + continuaciones)."""
+    end = index + 1
+    if view[index] >= 0xC0:
+        while end < n and 0x80 <= view[end] < 0xC0:
+            end += 1
+    return end
+
+
+def scan_spans(dfa, data, skip=frozenset(), coalesce_errors=False, max_errors=None):
+    """
+    Escanea bytes sin decodificarlos y devuelve sólo los rangos de cada token.
+
+    Acepta cualquier objeto con protocolo de buffer (bytes, bytearray, mmap,
+    memoryview), así que un archivo mapeado en memoria se recorre sin copiarlo
+    ni convertirlo a str. Las secuencias UTF-8 fuera del alfabeto generan un
+    único ERROR que abarca el carácter completo.
+
+    Args:
+        dfa (CompiledDFA): autómata compilado con alfabeto ASCII, o cuyos
+            caracteres no ASCII forman una sola clase (ver byte_classes).
+        data: buffer de bytes codificado en ASCII/UTF-8.
+        skip (set[str]): tipos de token que no se incluyen.
+        coalesce_errors (bool): una racha de bytes sin token produce un único
+            ERROR, que termina siempre en el límite de un carácter.
+        max_errors (int, opcional): al producirse este número de ERROR se
+            lanza LexerError.
+
+    Returns:
+        list of tuple: Lista de tuplas (token_type, start, end) con offsets en bytes.
+    """
+    byte_class = dfa.byte_classes()
+    # Palabras reservadas con el lexema en bytes, como se leen del buffer
+    keywords = {
+        token: {word.encode('utf-8'): keyword for word, keyword in table.items()}
+        for token, table in dfa.keywords.items()
+    }
+    munch = _Munch(
+        dfa.table, dfa.num_classes, dfa.num_states, dfa.initial, dfa.accept,
+        byte_class.__getitem__, runs=dfa.run_byte_matchers(), keywords=keywords,
+    )
+
+    next_start = None
+    if coalesce_errors:
+        # Bytes que pueden iniciar un token; nunca una continuación UTF-8
+        first = dfa.first_classes()
+        byte_first = [
+            not 0x80 <= b < 0xC0 and col is not None and first[col]
+            for b, col in enumerate(byte_class)
+        ]
+
+        def next_start(view, i, n):
+            while i < n and view[i] != 0 and not byte_first[view[i]]:
+                i += 1
+            return i
+
+    spans = []
+    append = spans.append
+    # Vista de sólo lectura: sus cortes se pueden buscar en `keywords`
+    with memoryview(data) as raw, raw.toreadonly() as frozen, frozen.cast('B') as view:
+        try:
+            for span in _munch_spans(munch, view, len(view), "ERROR", 0, skip,
+                                     coalesce_errors, max_errors, next_start, _utf8_error_end):
+                append(span)
+        except LexerError as exc:
+            exc.tokens = spans
+            raise
+    return spans
+
+
+def scan_file_spans(dfa, path, skip=frozenset(), coalesce_errors=False, max_errors=None):
+    """
+    Escanea un archivo ASCII/UTF-8 mapeándolo en memoria con `scan_spans`.
+
+    El archivo nunca se decodifica a str: el sistema operativo pagina los
+    datos según se recorren. Para obtener un lexema basta con decodificar
+    el rango correspondiente del archivo.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return scan_spans(dfa, mapped, skip, coalesce_errors, max_errors)
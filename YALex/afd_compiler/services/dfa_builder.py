@@ -1,22 +1,42 @@
 from chain_compiler.model.ast_node import ASTNode
 from ..models.position import Position
 from ..models.dfa import DFA
+from ..models.lazy_dfa import LazyDFA, DEFAULT_MAX_CACHED
+from ..tools.char_classes import compute_char_classes
 from ..utils.ast_functions import (
-    traverse_tree, 
-    calculate_node_functions, 
-    calculate_followpos, 
-    get_alphabet
+    LEAF_TYPES,
+    traverse_tree,
+    calculate_node_functions,
+    calculate_followpos
 )
 
-def build_direct_dfa(ast, token_names):
+class StateLimitError(ValueError):
+    """La construcción por subconjuntos superó el límite de estados."""
+    def __init__(self, limit):
+        super().__init__(f"El AFD supera el límite de {limit} estados")
+        self.limit = limit
+
+
+def build_direct_dfa(ast, token_names, mode='bitset'):
     """
-    Construye un DFA a partir del AST de la super-regex con marcadores únicos.
+    Construye un DFA a partir del AST de las reglas con marcadores únicos.
     Args:
-        ast (ASTNode): AST que ya incluye, tras cada alternativa, un carácter chr(1),chr(2),…
+        ast (ASTNode): AST que incluye, tras cada alternativa, una hoja END con
+            el índice de la regla (ver generate_rules_ast). Se aceptan también
+            ASTs de una super-regex con los caracteres chr(1),chr(2),… como
+            marcadores.
         token_names (list[str]): nombres de token en el mismo orden de las alternativas
+        mode (str): 'bitset' (por defecto) numera las posiciones 0..P-1 y
+            representa cada estado como un entero con un bit por posición;
+            'sets' conserva los estados como frozensets de Position, más
+            lentos pero legibles al depurar.
     Returns:
-        DFA: autómata con state_tokens bien mapeado
+        DFA: autómata con state_tokens bien mapeado; su alfabeto son los
+        identificadores de las clases de equivalencia de caracteres.
     """
+    if mode not in ('bitset', 'sets'):
+        raise ValueError(f"Modo de construcción desconocido: {mode}")
+
     # 1) Reiniciar contador de posiciones
     Position.reset_counter()
 
@@ -30,10 +50,208 @@ def build_direct_dfa(ast, token_names):
     calculate_node_functions(ast)
     followpos = calculate_followpos(ast)
 
-    # 4) Construir alfabeto real (excluyendo códigos de control < chr(32))
-    alphabet = set(get_alphabet(ast))
+    # 4) Alfabeto comprimido: clases de caracteres que se comportan igual
+    positions = [
+        next(iter(node.firstpos)) for node in traverse_tree(ast) if node.type in LEAF_TYPES
+    ]
+    classes, _, activates = compute_char_classes(positions, ast.firstpos, followpos)
+
+    # 5) Preparar mapa de “marcador → índice de token”: las hojas END llevan
+    #    el índice de su regla fuera del alfabeto
+    marker_map = {pos: pos.rule for pos in positions if pos.rule is not None}
+    if not marker_map:
+        # Super-regex antigua: el marcador de la regla i es el carácter chr(i+1)
+        marker_chars = {chr(i+1): i for i in range(len(token_names))}
+        marker_map = {
+            pos: marker_chars[pos.symbol] for pos in ast.lastpos if pos.symbol in marker_chars
+        }
+
+    if mode == 'sets':
+        return _build_with_sets(
+            ast, followpos, activates, marker_map, classes, token_names
+        )
+
+    return _build_with_bits(
+        positions, ast.firstpos, followpos, activates, marker_map, classes, token_names
+    )
+
+
+def build_from_fragments(fragments, token_names, max_states=None):
+    """
+    Construye el DFA del lexer ensamblando los fragmentos de sus reglas.
+
+    Equivale a build_direct_dfa sobre el AST de generate_rules_ast, pero sin
+    volver a analizar ni recorrer los patrones: cada RuleFragment (que puede
+    venir de una caché) se copia a su rango de posiciones globales y su
+    lastpos se enlaza con la posición END de la regla. Sólo las clases de
+    caracteres y la construcción por subconjuntos se calculan de nuevo.
+
+    Args:
+        fragments (list[RuleFragment]): un fragmento por regla, en orden de prioridad.
+        token_names (list[str]): nombre de token de cada regla.
+        max_states (int, opcional): si el AFD tiene más estados, se lanza
+            StateLimitError (ver build_lazy_from_fragments).
+    Returns:
+        DFA: el mismo autómata que build_direct_dfa(generate_rules_ast(...)).
+    """
+    classes, start, follow, pos_classes, end_rule = _fragment_table(fragments)
+    return subset_construction(
+        start, follow, pos_classes, end_rule, classes, token_names, max_states
+    )
+
+
+def build_lazy_from_fragments(fragments, token_names, max_states=DEFAULT_MAX_CACHED):
+    """
+    Como build_from_fragments, pero sin construir ningún estado por
+    adelantado: devuelve un LazyDFA que los calcula durante el escaneo y
+    guarda como máximo `max_states` a la vez.
+    """
+    classes, start, follow, pos_classes, end_rule = _fragment_table(fragments)
+    return LazyDFA(classes, start, follow, pos_classes, end_rule, token_names, max_states)
+
+
+def _fragment_table(fragments):
+    """Clases de caracteres y tabla de posiciones (ver _position_table) de los fragmentos."""
+    Position.reset_counter()
+    positions = []
+    initial = set()
+    followpos = {}
+    for rule, fragment in enumerate(fragments):
+        local = [Position(symbol) for symbol in fragment.symbols]
+        end = Position(None, rule=rule)
+        for pos, targets in zip(local, fragment.follow):
+            if targets:
+                followpos[pos] = {local[j] for j in targets}
+        for i in fragment.last:
+            followpos.setdefault(local[i], set()).add(end)
+        initial.update(local[i] for i in fragment.first)
+        if fragment.nullable:
+            initial.add(end)
+        positions += local
+        positions.append(end)
+
+    classes, _, activates = compute_char_classes(positions, initial, followpos)
+    marker_map = {pos: pos.rule for pos in positions if pos.rule is not None}
+    return (classes, *_position_table(positions, initial, followpos, activates, marker_map))
+
+
+def _build_with_bits(positions, initial, followpos, activates, marker_map, classes, token_names):
+    """Construcción por subconjuntos sobre la tabla de posiciones."""
+    return subset_construction(
+        *_position_table(positions, initial, followpos, activates, marker_map),
+        classes, token_names
+    )
+
+
+def _position_table(positions, initial, followpos, activates, marker_map):
+    """
+    Tabla de posiciones: ids enteros 0..P-1, followpos como bitsets y cada
+    posición asignada de antemano a las clases que la activan.
 
-    # 5) Estado inicial
+    Returns:
+        tuple: (start, follow, pos_classes, end_rule), como los recibe
+        subset_construction.
+    """
+    size = len(positions)
+    follow = [0] * size
+    pos_classes = [()] * size
+    end_rule = [None] * size
+    for pos in positions:
+        i = pos.id - 1
+        follow[i] = _to_bits(followpos.get(pos, ()))
+        pos_classes[i] = activates[pos]
+        end_rule[i] = marker_map.get(pos)
+    return _to_bits(initial), follow, pos_classes, end_rule
+
+
+def _to_bits(position_set):
+    """Convierte un conjunto de Position en un bitset (bit i = posición i+1)."""
+    bits = 0
+    for pos in position_set:
+        bits |= 1 << (pos.id - 1)
+    return bits
+
+
+def subset_construction(start, follow, pos_classes, end_rule, classes, token_names,
+                        max_states=None):
+    """
+    Construcción de subconjuntos con estados representados como bitsets.
+
+    Args:
+        start (int): bitset de firstpos de la raíz (estado inicial).
+        follow (list[int]): followpos de cada posición, como bitset.
+        pos_classes (list[list[int]]): clases que activan cada posición.
+        end_rule (list): índice de regla si la posición es un marcador de fin.
+        classes (list[str]): caracteres de cada clase.
+        token_names (list[str]): nombre de token de cada regla.
+        max_states (int, opcional): límite de estados; al superarlo se lanza
+            StateLimitError.
+    Returns:
+        DFA: autómata cuyos estados son enteros 0..N-1 (el inicial es 0), en
+        orden de descubrimiento.
+    """
+    # Bitset de todas las posiciones marcador, para detectar aceptación
+    marker_bits = 0
+    for i, rule in enumerate(end_rule):
+        if rule is not None:
+            marker_bits |= 1 << i
+
+    # Cada bitset recibe un id pequeño al descubrirse: los bitsets de una
+    # especificación grande tienen miles de bits y hashearlos (en cada
+    # búsqueda de la minimización) costaría O(posiciones) por consulta
+    ids = {start: 0}
+    unmarked = [(start, 0)]
+    transitions = {}
+    accepting_states = set()
+    state_tokens = {}
+
+    while unmarked:
+        T, t = unmarked.pop()
+
+        # ¿es estado de aceptación? elegimos el token de menor índice
+        inter = T & marker_bits
+        if inter:
+            accepting_states.add(t)
+            rules = []
+            while inter:
+                low = inter & -inter
+                rules.append(end_rule[low.bit_length() - 1])
+                inter ^= low
+            state_tokens[t] = token_names[min(rules)]
+
+        # Cada posición de T aporta su followpos a las clases que la activan:
+        # el costo depende de |T|, no del tamaño del alfabeto
+        targets = {}
+        bits = T
+        while bits:
+            low = bits & -bits
+            i = low.bit_length() - 1
+            bits ^= low
+            f = follow[i]
+            if f:
+                for k in pos_classes[i]:
+                    targets[k] = targets.get(k, 0) | f
+
+        for k, U in targets.items():
+            u = ids.get(U)
+            if u is None:
+                u = ids[U] = len(ids)
+                if max_states is not None and u >= max_states:
+                    raise StateLimitError(max_states)
+                unmarked.append((U, u))
+            transitions[(t, k)] = u
+
+    states = set(range(len(ids)))
+    alphabet = set(range(len(classes)))
+    return DFA(states, alphabet, transitions, 0, accepting_states, state_tokens, classes)
+
+
+def _build_with_sets(ast, followpos, activates, marker_map, classes, token_names):
+    """Construcción original con estados como frozensets de Position."""
+    alphabet = set(range(len(classes)))
+    marker_positions = set(marker_map)
+
+    # Estado inicial
     initial_state = frozenset(ast.firstpos)
     states = {initial_state}
     unmarked = [initial_state]
@@ -41,12 +259,7 @@ def build_direct_dfa(ast, token_names):
     accepting_states = set()
     state_tokens = {}
 
-    # 6) Preparar mapa de “marcador → índice de token”
-    marker_chars = [chr(i+1) for i in range(len(token_names))]
-    marker_positions = {pos for pos in ast.lastpos if pos.symbol in marker_chars}
-    marker_map = {pos: marker_chars.index(pos.symbol) for pos in marker_positions}
-
-    # 7) Construcción del DFA (algoritmo de estado-estado)
+    # Construcción del DFA (algoritmo de estado-estado)
     while unmarked:
         T = unmarked.pop()
         # ¿es estado de aceptación?
@@ -57,19 +270,19 @@ def build_direct_dfa(ast, token_names):
             idx = min(marker_map[p] for p in inter)
             state_tokens[T] = token_names[idx]
 
-        # transiciones para cada símbolo real
-        for a in alphabet:
-            U = set()
-            for p in T:
-                if p.symbol == a:
-                    U.update(followpos.get(p, set()))
+        # transiciones: cada posición aporta su followpos a las clases que activa
+        targets = {}
+        for p in T:
+            for k in activates[p]:
+                targets.setdefault(k, set()).update(followpos.get(p, set()))
+        for k, U in targets.items():
             if U:
                 U_frozen = frozenset(U)
-                transitions[(T, a)] = U_frozen
+                transitions[(T, k)] = U_frozen
                 if U_frozen not in states:
                     states.add(U_frozen)
                     unmarked.append(U_frozen)
 
-    # 8) Devolver DFA con su mapeo de estados aceptantes a tokens
-    dfa = DFA(states, alphabet, transitions, initial_state, accepting_states, state_tokens)
+    # Devolver DFA con su mapeo de estados aceptantes a tokens
+    dfa = DFA(states, alphabet, transitions, initial_state, accepting_states, state_tokens, classes)
     return dfa
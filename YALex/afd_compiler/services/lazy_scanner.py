@@ -0,0 +1,45 @@
+"""
+Escáner sobre un LazyDFA, cuyos estados se calculan durante el escaneo.
+
+No lleva la memoria de Reps (ver scanner): al vaciarse la caché de estados
+los ids cambian y los pares anotados dejarían de significar lo mismo.
+"""
+
+from ..models.token_stream import TokenStream
+from .scanner import SENTINEL, LexerError, _Munch, _kind_names, _munch_spans, _text_starts
+
+
+def scan_lazy(dfa, text, token_names=None, skip=frozenset(), coalesce_errors=False,
+              max_errors=None):
+    """
+    Escanea `text` como `scan_offsets` sobre un LazyDFA: las transiciones
+    que faltan se calculan (y quedan en la caché) al alcanzarlas.
+
+    Returns:
+        TokenStream: los mismos tokens que scan_offsets sobre el AFD completo.
+    """
+    names = _kind_names(dfa, token_names)
+    kind_of = {name: k for k, name in enumerate(names)}
+    munch = _Munch(
+        dfa.table, dfa.num_classes, dfa.num_states, dfa.initial, dfa.accept,
+        dfa.class_map.get, dfa.class_of, keywords=dfa.keywords, next_state=dfa.next_state,
+        memo=False,
+    )
+    spans = _munch_spans(
+        munch, text, len(text), "ERROR", SENTINEL, skip, coalesce_errors, max_errors,
+        _text_starts(dfa) if coalesce_errors else None,
+    )
+
+    stream = TokenStream(text, names)
+    kinds = stream.kinds.append
+    starts = stream.starts.append
+    ends = stream.ends.append
+    try:
+        for token, start, end in spans:
+            kinds(kind_of[token])
+            starts(start)
+            ends(end)
+    except LexerError as exc:
+        exc.tokens = stream
+        raise
+    return stream
@@ -0,0 +1,131 @@
+"""
+Escaneo en paralelo de textos grandes.
+
+El texto se parte en trozos que se escanean en un ProcessPoolExecutor, cada
+uno como si empezara un token en su primer carácter. Los resultados se
+empalman en el proceso principal:
+
+* cada trozo descarta su cola incierta: desde el primer token cuyo recorrido
+  del AFD llegó vivo al final del trozo (con más texto podría ser otro);
+* en cada costura el proceso principal vuelve a escanear desde el final del
+  último token seguro del trozo anterior hasta caer en un inicio de token que
+  el trozo siguiente también encontró. Desde ahí los dos escaneos coinciden
+  (el escaneo sólo depende del texto a partir de esa posición) y se copian
+  los tokens del trozo tal cual.
+
+Así sólo se re-escanean las costuras, normalmente uno o dos tokens.
+"""
+
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from ..models.token_stream import TokenStream
+from .scanner import SENTINEL, _kind_tables, _munch_spans, _text_munch, scan_offsets
+
+# Por debajo de este tamaño (en caracteres) no compensa repartir el trabajo
+MIN_PARALLEL_SIZE = 1 << 20
+# Inicios de token al comienzo de cada trozo que se ofrecen para sincronizar
+HEAD_TOKENS = 64
+
+# Estado de cada proceso del pool (lo fija _init_worker)
+_worker = {}
+
+
+def _init_worker(text, dfa, tables):
+    # Con fork el texto se hereda sin copiarlo; con spawn se envía una vez
+    # por proceso y no una vez por trozo
+    _worker.update(text=text, dfa=dfa, tables=tables)
+
+
+def _scan_chunk(begin, end, final):
+    """
+    Escanea el trozo text[begin:end] del texto del proceso.
+
+    Returns:
+        tuple: (kinds, starts, ends, heads, cut). `heads` son los primeros
+        HEAD_TOKENS inicios de token, incluidos los descartados, y `cut` es
+        donde empieza la cola incierta (`end` si el trozo es el último).
+    """
+    text = _worker["text"]
+    _, accept, dispatch, keywords, error, skip_kinds = _worker["tables"]
+    munch = _text_munch(_worker["dfa"], accept, dispatch.get, keywords)
+
+    kinds, starts, ends, heads = array('H'), array('I'), array('I'), array('I')
+    add_kind, add_start, add_end = kinds.append, starts.append, ends.append
+    heads_left = HEAD_TOKENS
+    cut = end
+    for kind, start, stop in _munch_spans(munch, text, end, error, None, index=begin, final=final):
+        if kind is None:
+            # El AFD sigue vivo al final del trozo: este token (y lo que
+            # sigue) lo resuelve el proceso principal
+            cut = start
+            break
+        if heads_left:
+            heads.append(start)
+            heads_left -= 1
+        if kind not in skip_kinds:
+            add_kind(kind)
+            add_start(start)
+            add_end(stop)
+
+    return kinds, starts, ends, heads, cut
+
+
+def scan_parallel(dfa, text, token_names=None, skip=frozenset(), workers=None, chunks=None):
+    """
+    Escanea `text` como `scan_offsets`, repartiendo el trabajo entre procesos.
+
+    Args:
+        dfa (CompiledDFA): autómata compilado.
+        text (str): cadena de entrada; el escaneo termina en el primer SENTINEL.
+        token_names (list[str], opcional): orden de los ids (ver scan_offsets).
+        skip (set[str]): tipos de token que no se guardan.
+        workers (int, opcional): procesos del pool; por defecto, os.cpu_count().
+        chunks (int, opcional): trozos en que se parte el texto; por defecto,
+            uno por proceso.
+
+    Returns:
+        TokenStream: los mismos tokens que scan_offsets(dfa, text, token_names, skip).
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunks or workers
+    n = text.find(SENTINEL)
+    if n < 0:
+        n = len(text)
+    if workers == 1 or n < MIN_PARALLEL_SIZE:
+        return scan_offsets(dfa, text, token_names, skip)
+
+    tables = _kind_tables(dfa, token_names, skip)
+    names, accept, dispatch, keywords, error, skip_kinds = tables
+    size = -(-n // chunks)
+    bounds = [(start, min(start + size, n)) for start in range(0, n, size)]
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(text, dfa, tables)) as pool:
+        futures = [pool.submit(_scan_chunk, start, end, end == n) for start, end in bounds]
+        results = [future.result() for future in futures]
+
+    munch = _text_munch(dfa, accept, dispatch.get, keywords)
+    stream = TokenStream(text, names)
+    pos = 0
+    for kinds, starts, ends, heads, cut in results:
+        # Costura: se escanea aquí hasta coincidir con un inicio del trozo
+        heads = set(heads)
+        if pos < cut and pos not in heads:
+            for kind, start, end in _munch_spans(munch, text, n, error, None, index=pos):
+                if start >= cut or start in heads:
+                    break
+                if kind not in skip_kinds:
+                    stream.kinds.append(kind)
+                    stream.starts.append(start)
+                    stream.ends.append(end)
+                pos = end
+        if pos < cut:
+            j = bisect_left(starts, pos)
+            stream.kinds.extend(kinds[j:])
+            stream.starts.extend(starts[j:])
+            stream.ends.extend(ends[j:])
+            pos = cut
+    return stream
@@ -0,0 +1,415 @@
+"""
+Escáneres sobre la forma compilada del AFD (CompiledDFA).
+
+Trabajan con estados enteros y la tabla plana de transiciones, de modo que el
+ciclo interno no necesita hashear conjuntos de posiciones.
+
+La máxima coincidencia obliga a retroceder hasta la última aceptación cuando
+el AFD muere más adelante (un comentario sin cerrar, `a*b` sobre "aaa…"), y
+releer esos caracteres token tras token es cuadrático. Los escáneres de tabla
+siguen el esquema de Reps ("Maximal-munch tokenization in linear time"): cada
+par (estado, posición) recorrido sin llegar a otra aceptación se anota como
+fallido, y un escaneo posterior que lo alcanza se detiene ahí. Los pares sólo
+se consultan por debajo de la posición más lejana ya leída, así que una
+entrada sin retrocesos no paga más que una comparación por carácter.
+
+Todos los escáneres (también los de lazy_scanner, translated_scanner,
+stream_scanner, byte_scanner y parallel_scanner) comparten el mismo ciclo de
+máxima coincidencia y manejo de errores (_munch_spans); cada uno sólo decide
+qué datos recorre y cómo guarda los tokens.
+"""
+
+from ..models.compiled_dfa import DEAD, NO_CLASS, UNKNOWN
+from ..models.token_stream import TokenStream
+
+SENTINEL = '\x00'
+
+
+class LexerError(ValueError):
+    """
+    El escaneo se abortó al alcanzar el máximo de errores léxicos.
+
+    `offset` es donde empieza el último ERROR y `tokens` lo reconocido hasta
+    ahí, incluido ese ERROR (None en iter_tokens: ya se entregó).
+    """
+    def __init__(self, max_errors, offset, tokens=None):
+        super().__init__(f"Se alcanzó el máximo de {max_errors} errores léxicos (offset {offset})")
+        self.max_errors = max_errors
+        self.offset = offset
+        self.tokens = tokens
+
+
+def _mark_failed(failed, table, stride, width, column_of, data, state, index, start, stop, base=0):
+    """
+    Anota como fallidos los pares (estado, posición) de un escaneo abandonado.
+
+    Se repite el recorrido desde `state` en `index` hasta `stop`, donde murió
+    el AFD, y se guardan los pares con posición >= `start` (la última
+    aceptación, o el inicio del token si no la hubo): desde ninguno de ellos
+    se llega a una aceptación posterior. La clave es posición * width + estado,
+    con la posición desplazada en `base`.
+    """
+    for i in range(index, stop):
+        if i >= start:
+            failed.add((base + i) * width + state)
+        state = table[state * stride + column_of(data[i])]
+    failed.add((base + stop) * width + state)
+
+
+def _next_start(text, i, n, class_of, lookup, first):
+    """Primera posición desde `i` que puede iniciar un token (o el SENTINEL)."""
+    while i < n:
+        char = text[i]
+        if char == SENTINEL:
+            break
+        col = class_of(char)
+        if col is None:
+            col = lookup(char)
+        if col is not None and first[col]:
+            break
+        i += 1
+    return i
+
+
+class _Munch:
+    """
+    Cómo recorre el AFD el paso de máxima coincidencia de _munch_spans.
+
+    `class_of(data[i])` da la columna, o None para probar con `lookup` (el
+    camino lento; sin él, el carácter queda fuera del alfabeto); sin
+    class_of, los datos ya son columnas, con NO_CLASS fuera del alfabeto
+    (ver CompiledDFA.class_codes); `accept` es
+    el token de cada estado en la forma que use el escáner (nombre o id);
+    `runs` son los patrones de los lazos (run_matchers) sobre los mismos
+    datos; `dispatch(data[index])` da el token de un carácter que lo es por
+    sí solo; `keywords` resuelve las palabras reservadas por su lexema,
+    tomado de `words` (por defecto, de los datos); `next_state` calcula las
+    celdas UNKNOWN de un LazyDFA. Con `memo` se anotan los pares (estado,
+    posición) fallidos, como en el esquema de Reps.
+    """
+    def __init__(self, table, stride, width, initial, accept, class_of, lookup=None, runs=None,
+                 dispatch=None, keywords=None, words=None, next_state=None, memo=True):
+        self.table = table
+        self.stride = stride
+        self.width = width
+        self.initial = initial
+        self.accept = accept
+        self.class_of = class_of
+        self.lookup = lookup
+        self.runs = runs
+        self.dispatch = dispatch
+        self.keywords = keywords or {}
+        self.words = words
+        self.next_state = next_state
+        self.memo = memo
+
+
+def _munch_spans(munch, data, n, error, sentinel, skip=frozenset(), coalesce_errors=False,
+                 max_errors=None, next_start=None, error_end=None, refill=None, index=0,
+                 final=True, lexemes=False):
+    """
+    Recorre data[index:n] con máxima coincidencia y produce (token, start, end)
+    por cada token, incluidos los errores con el token `error`.
+
+    Es el único ciclo de escaneo sobre tablas: los escáneres sólo eligen los
+    datos y la forma de los tokens (`munch`, ver _Munch) y cómo guardar
+    cada tupla. Los tokens de `skip` (en la forma de `accept`, y `error` si
+    se descartan los errores) avanzan el recorrido sin producir nada. Con
+    `lexemes` se produce directamente (token, lexema), tomado de `words`,
+    y el escáner puede consumir el generador sin un ciclo propio.
+
+    Sin token en una posición se produce un ERROR hasta `error_end(data, i, n)`
+    (por defecto, un carácter) o, con coalesce_errors, hasta
+    `next_start(data, i + 1, n)`, el próximo inicio posible. Al producirse
+    `max_errors` errores se lanza LexerError (sin tokens: los guarda quien
+    consume). El recorrido termina en `sentinel`.
+
+    `refill(keep)` permite escanear por bloques: descarta data[:keep],
+    agrega más entrada y devuelve (data, n), o None al final del flujo. Se
+    llama al agotar los datos y cuando un token llega vivo al final, que se
+    vuelve a probar desde su inicio; las posiciones producidas son relativas
+    a los datos actuales. Con final=False (un trozo del texto, ver
+    parallel_scanner) el recorrido se detiene en el primer token que llega
+    vivo al final y produce (None, inicio, n).
+    """
+    table = munch.table
+    stride = munch.stride
+    width = munch.width
+    initial = munch.initial
+    accept = munch.accept
+    class_of = munch.class_of
+    lookup = munch.lookup
+    runs = munch.runs
+    dispatch = munch.dispatch
+    keywords = munch.keywords
+    words = data if munch.words is None else munch.words
+    next_state = munch.next_state
+    column_of = lookup or class_of or int
+    failed = set() if munch.memo else None
+    high = 0                # posición más lejana leída (en el flujo)
+    base = 0                # posición en el flujo de data[0]
+
+    skip_errors = error in skip
+    errors = 0
+    error_start = -1        # inicio de la racha de ERROR aún abierta
+    while True:
+        if index >= n:
+            more = None
+            if refill is not None:
+                # Lo anterior a `keep` ya se produjo: las posiciones se desplazan
+                keep = error_start if error_start >= 0 else index
+                more = refill(keep)
+            if more is None:
+                break
+            data, n = more
+            words = data if munch.words is None else munch.words
+            base += keep
+            index -= keep
+            if error_start >= 0:
+                error_start -= keep
+            continue
+        char = data[index]
+        if char == sentinel:
+            # Si llegamos al SENTINEL terminamos sin generar ERROR
+            break
+
+        token = dispatch(char) if dispatch is not None else None
+        if token is not None:
+            # Token de un solo carácter: no hace falta recorrer el AFD
+            last_end = i = index + 1
+            last_token = token
+        else:
+            if failed and base + index >= high:
+                # Ningún escaneo vuelve detrás de la posición más lejana leída
+                failed.clear()
+            limit = high - base     # por debajo, se consultan los pares fallidos
+
+            state = initial
+            last_end = -1
+            last_token = None
+            i = index
+            while i < n:
+                if i < limit and (base + i) * width + state in failed:
+                    # Desde aquí ya se sabe que no hay otra aceptación
+                    break
+                if class_of is None:
+                    # Los datos ya son columnas (ver class_codes)
+                    col = data[i]
+                    if col == NO_CLASS:
+                        break
+                else:
+                    col = class_of(data[i])
+                    if col is None:
+                        if lookup is None:
+                            break
+                        # Fuera de la fila rápida: se busca en los intervalos
+                        col = lookup(data[i])
+                        if col is None:
+                            break
+                target = table[state * stride + col]
+                if target < 0:
+                    if target != UNKNOWN:
+                        break
+                    # AFD perezoso: la transición se calcula al alcanzarla
+                    target = next_state(state, col)
+                    if target == DEAD:
+                        break
+                i += 1
+                if target == state and runs is not None and i >= limit:
+                    # Lazo del estado: el resto de la racha se salta en C
+                    i = runs[state](data, i, n).end()
+                state = target
+                token = accept[state]
+                if token is not None:
+                    last_end = i
+                    last_token = token
+
+            if failed is not None and (i < n or final and refill is None):
+                start = last_end if last_end > index else index
+                if i > start:
+                    # Hubo retroceso: lo recorrido tras `start` no vuelve a leerse
+                    _mark_failed(failed, table, stride, width, column_of, data, initial,
+                                 index, start, i, base)
+                    if base + i >= high:
+                        high = base + i + 1
+
+        if i >= n:
+            if refill is not None:
+                # El token sigue abierto al final del bloque: se pide más
+                # entrada y se vuelve a probar desde su inicio
+                keep = error_start if error_start >= 0 else index
+                more = refill(keep)
+                if more is not None:
+                    data, n = more
+                    words = data if munch.words is None else munch.words
+                    base += keep
+                    index -= keep
+                    if error_start >= 0:
+                        error_start -= keep
+                    continue
+                refill = None
+            elif not final:
+                if error_start >= 0 and not skip_errors:
+                    yield (error, words[error_start:index]) if lexemes \
+                        else (error, error_start, index)
+                yield None, index, n
+                return
+
+        if last_end > index:
+            if error_start >= 0:
+                if not skip_errors:
+                    yield (error, words[error_start:index]) if lexemes \
+                        else (error, error_start, index)
+                errors += 1
+                if errors == max_errors:
+                    raise LexerError(max_errors, base + error_start)
+                error_start = -1
+            if last_token in keywords:
+                # Palabra reservada: se resuelve por el lexema
+                last_token = keywords[last_token].get(words[index:last_end], last_token)
+            if last_token not in skip:
+                yield (last_token, words[index:last_end]) if lexemes \
+                    else (last_token, index, last_end)
+            index = last_end
+        elif coalesce_errors:
+            # La racha de ERROR sigue hasta el próximo carácter que puede
+            # iniciar un token; allí se vuelve a intentar
+            if error_start < 0:
+                error_start = index
+            index = next_start(data, index + 1, n)
+        else:
+            # Ningún estado aceptó → ERROR sobre este carácter
+            end = error_end(data, index, n) if error_end is not None else index + 1
+            if not skip_errors:
+                yield (error, words[index:end]) if lexemes else (error, index, end)
+            errors += 1
+            if errors == max_errors:
+                raise LexerError(max_errors, base + index)
+            index = end
+
+    if error_start >= 0:
+        if not skip_errors:
+            yield (error, words[error_start:index]) if lexemes else (error, error_start, index)
+        errors += 1
+        if errors == max_errors:
+            raise LexerError(max_errors, base + error_start)
+
+
+def _text_munch(dfa, accept=None, dispatch=None, keywords=None):
+    """_Munch sobre texto para un CompiledDFA (por defecto, con nombres de token)."""
+    if accept is None:
+        accept = dfa.accept
+        dispatch = dfa.dispatch_table().get
+        keywords = dfa.keywords
+    return _Munch(
+        dfa.table, dfa.num_classes, dfa.num_states, dfa.initial, accept,
+        dfa.class_map.get, dfa.class_of, dfa.run_matchers(), dispatch, keywords,
+    )
+
+
+def _text_starts(dfa):
+    """`next_start` de _munch_spans sobre texto (ver _next_start)."""
+    class_of, lookup, first = dfa.class_map.get, dfa.class_of, dfa.first_classes()
+    return lambda text, i, n: _next_start(text, i, n, class_of, lookup, first)
+
+
+def _kind_names(dfa, token_names=None):
+    """`token_names` más los tokens del autómata que falten y "ERROR", al final."""
+    names = list(token_names) if token_names is not None else []
+    for token in dfa.token_types():
+        if token not in names:
+            names.append(token)
+    if "ERROR" not in names:
+        names.append("ERROR")
+    return names
+
+
+def _kind_tables(dfa, token_names, skip):
+    """
+    Tablas de un CompiledDFA con ids de token en lugar de nombres:
+    (names, accept, dispatch, keywords, id de ERROR, ids a descartar).
+    """
+    names = _kind_names(dfa, token_names)
+    kind_of = {name: k for k, name in enumerate(names)}
+    accept = [kind_of[token] if token is not None else None for token in dfa.accept]
+    dispatch = {char: kind_of[token] for char, token in dfa.dispatch_table().items()}
+    keywords = {
+        kind_of[token]: {word: kind_of[keyword] for word, keyword in table.items()}
+        for token, table in dfa.keywords.items()
+    }
+    skip_kinds = frozenset(kind_of[name] for name in skip if name in kind_of)
+    return names, accept, dispatch, keywords, kind_of["ERROR"], skip_kinds
+
+
+def scan_tokens(dfa, text, skip=frozenset(), coalesce_errors=False, max_errors=None):
+    """
+    Escanea `text` con máxima coincidencia (maximal munch).
+
+    Args:
+        dfa (CompiledDFA): autómata compilado.
+        text (str): cadena de entrada; el escaneo termina en el primer SENTINEL.
+        skip (set[str]): tipos de token que se descartan dentro del ciclo,
+            sin crear la tupla ni el lexema (puede incluir "ERROR").
+        coalesce_errors (bool): si es True, cada racha de caracteres sin
+            token produce un único ERROR: se salta directamente al siguiente
+            carácter que puede iniciar un token (ver first_classes).
+        max_errors (int, opcional): al producirse este número de ERROR el
+            escaneo se aborta con LexerError.
+
+    Returns:
+        list of tuple: Lista de tuplas (token_type, lexeme).
+    """
+    spans = _munch_spans(
+        _text_munch(dfa), text, len(text), "ERROR", SENTINEL, skip, coalesce_errors, max_errors,
+        _text_starts(dfa) if coalesce_errors else None, lexemes=True,
+    )
+    tokens = []
+    try:
+        # Si se lanza LexerError, `tokens` ya tiene los anteriores
+        tokens.extend(spans)
+    except LexerError as exc:
+        exc.tokens = tokens
+        raise
+    return tokens
+
+
+def scan_offsets(dfa, text, token_names=None, skip=frozenset(), coalesce_errors=False,
+                 max_errors=None):
+    """
+    Escanea `text` como `scan_tokens`, pero devuelve un TokenStream: tipos y
+    offsets en arreglos compactos, sin guardar una tupla ni una subcadena por
+    token.
+
+    Args:
+        dfa (CompiledDFA): autómata compilado.
+        text (str): cadena de entrada; el escaneo termina en el primer SENTINEL.
+        token_names (list[str], opcional): orden de los tipos de token (los
+            ids son índices en esta lista). Por defecto, el orden en que
+            aparecen en el autómata. "ERROR" siempre se agrega al final.
+        skip (set[str]): tipos de token que no se guardan en el resultado.
+        coalesce_errors (bool): cada racha de caracteres sin token se guarda
+            como un único ERROR con sus offsets (ver scan_tokens).
+        max_errors (int, opcional): al producirse este número de ERROR el
+            escaneo se aborta con LexerError.
+
+    Returns:
+        TokenStream: tokens con lexemas perezosos e índice de líneas.
+    """
+    names, accept, dispatch, keywords, error, skip_kinds = _kind_tables(dfa, token_names, skip)
+    spans = _munch_spans(
+        _text_munch(dfa, accept, dispatch.get, keywords), text, len(text), error, SENTINEL,
+        skip_kinds, coalesce_errors, max_errors, _text_starts(dfa) if coalesce_errors else None,
+    )
+    stream = TokenStream(text, names)
+    kinds = stream.kinds.append
+    starts = stream.starts.append
+    ends = stream.ends.append
+    try:
+        for kind, start, end in spans:
+            kinds(kind)
+            starts(start)
+            ends(end)
+    except LexerError as exc:
+        exc.tokens = stream
+        raise
+    return stream
@@ -0,0 +1,64 @@
+"""
+Escáner por bloques sobre un flujo (archivo de texto o binario).
+"""
+
+import codecs
+
+from .scanner import SENTINEL, _munch_spans, _text_munch, _text_starts
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def iter_tokens(dfa, stream, chunk_size=DEFAULT_CHUNK_SIZE, encoding='utf-8', skip=frozenset(),
+                coalesce_errors=False, max_errors=None):
+    """
+    Escanea un flujo (archivo de texto o binario) por bloques y va
+    produciendo los tokens a medida que se completan.
+
+    Un token que queda partido entre dos bloques se sigue reconociendo con
+    máxima coincidencia: se lee más entrada y se vuelve a probar desde su
+    inicio (leyendo al menos tanto como lo ya retenido, así que un token
+    largo se relee un número acotado de veces). En memoria sólo se mantiene
+    el bloque actual más el token (o la racha de ERROR) en curso.
+
+    Args:
+        dfa (CompiledDFA): autómata compilado.
+        stream: objeto con método read(n) que devuelve str o bytes.
+        chunk_size (int): tamaño de cada lectura.
+        encoding (str): codificación usada si el flujo es binario.
+        skip (set[str]): tipos de token que no se producen.
+        coalesce_errors (bool): una racha de caracteres sin token produce un
+            único ERROR, aunque cruce el límite entre bloques.
+        max_errors (int, opcional): tras producir este número de ERROR se
+            lanza LexerError.
+
+    Yields:
+        tuple: (token_type, lexeme).
+    """
+    decoder = None
+    buf = ''
+    eof = False
+
+    def refill(keep):
+        # Descarta lo ya producido y agrega el siguiente bloque; decodifica
+        # de forma incremental para no partir secuencias multibyte
+        nonlocal decoder, buf, eof
+        if eof:
+            return None
+        kept = buf[keep:]
+        data = stream.read(max(chunk_size, len(kept)))
+        if isinstance(data, str):
+            text = data
+        else:
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            text = decoder.decode(data, final=not data)
+        eof = not data
+        buf = kept + text
+        return buf, len(buf)
+
+    spans = _munch_spans(
+        _text_munch(dfa), buf, 0, "ERROR", SENTINEL, skip, coalesce_errors, max_errors,
+        _text_starts(dfa) if coalesce_errors else None, refill=refill, lexemes=True,
+    )
+    yield from spans
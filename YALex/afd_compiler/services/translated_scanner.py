@@ -0,0 +1,56 @@
+"""
+Escáner sobre el texto traducido de una vez a códigos de clase.
+
+scan_translated traduce primero todo el texto a códigos de clase (un byte
+por carácter, con str.translate) y el ciclo interno indexa la tabla con esos
+bytes, sin buscar cada carácter en class_map.
+"""
+
+import re
+
+from .scanner import SENTINEL, LexerError, _Munch, _munch_spans, scan_tokens
+
+
+def scan_translated(dfa, text, skip=frozenset(), coalesce_errors=False, max_errors=None):
+    """
+    Igual que scan_tokens, con las clases de caracteres calculadas de una vez.
+
+    El texto (hasta el SENTINEL) se traduce a un bytes de códigos de clase
+    (CompiledDFA.class_codes) y el AFD avanza leyendo enteros de ahí. Si el
+    autómata tiene demasiadas clases para un byte se usa scan_tokens.
+
+    Args y Returns: como scan_tokens.
+    """
+    n = text.find(SENTINEL)
+    if n < 0:
+        n = len(text)
+    codes = dfa.class_codes(text[:n])
+    if codes is None:
+        return scan_tokens(dfa, text, skip, coalesce_errors, max_errors)
+
+    # Sin class_of: los códigos ya son columnas
+    munch = _Munch(
+        dfa.table, dfa.num_classes, dfa.num_states, dfa.initial, dfa.accept,
+        None, runs=dfa.run_code_matchers(), keywords=dfa.keywords, words=text,
+    )
+    next_start = None
+    if coalesce_errors:
+        # Próximo carácter que puede iniciar un token, buscado en los códigos
+        first = dfa.first_classes()
+        starts = bytes(k for k in range(dfa.num_classes) if first[k])
+        search = re.compile(b'[' + re.escape(starts) + b']').search if starts else None
+
+        def next_start(data, i, n):
+            found = search(data, i, n) if search else None
+            return found.start() if found else n
+
+    tokens = []
+    try:
+        # `codes` ya termina en el SENTINEL; si se lanza LexerError, `tokens`
+        # ya tiene los anteriores
+        tokens.extend(_munch_spans(munch, codes, n, "ERROR", None, skip, coalesce_errors,
+                                   max_errors, next_start, lexemes=True))
+    except LexerError as exc:
+        exc.tokens = tokens
+        raise
+    return tokens
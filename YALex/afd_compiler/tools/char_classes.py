@@ -0,0 +1,92 @@
+"""
+Módulo para la compresión del alfabeto.
+
+Agrupa los caracteres que se comportan igual en todo el autómata en clases de
+equivalencia, de modo que la construcción y la minimización del DFA trabajen
+sobre identificadores de clase en lugar de caracteres individuales.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from ..utils.ast_functions import position_intervals
+
+
+def compute_char_classes(positions, initial_positions, followpos):
+    """
+    Calcula las clases de equivalencia de caracteres.
+
+    Dos posiciones son "gemelas" si aparecen exactamente en los mismos
+    conjuntos (firstpos de la raíz y cada followpos) y tienen el mismo
+    followpos: ningún estado puede contener a una sin la otra y ambas llevan
+    al mismo lugar. Dos caracteres son equivalentes si etiquetan posiciones
+    del mismo conjunto de grupos gemelos; así (a|b|c) queda en una sola clase
+    aunque sean tres hojas, y lo mismo los caracteres de un CHARSET que no se
+    distinguen en ninguna otra regla.
+
+    Los caracteres nunca se enumeran: se recorren los extremos de los
+    intervalos de todas las posiciones, de modo que un [^\n] sobre todo
+    Unicode cuesta lo mismo que un [a-z].
+
+    Args:
+        positions (list[Position]): todas las posiciones del AST (CHAR o CHARSET).
+        initial_positions (set[Position]): firstpos de la raíz.
+        followpos (dict): followpos de cada posición.
+
+    Returns:
+        tuple: (classes, representatives, activates) donde classes[k] es la
+        tupla de intervalos (lo, hi) de code points de la clase k (ordenadas
+        por su primer code point), representatives[k] su primer carácter y
+        activates[pos] la lista de clases cuyo representante está en la
+        posición (basta con esas: las demás las cubre una gemela).
+    """
+    # 1) Conjuntos donde aparece cada posición
+    containers = {}
+    for idx, group in enumerate([initial_positions, *followpos.values()]):
+        for pos in group:
+            containers.setdefault(pos, []).append(idx)
+
+    # 2) Grupo gemelo de cada posición; cada intervalo abre y cierra su grupo
+    group_ids = {}
+    events = {}
+    for pos in positions:
+        key = (tuple(containers.get(pos, ())), frozenset(followpos.get(pos, ())))
+        group = group_ids.setdefault(key, len(group_ids))
+        for lo, hi in position_intervals(pos):
+            events.setdefault(lo, []).append((group, 1))
+            events.setdefault(hi + 1, []).append((group, -1))
+
+    # 3) Barrido por los extremos: cada tramo entre dos extremos consecutivos
+    #    tiene una firma (grupos que lo cubren); tramos con la misma firma
+    #    forman una clase
+    active = {}
+    by_signature = {}
+    bounds = sorted(events)
+    for i, point in enumerate(bounds[:-1]):
+        for group, delta in events[point]:
+            count = active.get(group, 0) + delta
+            if count:
+                active[group] = count
+            else:
+                del active[group]
+        if not active:
+            continue
+        intervals = by_signature.setdefault(frozenset(active), [])
+        end = bounds[i + 1] - 1
+        if intervals and intervals[-1][1] == point - 1:
+            intervals[-1] = (intervals[-1][0], end)
+        else:
+            intervals.append((point, end))
+
+    classes = [tuple(intervals) for intervals in by_signature.values()]
+    representatives = [chr(intervals[0][0]) for intervals in classes]
+
+    # 4) Clases que activa cada posición (los representantes están ordenados)
+    rep_codes = [intervals[0][0] for intervals in classes]
+    activates = {}
+    for pos in positions:
+        activates[pos] = [
+            k
+            for lo, hi in position_intervals(pos)
+            for k in range(bisect_left(rep_codes, lo), bisect_right(rep_codes, hi))
+        ]
+    return classes, representatives, activates
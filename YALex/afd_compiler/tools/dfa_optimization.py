@@ -8,61 +8,97 @@ from afd_compiler.models.dfa import DFA
 def minimize_dfa(dfa: DFA) -> DFA:
     """
     Minimiza un DFA usando Hopcroft y preserva el mapa state_tokens.
+
+    Refinamiento de particiones en O(n·k·log n): se precalculan las
+    transiciones inversas, cada estado conoce el id de su bloque y la
+    "work list" es un conjunto de pares (bloque, símbolo).
     """
-    # 1) Partición inicial: separamos no-aceptantes y, entre los aceptantes,
-    #    un bloque POR CADA token distinto.
-    Q     = set(dfa.states)
-    F     = set(dfa.accepting_states)
-    nonF  = Q - F
-
-    # Bloque de no-aceptantes
-    P = []
-    if nonF:
-        P.append(nonF)
-
-    # Bloques de aceptantes, uno para cada token
-    token_to_states = {}
-    for s in F:
-        tok = dfa.state_tokens[s]
-        token_to_states.setdefault(tok, set()).add(s)
-    P.extend(token_to_states.values())
-
-    # La “work list” arranca con todos esos bloques
-    W = list(P)
+    # 0) Numerar estados y completar el DFA con un estado muerto virtual
+    #    (las transiciones ausentes van a él)
+    states  = list(dfa.states)
+    index   = {s: i for i, s in enumerate(states)}
+    dead    = len(states)
+    symbols = list(dfa.alphabet)
+    n, k    = len(states) + 1, len(symbols)
+
+    # inverse[j][t] = estados que con el símbolo j van a t
+    inverse = [[[] for _ in range(n)] for _ in range(k)]
+    for j, sym in enumerate(symbols):
+        inv = inverse[j]
+        for i, s in enumerate(states):
+            dst = dfa.transitions.get((s, sym))
+            inv[dead if dst is None else index[dst]].append(i)
+        inv[dead].append(dead)
+
+    # 1) Partición inicial: separamos no-aceptantes (con el estado muerto) y,
+    #    entre los aceptantes, un bloque POR CADA token distinto.
+    token_blocks = {}
+    non_accepting = {dead}
+    for i, s in enumerate(states):
+        if s in dfa.accepting_states:
+            token_blocks.setdefault(dfa.state_tokens[s], set()).add(i)
+        else:
+            non_accepting.add(i)
+
+    blocks   = [non_accepting, *token_blocks.values()]
+    block_of = [0] * n
+    for b, members in enumerate(blocks):
+        for i in members:
+            block_of[i] = b
+
+    # La "work list" arranca con todos los bloques salvo el más grande
+    largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+    pending = [(b, j) for b in range(len(blocks)) if b != largest for j in range(k)]
+    in_work = set(pending)
 
     # 2) Refinar la partición
-    while W:
-        A = W.pop(0)
-        for c in dfa.alphabet:
-            new_P = []
-            for Y in P:
-                # X = estados en Y que con 'c' van a A
-                X = {
-                    s for s in Y
-                    if (s, c) in dfa.transitions
-                       and dfa.transitions[(s, c)] in A
-                }
-                if X and X != Y:
-                    Y_minus_X = Y - X
-                    new_P.extend([X, Y_minus_X])
-                    # mantener W consistente
-                    if Y in W:
-                        W.remove(Y)
-                        W.extend([X, Y_minus_X])
-                    else:
-                        # añadir sólo el bloque más pequeño
-                        W.append(X if len(X) <= len(Y_minus_X) else Y_minus_X)
+    while pending:
+        splitter = pending.pop()
+        in_work.discard(splitter)
+        a_block, j = splitter
+        inv = inverse[j]
+
+        # Predecesores del bloque con el símbolo j, agrupados por su bloque
+        touched = {}
+        for t in blocks[a_block]:
+            for s in inv[t]:
+                touched.setdefault(block_of[s], []).append(s)
+
+        for y, moved in touched.items():
+            Y = blocks[y]
+            if len(moved) == len(Y):
+                continue
+            # Partir Y: los estados que llegan al bloque pasan a uno nuevo
+            new = len(blocks)
+            moved = set(moved)
+            Y.difference_update(moved)
+            blocks.append(moved)
+            for s in moved:
+                block_of[s] = new
+
+            # mantener la work list consistente
+            smaller = new if len(moved) <= len(Y) else y
+            for jj in range(k):
+                if (y, jj) in in_work:
+                    entry = (new, jj)
                 else:
-                    new_P.append(Y)
-            P = new_P
+                    # añadir sólo el bloque más pequeño
+                    entry = (smaller, jj)
+                if entry not in in_work:
+                    in_work.add(entry)
+                    pending.append(entry)
 
     # 3) Construir mapping de estados viejos → nuevos bloques
+    #    (el estado muerto virtual se descarta)
     state_mapping = {}
     new_states    = set()
-    for block in P:
-        block_frozen = frozenset(block)
+    for block in blocks:
+        real = [states[i] for i in block if i != dead]
+        if not real:
+            continue
+        block_frozen = frozenset(real)
         new_states.add(block_frozen)
-        for s in block:
+        for s in real:
             state_mapping[s] = block_frozen
 
     # 4) Reconstruir transiciones con los bloques
@@ -88,7 +124,8 @@ def minimize_dfa(dfa: DFA) -> DFA:
         new_transitions,
         new_initial,
         new_accepting,
-        new_state_tokens
+        new_state_tokens,
+        dfa.classes
     )
 
 
@@ -1,83 +1,97 @@
 from ..models.position import Position
 
+LEAF_TYPES = ('CHAR', 'CHARSET', 'END')
+
 def traverse_tree(node):
-    """Generador que recorre el árbol en pre-orden."""
-    yield node
-    for child in node.children:
-        yield from traverse_tree(child)
+    """Generador que recorre el árbol en pre-orden (pila explícita, sin recursión)."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+
+def traverse_postorder(node):
+    """Generador que recorre el árbol en post-orden (pila explícita, sin recursión)."""
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if expanded or not current.children:
+            yield current
+        else:
+            stack.append((current, True))
+            for child in reversed(current.children):
+                stack.append((child, False))
 
 def calculate_node_functions(node):
-    """Calcula nullable, firstpos y lastpos para cada nodo del árbol."""
-    if node.type == 'CHAR':
-        pos = Position(node.value)
-        node.nullable = False
-        node.firstpos = {pos}
-        node.lastpos = {pos}
-    
-    elif node.type == 'OPERATOR':
-        if node.value == '|':
-            left, right = node.children
-            calculate_node_functions(left)
-            calculate_node_functions(right)
-            
-            node.nullable = left.nullable or right.nullable
-            node.firstpos = left.firstpos | right.firstpos
-            node.lastpos = left.lastpos | right.lastpos
-            
-        elif node.value == '&':
-            left, right = node.children
-            calculate_node_functions(left)
-            calculate_node_functions(right)
-            
-            node.nullable = left.nullable and right.nullable
-            node.firstpos = left.firstpos | (right.firstpos if left.nullable else set())
-            node.lastpos = right.lastpos | (left.lastpos if right.nullable else set())
-            
-        elif node.value in ['*', '?']:
-            child = node.children[0]
-            calculate_node_functions(child)
-            
-            node.nullable = True
-            node.firstpos = child.firstpos
-            node.lastpos = child.lastpos
-            
-        elif node.value == '+':
-            child = node.children[0]
-            calculate_node_functions(child)
-            
-            node.nullable = False
-            node.firstpos = child.firstpos
-            node.lastpos = child.lastpos
+    """
+    Calcula nullable, firstpos y lastpos para cada nodo del árbol.
+    Se recorre en post-orden, así los hijos ya están calculados al llegar al
+    padre y las hojas reciben sus posiciones de izquierda a derecha.
+    """
+    for current in traverse_postorder(node):
+        if current.type in LEAF_TYPES:
+            # Un CHARSET ocupa una única posición, sin importar cuántos caracteres tenga
+            if current.type == 'END':
+                pos = Position(None, rule=current.value)
+            else:
+                pos = Position(current.value)
+            current.nullable = False
+            current.firstpos = {pos}
+            current.lastpos = {pos}
+
+        elif current.type == 'OPERATOR':
+            if current.value == '|':
+                left, right = current.children
+                current.nullable = left.nullable or right.nullable
+                current.firstpos = left.firstpos | right.firstpos
+                current.lastpos = left.lastpos | right.lastpos
+
+            elif current.value == '&':
+                left, right = current.children
+                current.nullable = left.nullable and right.nullable
+                current.firstpos = left.firstpos | (right.firstpos if left.nullable else set())
+                current.lastpos = right.lastpos | (left.lastpos if right.nullable else set())
+
+            elif current.value in ['*', '?']:
+                child = current.children[0]
+                current.nullable = True
+                current.firstpos = child.firstpos
+                current.lastpos = child.lastpos
+
+            elif current.value == '+':
+                # X+ = X X*: es anulable sólo si X lo es
+                child = current.children[0]
+                current.nullable = child.nullable
+                current.firstpos = child.firstpos
+                current.lastpos = child.lastpos
 
 def calculate_followpos(node, followpos=None):
-    """Calcula followpos para todo el árbol."""
+    """Calcula followpos para todo el árbol (el orden de visita no importa)."""
     if followpos is None:
         followpos = {}
-    
-    if node.type == 'OPERATOR':
-        if node.value == '&':
-            left, right = node.children
+
+    for current in traverse_tree(node):
+        if current.type != 'OPERATOR':
+            continue
+        if current.value == '&':
+            left, right = current.children
             for pos in left.lastpos:
                 if pos not in followpos:
                     followpos[pos] = set()
                 followpos[pos].update(right.firstpos)
-        
-        elif node.value in ['*', '+']:
-            for pos in node.lastpos:
+
+        elif current.value in ['*', '+']:
+            for pos in current.lastpos:
                 if pos not in followpos:
                     followpos[pos] = set()
-                followpos[pos].update(node.firstpos)
-        
-        for child in node.children:
-            calculate_followpos(child, followpos)
-    
+                followpos[pos].update(current.firstpos)
+
     return followpos
 
-def get_alphabet(node, alphabet=None):
-    if alphabet is None:
-        alphabet = set()
-    if node.type == 'CHAR':
-        alphabet.add(node.value)
-    for child in node.children:
-        get_alphabet(child, alphabet)
-    return alphabet
\ No newline at end of file
+def position_intervals(pos):
+    """Intervalos de code points que activan una posición (ninguno si es END)."""
+    if pos.rule is not None:
+        return ()
+    if isinstance(pos.symbol, tuple):
+        return pos.symbol
+    return ((ord(pos.symbol), ord(pos.symbol)),)
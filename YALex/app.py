@@ -13,7 +13,10 @@ if this_dir not in sys.path:
 # ──────────────────────────────────────────────────────────────────────────────
 
 from chain_compiler.tools.yal_parser import parse_yal_file
-from lex_compiler.service         import generate_lexer_py
+from lex_compiler.service         import (
+    generate_lexer_py, read_grammar_ignore, DEFAULT_ENTRYPOINTS, DEFAULT_MAX_STATES
+)
+from lex_compiler.cache           import DFACache
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
@@ -33,6 +36,32 @@ if __name__ == '__main__':
         '--scan_file', '-s',
         help='(Opcional) Ruta a un archivo para escaneo con el lexer generado'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Reconstruir el AFD sin usar la caché en disco ($YALEX_CACHE_DIR)'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=('table', 'direct'),
+        default='table',
+        help='Escáner de entrypoint(): tabla de transiciones o código por estado'
+    )
+    parser.add_argument(
+        '--max-states',
+        type=int,
+        default=DEFAULT_MAX_STATES,
+        help='Estados del AFD a partir de los cuales el lexer usa un AFD perezoso'
+    )
+    parser.add_argument(
+        '--keywords',
+        action='store_true',
+        help='Resolver las palabras reservadas con una tabla en lugar de estados del AFD'
+    )
+    parser.add_argument(
+        '--grammar', '-g',
+        help='(Opcional) Gramática .yalp cuya línea IGNORE define los tokens a descartar'
+    )
     args = parser.parse_args()
 
     # 1) Parsear .yal
@@ -42,7 +71,13 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # 2) Generar thelexer.py
-    generate_lexer_py(yal_info, args.out)
+    cache = None if args.no_cache else DFACache()
+    ignore = read_grammar_ignore(args.grammar) if args.grammar else None
+    # El escaneo de --scan_file usa entrypoint_stream(); sin él no se incrusta
+    entrypoints = DEFAULT_ENTRYPOINTS + ('entrypoint_stream',) if args.scan_file \
+        else DEFAULT_ENTRYPOINTS
+    generate_lexer_py(yal_info, args.out, cache, args.backend, ignore, args.max_states,
+                      args.keywords, entrypoints)
     print(f"Lexer generado en {args.out}")
 
     # 3) Si pidieron escaneo, cargar y usar entrypoint
@@ -59,13 +94,11 @@ if __name__ == '__main__':
             print(f"Error al cargar el lexer generado: {e}")
             sys.exit(1)
 
-        data = ""
+        # Escaneo por bloques: el archivo no se carga completo en memoria
         try:
             with open(args.scan_file, encoding='utf-8') as f:
-                data = f.read()
+                for tok, lex in mod.entrypoint_stream(f):
+                    print(tok, lex)
         except FileNotFoundError:
             print(f"Error: no se encontró el archivo {args.scan_file}")
             sys.exit(1)
-
-        for tok, lex in mod.entrypoint(data):
-            print(tok, lex)
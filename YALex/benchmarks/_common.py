@@ -0,0 +1,33 @@
+# YALex/benchmarks/_common.py
+"""
+Utilidades compartidas por los benchmarks.
+
+Importar este módulo agrega la carpeta YALex a sys.path, así cada
+benchmark se corre directamente (python benchmarks/bench_*.py) y encuentra
+chain_compiler, afd_compiler y lex_compiler.
+"""
+
+import os
+import sys
+import time
+
+this_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if this_dir not in sys.path:
+    sys.path.insert(0, this_dir)
+
+
+def time_it(func, *args, **kwargs):
+    """(resultado, segundos) de func(*args, **kwargs)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def scaled_corpus(path, megabytes):
+    """Repite el contenido de `path` hasta alcanzar ~`megabytes` MB."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if not text.endswith('\n'):
+        text += '\n'
+    copies = max(1, (megabytes * 1024 * 1024) // len(text.encode('utf-8')))
+    return text * copies
@@ -0,0 +1,65 @@
+# YALex/benchmarks/bench_backends.py
+"""
+Compara los backends del lexer generado (tabla vs. direct-coded).
+
+Uso:
+    python benchmarks/bench_backends.py [--yal ejemplo3.yal] [--input input.txt] [--mb 10 20 40]
+
+Genera ambos lexers para la misma especificación, arma un corpus repitiendo
+el archivo de entrada hasta el tamaño pedido y mide entrypoint() de cada uno,
+verificando que produzcan exactamente los mismos tokens.
+"""
+
+import argparse
+import importlib.util
+import os
+import tempfile
+
+from _common import this_dir, time_it, scaled_corpus
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import generate_lexer_py
+
+BACKENDS = ('table', 'direct')
+
+
+def load_lexer(yal_info, backend, directory):
+    """Genera el lexer con el backend indicado y lo importa como módulo."""
+    path = os.path.join(directory, f"lexer_{backend}.py")
+    generate_lexer_py(yal_info, path, backend=backend)
+    spec = importlib.util.spec_from_file_location(f"lexer_{backend}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--yal', default=os.path.join(this_dir, 'ejemplo3.yal'))
+    parser.add_argument('--input', default=os.path.join(this_dir, 'input.txt'))
+    parser.add_argument('--mb', type=int, nargs='+', default=[10, 20])
+    args = parser.parse_args()
+
+    yal_info = parse_yal_file(args.yal)
+    with tempfile.TemporaryDirectory() as directory:
+        lexers = {backend: load_lexer(yal_info, backend, directory) for backend in BACKENDS}
+
+        print(f"{'MB':>6} {'tokens':>10} " + " ".join(f"{b + ' (s)':>12}" for b in BACKENDS)
+              + f" {'MB/s direct':>12} {'aceleración':>12}")
+        for megabytes in args.mb:
+            corpus = scaled_corpus(args.input, megabytes)
+            size = len(corpus.encode('utf-8')) / (1024 * 1024)
+            results = {}
+            times = {}
+            for backend in BACKENDS:
+                results[backend], times[backend] = time_it(lexers[backend].entrypoint, corpus)
+            if results['table'] != results['direct']:
+                raise SystemExit("Los backends produjeron tokens distintos")
+            speedup = times['table'] / times['direct']
+            print(f"{size:>6.1f} {len(results['table']):>10} "
+                  + " ".join(f"{times[b]:>12.3f}" for b in BACKENDS)
+                  + f" {size / times['direct']:>12.2f} {speedup:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
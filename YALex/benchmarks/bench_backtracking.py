@@ -0,0 +1,84 @@
+# YALex/benchmarks/bench_backtracking.py
+"""
+Escaneo de entradas adversarias: máxima coincidencia con y sin memoria de fallos.
+
+Uso:
+    python benchmarks/bench_backtracking.py [--sizes 1000 2000 4000 8000]
+
+Cada caso obliga al AFD a avanzar hasta el final de la entrada antes de
+retroceder a la última aceptación. `scan_tokens` (memoria de pares fallidos)
+debe crecer linealmente; el escáner de referencia, que vuelve a leer todo
+tras cada token, crece de forma cuadrática.
+"""
+
+import argparse
+import os
+
+from _common import this_dir, time_it
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import build_lexer_dfa
+from afd_compiler.models.compiled_dfa import DEAD
+from afd_compiler.services.scanner import scan_tokens
+
+
+def backtracking_scan(dfa, text):
+    """Máxima coincidencia ingenua: reinicia tras cada token sin recordar nada."""
+    table, stride, accept = dfa.table, dfa.num_classes, dfa.accept
+    tokens = []
+    n = len(text)
+    index = 0
+    while index < n:
+        state = dfa.initial
+        last_end = -1
+        last_token = None
+        i = index
+        while i < n:
+            col = dfa.class_of(text[i])
+            if col is None:
+                break
+            state = table[state * stride + col]
+            if state == DEAD:
+                break
+            i += 1
+            if accept[state] is not None:
+                last_end = i
+                last_token = accept[state]
+        if last_end > index:
+            tokens.append((last_token, text[index:last_end]))
+            index = last_end
+        else:
+            tokens.append(("ERROR", text[index]))
+            index += 1
+    return tokens
+
+
+def cases():
+    """(nombre, AFD, generador de entradas de tamaño n)."""
+    service, _ = build_lexer_dfa([("a*b", "{ return AB }"), ("a", "{ return A }")])
+    yield "a*b | a sobre a…a", service.compiled(), lambda n: "a" * n
+
+    yal = parse_yal_file(os.path.join(this_dir, 'ejemplo3.yal'))
+    service, _ = build_lexer_dfa(yal['alternatives'])
+    # El comentario de ejemplo3 termina en 'n': sin ella ninguno se cierra y
+    # cada apertura recorre el resto de la entrada
+    yield 'comentarios sin cerrar', service.compiled(), lambda n: '"#" ' * (n // 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    args = parser.parse_args()
+
+    print(f"{'caso':<24} {'n':>7} {'memoria (s)':>12} {'ingenuo (s)':>12}")
+    for name, dfa, make in cases():
+        for n in args.sizes:
+            text = make(n)
+            tokens, linear = time_it(scan_tokens, dfa, text)
+            reference, naive = time_it(backtracking_scan, dfa, text)
+            assert tokens == reference
+            print(f"{name:<24} {n:>7} {linear:>12.4f} {naive:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
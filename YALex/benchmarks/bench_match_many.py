@@ -0,0 +1,55 @@
+# YALex/benchmarks/bench_match_many.py
+"""
+Clasificación de muchas cadenas cortas: match por cadena frente a match_many (NumPy).
+
+Uso:
+    python benchmarks/bench_match_many.py [--yal ejemplo3.yal] [--count 1000000] [--lengths 4 16 64]
+
+Genera campos al azar (palabras reservadas, identificadores, números,
+operadores y basura) de la longitud media indicada y compara el tiempo de
+`AFDService.match` sobre cada uno con una sola llamada a `match_many`.
+"""
+
+import argparse
+import os
+import random
+
+from _common import this_dir, time_it
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import build_lexer_dfa
+
+
+def fields(count, length, seed=0):
+    """`count` campos de longitud media `length`."""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz_'
+    makers = [
+        lambda n: rng.choice(['if', 'else', 'while']),
+        lambda n: rng.choice(letters) + ''.join(rng.choices(letters + '0123456789', k=n - 1)),
+        lambda n: ''.join(rng.choices('0123456789', k=n)),
+        lambda n: rng.choice(['>=', '<=', '==', '!=', '+', ';']),
+        lambda n: ''.join(rng.choices(letters + ' @ñ', k=n)),
+    ]
+    return [rng.choice(makers)(max(1, int(rng.expovariate(1 / length)))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--yal', default=os.path.join(this_dir, 'ejemplo3.yal'))
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--lengths', type=int, nargs='+', default=[4, 16, 64])
+    args = parser.parse_args()
+
+    service, token_names = build_lexer_dfa(parse_yal_file(args.yal)['alternatives'])
+
+    print(f"{'largo':>6} {'cadenas':>9} {'match (s)':>10} {'match_many (s)':>15} {'aceleración':>12}")
+    for length in args.lengths:
+        strings = fields(args.count, length)
+        _, single = time_it(lambda: [service.match(s) for s in strings])
+        _, batch = time_it(service.match_many, strings, token_names)
+        print(f"{length:>6} {len(strings):>9} {single:>10.2f} {batch:>15.2f} {single / batch:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
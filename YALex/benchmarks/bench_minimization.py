@@ -0,0 +1,91 @@
+# YALex/benchmarks/bench_minimization.py
+"""
+Tiempo de minimización (Hopcroft) en función del número de estados.
+
+Uso:
+    python benchmarks/bench_minimization.py [--sizes 1000 2000 4000 ...]
+
+Además de DFAs aleatorios, mide una especificación con muchas palabras
+reservadas, que es el caso donde la minimización domina la compilación.
+"""
+
+import argparse
+import math
+import random
+
+from _common import time_it
+
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from chain_compiler.ast_service import generate_rules_ast
+from afd_compiler.models.dfa import DFA
+from afd_compiler.services.dfa_builder import build_direct_dfa
+from afd_compiler.tools.dfa_optimization import minimize_dfa
+
+
+def random_dfa(num_states, num_symbols, copies=4, num_tokens=4, seed=0):
+    """
+    DFA aleatorio con transiciones parciales y estados redundantes: se arma
+    un autómata base de num_states/copies estados y cada estado aparece
+    `copies` veces, con transiciones hacia copias elegidas al azar.
+    """
+    rng = random.Random(seed)
+    base = max(1, num_states // copies)
+    base_delta = {}
+    for s in range(base):
+        for a in range(num_symbols):
+            if rng.random() < 0.8:
+                base_delta[(s, a)] = rng.randrange(base)
+    base_tokens = {s: f"T{rng.randrange(num_tokens)}" for s in range(base) if rng.random() < 0.2}
+
+    states = list(range(base * copies))
+    transitions = {
+        (c * base + s, a): rng.randrange(copies) * base + t
+        for (s, a), t in base_delta.items() for c in range(copies)
+    }
+    tokens = {c * base + s: tok for s, tok in base_tokens.items() for c in range(copies)}
+    return DFA(set(states), set(range(num_symbols)), transitions, 0, set(tokens), tokens)
+
+
+def keyword_rules(count, seed=0):
+    """Reglas estilo SQL: `count` palabras reservadas seguidas de un ID general."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9))))
+    rules = [(word, f"return KW_{word.upper()}") for word in sorted(words)]
+    rules.append(("[a-zA-Z_][a-zA-Z0-9_]*", "return ID"))
+    rules.append(("[ \\t]+", "return WHITESPACE"))
+    return rules
+
+
+def unminimized_dfa(rules):
+    """AFD de las reglas tal como sale de la construcción directa."""
+    patterns, token_names = rule_patterns(rules)
+    ast = generate_rules_ast(patterns)
+    return build_direct_dfa(ast, token_names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument('--symbols', type=int, default=16)
+    parser.add_argument('--keywords', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'estados':>8} {'mínimo':>8} {'tiempo (s)':>11} {'µs / (n·k·log n)':>18}")
+    for n in args.sizes:
+        dfa = random_dfa(n, args.symbols)
+        minimized, elapsed = time_it(minimize_dfa, dfa)
+        norm = elapsed * 1e6 / (n * args.symbols * math.log2(n))
+        print(f"{n:>8} {len(minimized.states):>8} {elapsed:>11.4f} {norm:>18.4f}")
+
+    print()
+    print(f"{'keywords':>8} {'estados':>8} {'mínimo':>8} {'tiempo (s)':>11}")
+    for count in args.keywords:
+        dfa = unminimized_dfa(keyword_rules(count))
+        minimized, elapsed = time_it(minimize_dfa, dfa)
+        print(f"{count:>8} {len(dfa.states):>8} {len(minimized.states):>8} {elapsed:>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# YALex/benchmarks/bench_parallel.py
+"""
+Escaneo en paralelo (scan_parallel) frente al escaneo secuencial (scan_offsets).
+
+Uso:
+    python benchmarks/bench_parallel.py [--yal ejemplo3.yal] [--input input.txt] [--mb 100] [--workers 1 2 4 8 16]
+
+Repite el archivo de entrada hasta el tamaño pedido y mide el tiempo total de
+cada número de procesos (incluye crear el pool y empalmar los trozos). La
+aceleración sólo puede acercarse a lineal si la máquina tiene al menos tantos
+núcleos como procesos.
+"""
+
+import argparse
+import os
+
+from _common import this_dir, time_it, scaled_corpus
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import build_lexer_dfa
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--yal', default=os.path.join(this_dir, 'ejemplo3.yal'))
+    parser.add_argument('--input', default=os.path.join(this_dir, 'input.txt'))
+    parser.add_argument('--mb', type=int, default=100)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    service, token_names = build_lexer_dfa(parse_yal_file(args.yal)['alternatives'])
+    corpus = scaled_corpus(args.input, args.mb)
+    expected, serial = time_it(service.scan_offsets, corpus, token_names)
+
+    print(f"núcleos disponibles: {os.cpu_count()}")
+    print(f"{'procesos':>9} {'tokens':>10} {'tiempo (s)':>11} {'aceleración':>12}")
+    print(f"{'serie':>9} {len(expected):>10} {serial:>11.2f} {1:>11.2f}x")
+    for workers in args.workers:
+        stream, elapsed = time_it(service.scan_parallel, corpus, token_names, workers=workers)
+        if stream.starts != expected.starts or stream.kinds != expected.kinds:
+            raise SystemExit("scan_parallel produjo tokens distintos")
+        print(f"{workers:>9} {len(stream):>10} {elapsed:>11.2f} {serial / elapsed:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
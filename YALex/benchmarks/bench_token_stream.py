@@ -0,0 +1,64 @@
+# YALex/benchmarks/bench_token_stream.py
+"""
+Memoria pico de scan_input (tuplas) frente a scan_offsets (TokenStream).
+
+Uso:
+    python benchmarks/bench_token_stream.py [--yal ejemplo3.yal] [--input input.txt] [--mb 10 50]
+
+Mide con tracemalloc la memoria reservada por cada escáner sobre un corpus
+que repite el archivo de entrada hasta el tamaño pedido (sin contar el texto
+de entrada, que ambos comparten).
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from _common import this_dir, scaled_corpus
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import build_lexer_dfa
+
+
+def measure(func, *args):
+    """(resultado, segundos, MB pico) de func(*args).
+
+    El tiempo se toma en una corrida aparte: tracemalloc lo distorsiona.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--yal', default=os.path.join(this_dir, 'ejemplo3.yal'))
+    parser.add_argument('--input', default=os.path.join(this_dir, 'input.txt'))
+    parser.add_argument('--mb', type=int, nargs='+', default=[10, 50])
+    args = parser.parse_args()
+
+    service, token_names = build_lexer_dfa(parse_yal_file(args.yal)['alternatives'])
+
+    print(f"{'MB':>6} {'tokens':>10} {'tuplas (MB)':>12} {'stream (MB)':>12} "
+          f"{'tuplas (s)':>11} {'stream (s)':>11}")
+    for megabytes in args.mb:
+        corpus = scaled_corpus(args.input, megabytes)
+        size = len(corpus) / (1024 * 1024)
+        stream, stream_time, stream_peak = measure(service.scan_offsets, corpus, token_names)
+        count = len(stream)
+        del stream
+        tokens, tuple_time, tuple_peak = measure(service.scan_input, corpus)
+        del tokens
+        print(f"{size:>6.1f} {count:>10} {tuple_peak:>12.1f} {stream_peak:>12.1f} "
+              f"{tuple_time:>11.2f} {stream_time:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# YALex/benchmarks/bench_translate.py
+"""
+Compara scan_input con scan_translated (clases traducidas de una vez).
+
+Uso:
+    python benchmarks/bench_translate.py [--yal ejemplo3.yal] [--input input.txt] [--mb 5 10]
+
+Arma un corpus repitiendo el archivo de entrada hasta el tamaño pedido y mide
+ambos escáneres sobre el mismo AFD, verificando que produzcan exactamente los
+mismos tokens. La columna "traducción" es el tiempo de class_codes solo.
+"""
+
+import argparse
+import os
+
+from _common import this_dir, time_it, scaled_corpus
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+from lex_compiler.service import build_lexer_dfa
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--yal', default=os.path.join(this_dir, 'ejemplo3.yal'))
+    parser.add_argument('--input', default=os.path.join(this_dir, 'input.txt'))
+    parser.add_argument('--mb', type=int, nargs='+', default=[5, 10])
+    args = parser.parse_args()
+
+    service, _ = build_lexer_dfa(parse_yal_file(args.yal)['alternatives'])
+    dfa = service.compiled()
+
+    print(f"{'MB':>6} {'tokens':>10} {'scan_input (s)':>15} {'translated (s)':>15}"
+          f" {'traducción (s)':>15} {'aceleración':>12}")
+    for megabytes in args.mb:
+        corpus = scaled_corpus(args.input, megabytes)
+        size = len(corpus.encode('utf-8')) / (1024 * 1024)
+        expected, plain = time_it(service.scan_input, corpus)
+        tokens, translated = time_it(service.scan_translated, corpus)
+        _, translation = time_it(dfa.class_codes, corpus)
+        if tokens != expected:
+            raise SystemExit("scan_translated produjo tokens distintos")
+        print(f"{size:>6.1f} {len(tokens):>10} {plain:>15.3f} {translated:>15.3f}"
+              f" {translation:>15.3f} {plain / translated:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
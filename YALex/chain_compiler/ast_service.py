@@ -1,23 +1,60 @@
-from chain_compiler.tools.ast_builder import build_ast
+from chain_compiler.tools.ast_builder import build_ast, balance_alternations
+from chain_compiler.model.ast_node import ASTNode
+from chain_compiler.normalizer import normalize_regex
+from chain_compiler.parser import parse_tokens
 from graphviz import Digraph
 
-def generate_ast(postfix_tokens):
-    ast = build_ast(postfix_tokens)
+def generate_ast(postfix_tokens, balanced=True):
+    ast = build_ast(postfix_tokens, balanced=balanced)
     return ast
+
+
+def generate_rule_ast(pattern):
+    """AST de un solo patrón limpio (ver clean_regex_part), sin marcador de fin."""
+    return build_ast(parse_tokens(normalize_regex(f"({pattern})")))
+
+
+def generate_rules_ast(patterns):
+    """
+    AST de la unión de las reglas de un lexer, en orden de prioridad.
+
+    Cada patrón se analiza por separado y se concatena con una hoja END que
+    lleva el índice de su regla. El marcador queda fuera del alfabeto (no es
+    un carácter), así que no choca con la entrada y el número de reglas no
+    tiene más límite que la memoria. La unión se balancea (ver
+    balance_alternations) para no tener un árbol de profundidad lineal en
+    especificaciones grandes.
+    """
+    alternatives = [
+        ASTNode('OPERATOR', '&', [
+            generate_rule_ast(pattern),
+            ASTNode('END', idx),
+        ])
+        for idx, pattern in enumerate(patterns)
+    ]
+    if not alternatives:
+        return build_ast([])
+    ast = alternatives[0]
+    for alternative in alternatives[1:]:
+        ast = ASTNode('OPERATOR', '|', [ast, alternative])
+    return balance_alternations(ast)
   
 
 def build_ast_graph(ast, graph=None, parent=None):
     if graph is None:
         graph = Digraph()
     
-    node_id = str(id(ast))
-    label = f"{ast.value}\n({ast.type})"
-    graph.node(node_id, label)
-    
-    if parent:
-        graph.edge(str(id(parent)), node_id)
-    
-    for child in ast.children:
-        build_ast_graph(child, graph, ast)
+    # Pila explícita de (nodo, padre): no hay límite de recursión
+    stack = [(ast, parent)]
+    while stack:
+        node, node_parent = stack.pop()
+        node_id = str(id(node))
+        label = f"{node.label()}\n({node.type})"
+        graph.node(node_id, label)
+        
+        if node_parent:
+            graph.edge(str(id(node_parent)), node_id)
+        
+        stack.extend((child, node) for child in reversed(node.children))
     
     return graph
\ No newline at end of file
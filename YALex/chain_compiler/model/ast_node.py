@@ -1,18 +1,45 @@
+from chain_compiler.model.charset import describe
+
+
 class ASTNode:
     def __init__(self, node_type, value, children=None):
         self.type = node_type
         self.value = value
         self.children = children if children is not None else []
     
+    def label(self):
+        """Valor del nodo para mostrar (los CHARSET se ven como [a-z])."""
+        if self.type == 'CHARSET':
+            return describe(self.value)
+        if self.type == 'END':
+            return f"#{self.value}"
+        return f"{self.value}"
+
     def __repr__(self):
-        if self.children:
-            return f"{self.value}({', '.join(repr(child) for child in self.children)})"
-        else:
-            return f"{self.value}"
+        # Pila explícita de nodos y fragmentos de texto: seguro para árboles
+        # muy profundos y lineal en el tamaño del resultado
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif not item.children:
+                parts.append(item.label())
+            else:
+                parts.append(f"{item.value}(")
+                stack.append(")")
+                for i, child in enumerate(reversed(item.children)):
+                    if i:
+                        stack.append(", ")
+                    stack.append(child)
+        return "".join(parts)
     
     def pretty_print(self, level=0):
-        indent = '  ' * level
-        result = f"{indent}{self.type}: {self.value}\n"
-        for child in self.children:
-            result += child.pretty_print(level + 1)
-        return result
\ No newline at end of file
+        lines = []
+        stack = [(self, level)]
+        while stack:
+            node, depth = stack.pop()
+            lines.append(f"{'  ' * depth}{node.type}: {node.label()}\n")
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+        return ''.join(lines)
\ No newline at end of file
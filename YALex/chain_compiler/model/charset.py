@@ -0,0 +1,44 @@
+"""
+Conjuntos de caracteres representados como intervalos de code points.
+
+Un charset es una tupla ordenada de pares (inicio, fin), ambos inclusivos,
+sin solapamientos ni intervalos contiguos: p.ej. [a-zA-Z_] es
+((65, 90), (95, 95), (97, 122)).
+"""
+
+MAX_CODE = 0x10FFFF  # último code point de Unicode
+
+
+def to_intervals(chars):
+    """Convierte un iterable de caracteres en la tupla de intervalos equivalente."""
+    intervals = []
+    for code in sorted({ord(c) for c in chars}):
+        if intervals and intervals[-1][1] == code - 1:
+            intervals[-1][1] = code
+        else:
+            intervals.append([code, code])
+    return tuple((lo, hi) for lo, hi in intervals)
+
+
+def complement(intervals):
+    """Intervalos de todos los code points (0..MAX_CODE) que no están en el charset."""
+    result = []
+    start = 0
+    for lo, hi in intervals:
+        if lo > start:
+            result.append((start, lo - 1))
+        start = hi + 1
+    if start <= MAX_CODE:
+        result.append((start, MAX_CODE))
+    return tuple(result)
+
+
+def describe(intervals):
+    """Representación legible estilo clase de regex, p.ej. [0-9a-f]."""
+    parts = []
+    for lo, hi in intervals:
+        if lo == hi:
+            parts.append(repr(chr(lo))[1:-1])
+        else:
+            parts.append(f"{repr(chr(lo))[1:-1]}-{repr(chr(hi))[1:-1]}")
+    return "[" + "".join(parts) + "]"
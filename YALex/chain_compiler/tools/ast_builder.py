@@ -1,7 +1,7 @@
-import copy
 from chain_compiler.model.ast_node import ASTNode
 from chain_compiler.model.operator import OPERATORS
-from string import printable
+from chain_compiler.model.charset import to_intervals, complement
+from chain_compiler.tools.super_regex_builder import DEFAULT_SENTINEL
 
 def expand_char_class(token):
     content = token.value[1:-1]              # e.g. "^\\n" o "\\t0-9]"
@@ -9,7 +9,6 @@ def expand_char_class(token):
     if is_negated:
         content = content[1:]
 
-    from string import printable
     char_set = set()
     i = 0
     while i < len(content):
@@ -38,23 +37,24 @@ def expand_char_class(token):
             char_set.add(content[i])
             i += 1
 
+    # Una sola hoja CHARSET con los intervalos de code points, en lugar de
+    # una cadena de uniones con una hoja por carácter
+    intervals = to_intervals(char_set)
     if is_negated:
-        all_chars = set(printable)
-        char_set = all_chars - char_set
+        # La negación es sobre todo Unicode (no sólo ASCII imprimible); el
+        # sentinel de fin de entrada nunca forma parte de un token
+        intervals = complement(to_intervals(char_set | {DEFAULT_SENTINEL}))
+    return ASTNode('CHARSET', intervals)
 
-    # Convertimos el set final a AST de unión
-    sorted_chars = sorted(char_set)
-    union_ast = ASTNode('CHAR', sorted_chars[0])
-    for ch in sorted_chars[1:]:
-        union_ast = ASTNode('OPERATOR', '|', [union_ast, ASTNode('CHAR', ch)])
-
-    return union_ast
-
-def build_ast(postfix_tokens):
+def build_ast(postfix_tokens, balanced=True):
     """
     Construye un AST a partir de tokens en notación postfix.
     
     Se hacen ajustes para manejar casos donde la expresión no está perfectamente formada.
+    Por defecto las cadenas de '|' se reordenan como árboles balanceados (ver
+    balance_alternations): una cadena izquierda de n alternativas copia
+    firstpos/lastpos cada vez más grandes en cada nivel. balanced=False deja
+    el árbol tal como sale del postfix.
     """
     stack = []
     
@@ -84,13 +84,8 @@ def build_ast(postfix_tokens):
                         # Si no hay suficientes operandos, continuamos con el siguiente token
                         continue
                     child = stack.pop()
-                    if op == '+':
-                        node = ASTNode('OPERATOR', '&', [
-                            child,
-                            ASTNode('OPERATOR', '*', [copy.deepcopy(child)])
-                        ])
-                    else:
-                        node = ASTNode('OPERATOR', op, [child])
+                    # '+' se conserva como nodo unario propio (sin copiar X)
+                    node = ASTNode('OPERATOR', op, [child])
                     stack.append(node)
                 elif operator.arity == 2:
                     if len(stack) < 2:
@@ -116,4 +111,51 @@ def build_ast(postfix_tokens):
         node = ASTNode('OPERATOR', '|', [left, right])
         stack.append(node)
     
-    return stack[0]
\ No newline at end of file
+    if balanced:
+        return balance_alternations(stack[0])
+    return stack[0]
+
+
+def _flatten_alternation(node):
+    """Alternativas (de izquierda a derecha) de una cadena de nodos '|'."""
+    alternatives = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.type == 'OPERATOR' and current.value == '|':
+            stack.extend(reversed(current.children))
+        else:
+            alternatives.append(current)
+    return alternatives
+
+
+def balance_alternations(ast):
+    """
+    Reemplaza cada cadena de '|' por un árbol balanceado con las mismas
+    alternativas en el mismo orden.
+
+    Un .yal con miles de reglas produce una unión degenerada
+    ((a|b)|c)|… de profundidad lineal; al balancearla la profundidad queda
+    en O(log n) y las uniones de firstpos/lastpos dejan de copiar conjuntos
+    cada vez más grandes en cada nivel. El lenguaje y el orden de las hojas
+    (y por tanto la numeración de posiciones) no cambian. Modifica el árbol
+    en su lugar y lo devuelve.
+    """
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node.type == 'OPERATOR' and node.value == '|':
+            alternatives = _flatten_alternation(node)
+            # Se combinan pares adyacentes hasta que queda un solo nodo
+            level = alternatives
+            while len(level) > 2:
+                paired = [
+                    ASTNode('OPERATOR', '|', level[i:i + 2]) if i + 1 < len(level) else level[i]
+                    for i in range(0, len(level), 2)
+                ]
+                level = paired
+            node.children = level
+            stack.extend(alternatives)
+        else:
+            stack.extend(node.children)
+    return ast
\ No newline at end of file
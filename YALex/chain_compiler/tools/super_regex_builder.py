@@ -5,6 +5,12 @@ import re
 # Marcador que nunca aparece en un programa “real”:
 DEFAULT_SENTINEL = '\x00'
 
+# Tokens que se descartan si ninguna regla del .yal lo indica explícitamente
+DEFAULT_IGNORED = ('WHITESPACE', 'COMMENT')
+
+# “return XXX” dentro de la acción de una regla
+RETURN_RE = re.compile(r'return\s+([A-Za-z_]\w*)')
+
 def clean_regex_part(raw: str) -> str:
     """
     Toma la “raw pattern” que viene desde el .yal y la regresa lista para concatenar:
@@ -44,6 +50,37 @@ def clean_regex_part(raw: str) -> str:
 
 
 
+def ignored_tokens(rules):
+    """
+    Tipos de token que el lexer debe descartar según el .yal.
+
+    Una regla cuya acción no tiene `return` no produce token (como en lex,
+    donde la acción simplemente continúa escaneando). rule_patterns les
+    asigna el nombre 'UNKNOWN', que se descarta además de DEFAULT_IGNORED:
+    los espacios y comentarios que sí retornan su token se siguen filtrando,
+    como en el lexer generado original.
+    """
+    ignored = set(DEFAULT_IGNORED)
+    if any(not RETURN_RE.search(action) for _, action in rules):
+        ignored.add('UNKNOWN')
+    return ignored
+
+
+def rule_patterns(rules):
+    """
+    Patrones limpios (ver clean_regex_part) y nombres de token de las reglas
+    (raw_pattern, action_string), en el orden del .yal. Una acción sin
+    “return XXX” produce el nombre 'UNKNOWN'.
+    """
+    patterns    = []
+    token_names = []
+    for raw_pattern, action in rules:
+        patterns.append(clean_regex_part(raw_pattern))
+        m = RETURN_RE.search(action)
+        token_names.append(m.group(1) if m else 'UNKNOWN')
+    return patterns, token_names
+
+
 def build_super_regex(rules, sentinel: str = DEFAULT_SENTINEL):
     """
     Cada elemento de `rules` es (raw_pattern, action_string). Queremos:
@@ -55,23 +92,18 @@ def build_super_regex(rules, sentinel: str = DEFAULT_SENTINEL):
 
     El OR resultante debe *respetar* el orden exacto en que aparecen las líneas
     dentro de ejemplo3.yal, de arriba hacia abajo.
-    """
-    parts       = []
-    token_names = []
-
-    for idx, (raw_pattern, action) in enumerate(rules):
-        cleaned = clean_regex_part(raw_pattern)
 
-        #  Extraer “return XXX” de la acción para saber el nombre de token:
-        m = re.search(r'return\s+([A-Za-z_]\w*)', action)
-        tok = m.group(1) if m else 'UNKNOWN'
-        token_names.append(tok)
-
-        marker = chr(1 + idx)   # chr(1), chr(2), ... chr(N)
+    Los marcadores son caracteres: chocan con los de la entrada (la regla 9
+    termina en '\\t', la 10 en '\\n') y alcanzan los imprimibles pasadas 31
+    reglas. Se conserva para depurar; los lexers se construyen con
+    chain_compiler.ast_service.generate_rules_ast, cuyos marcadores son hojas
+    END fuera del alfabeto.
+    """
+    patterns, token_names = rule_patterns(rules)
 
-        # Lo envolvemos en paréntesis para que no cambie la precedencia:
-        # Ejemplo: si cleaned = "if", ponemos "(if)\x02".
-        parts.append(f"({cleaned}){marker}")
+    # Lo envolvemos en paréntesis para que no cambie la precedencia:
+    # Ejemplo: si el patrón es "if", ponemos "(if)\x02".
+    parts = [f"({cleaned}){chr(1 + idx)}" for idx, cleaned in enumerate(patterns)]
 
     # Finalmente, agrego la alternativa que solo es el sentinel:
     parts.append(f"({re.escape(sentinel)})")
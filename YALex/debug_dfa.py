@@ -1,10 +1,8 @@
 # debug_dfa.py
 
 from chain_compiler.tools.yal_parser       import parse_yal_file
-from chain_compiler.tools.super_regex_builder import build_super_regex
-from chain_compiler.normalizer             import normalize_regex
-from chain_compiler.parser                 import parse_tokens
-from chain_compiler.ast_service            import generate_ast
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from chain_compiler.ast_service            import generate_rules_ast
 from afd_compiler.service                  import AFDService
 
 # 1) Parsear el .yal
@@ -12,14 +10,12 @@ info = parse_yal_file("ejemplo3.yal")
 alts = info["alternatives"]
 print("Alternativas detectadas:", [pat for pat,_ in alts])
 
-# 2) Generar super-regex + token_names
-super_regex, token_names = build_super_regex(alts)
+# 2) Limpiar los patrones + token_names
+patterns, token_names = rule_patterns(alts)
 print("Token names:", token_names)
 
-# 3) De la regex al AST
-tokens_norm = normalize_regex(super_regex)
-postfix     = parse_tokens(tokens_norm)
-ast         = generate_ast(postfix)
+# 3) De las reglas al AST (una hoja END al final de cada regla)
+ast = generate_rules_ast(patterns)
 
 # 4) Construir el DFA sin minimizarlo
 afd_svc = AFDService()
@@ -1,31 +1,28 @@
 # debug_pipeline.py
 
 from chain_compiler.tools.yal_parser       import parse_yal_file
-from chain_compiler.tools.super_regex_builder import build_super_regex
+from chain_compiler.tools.super_regex_builder import rule_patterns
 from chain_compiler.normalizer             import normalize_regex
 from chain_compiler.parser                 import parse_tokens
-from chain_compiler.ast_service            import generate_ast
+from chain_compiler.ast_service            import generate_rules_ast
 from afd_compiler.service                  import AFDService
 
-# Paso 1: Parsear .yal y construir super-regex
+# Paso 1: Parsear .yal y limpiar los patrones de cada regla
 info = parse_yal_file("ejemplo3.yal")
 alts = info["alternatives"]
 print("Alternativas detectadas:", [pat for pat,_ in alts])
-super_regex, token_names = build_super_regex(alts)
-print("Token names:", token_names)
+patterns, token_names = rule_patterns(alts)
 print("⎯⎯ Token names:", token_names)
-print("⎯⎯ Super-regex:", super_regex, "\n")
+print("⎯⎯ Patrones:", patterns, "\n")
 
-# Paso 2: Normalizar la regex
-tokens_norm = normalize_regex(super_regex)
-print("⎯⎯ normalize_regex →", tokens_norm, "\n")
-
-# Paso 3: Convertir a postfix
-postfix = parse_tokens(tokens_norm)
-print("⎯⎯ parse_tokens (postfix) →", [t.value if hasattr(t, "value") else t for t in postfix], "\n")
+# Paso 2: Normalizar y pasar a postfix cada regla (se hace por separado)
+for pattern in patterns:
+    postfix = parse_tokens(normalize_regex(f"({pattern})"))
+    print(f"⎯⎯ {pattern!r} (postfix) →", [t.value if hasattr(t, "value") else t for t in postfix])
+print()
 
-# Paso 4: Generar AST y visualizar
-ast = generate_ast(postfix)
+# Paso 3-4: Generar el AST de la unión (cada regla termina en una hoja END) y visualizarlo
+ast = generate_rules_ast(patterns)
 print("⎯⎯ AST pretty_print:\n", ast.pretty_print(), "\n")
 
 # Paso 5: Construir DFA sin minimizar
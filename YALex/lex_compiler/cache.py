@@ -0,0 +1,192 @@
+# YALEX/lex_compiler/cache.py
+
+"""
+Caché en disco de AFDs compilados, direccionada por contenido.
+
+La clave es un hash de las reglas normalizadas (los patrones y los nombres
+de token que produce rule_patterns) junto con COMPILER_VERSION, de modo
+que regenerar el mismo lexer no repite regex → AST → AFD → minimización.
+
+Los fragmentos por regla (RuleFragment) se guardan aparte bajo el hash de
+su patrón, en memoria (ver FragmentCache) y en el mismo directorio que los
+AFDs: al editar una regla de una especificación grande sólo se recalcula su
+fragmento, también en otro proceso, y el AFD se vuelve a ensamblar desde los
+fragmentos sin pasar por una super-regex de texto.
+
+Cada entrada es el CompiledDFA (o el RuleFragment) serializado con
+to_dict(), en JSON compacto comprimido con zlib. Las escrituras son atómicas (archivo temporal en el mismo
+directorio + os.replace), así varios procesos pueden compartir la caché; el
+tamaño total se limita desalojando las entradas menos usadas (por mtime, que
+se actualiza en cada acierto).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from collections import OrderedDict
+
+from afd_compiler.models.compiled_dfa import CompiledDFA
+from afd_compiler.models.fragment import RuleFragment
+
+# Incrementar cuando cambie la construcción del AFD o el formato de las
+# tablas: invalida todas las entradas anteriores.
+COMPILER_VERSION = "2"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_FRAGMENTS = 4096
+ENTRY_SUFFIX = ".dfa"
+FRAGMENT_SUFFIX = ".frag"
+
+
+def default_cache_dir():
+    """Directorio de la caché: $YALEX_CACHE_DIR o ~/.cache/yalex."""
+    configured = os.environ.get("YALEX_CACHE_DIR")
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "yalex")
+
+
+def rules_key(patterns, token_names, keywords=False):
+    """
+    Hash (hex) de las reglas normalizadas y la versión del compilador (y del
+    modo de palabras reservadas, que cambia el AFD resultante).
+    """
+    parts = [COMPILER_VERSION, list(patterns), list(token_names)]
+    if keywords:
+        parts.append("keywords")
+    payload = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fragment_key(pattern):
+    """Hash (hex) de un patrón limpio y la versión del compilador."""
+    payload = json.dumps([COMPILER_VERSION, pattern], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """Caché LRU en memoria de RuleFragment, por hash del patrón."""
+    def __init__(self, max_entries=DEFAULT_MAX_FRAGMENTS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Devuelve el fragmento guardado bajo `key`, o None si no está."""
+        fragment = self._entries.get(key)
+        if fragment is not None:
+            self._entries.move_to_end(key)
+        return fragment
+
+    def put(self, key, fragment):
+        """Guarda `fragment` bajo `key` y desaloja los menos usados."""
+        self._entries[key] = fragment
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class DFACache:
+    """
+    Caché LRU en disco de CompiledDFA (y de RuleFragment) con tamaño máximo
+    en bytes.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, key, suffix=ENTRY_SUFFIX):
+        return os.path.join(self.directory, key + suffix)
+
+    def _load(self, path):
+        """Contenido de la entrada en `path`, o None si no sirve."""
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except (OSError, ValueError, zlib.error):
+            # Ausente, desalojada por otro proceso o corrupta: se recompila
+            return None
+        if data.get("version") != COMPILER_VERSION:
+            return None
+        try:
+            os.utime(path)      # marca de uso reciente para el LRU
+        except OSError:
+            pass
+        return data
+
+    def get(self, key):
+        """Devuelve el CompiledDFA guardado bajo `key`, o None si no está."""
+        data = self._load(self._path(key))
+        return CompiledDFA.from_dict(data["dfa"]) if data is not None else None
+
+    def put(self, key, compiled):
+        """Guarda `compiled` bajo `key` de forma atómica y aplica el límite de tamaño."""
+        self._store(self._path(key), {"version": COMPILER_VERSION, "dfa": compiled.to_dict()})
+        self.evict()
+
+    def get_fragment(self, key):
+        """Devuelve el RuleFragment guardado bajo `key` (ver fragment_key), o None."""
+        data = self._load(self._path(key, FRAGMENT_SUFFIX))
+        return RuleFragment.from_dict(data["fragment"]) if data is not None else None
+
+    def put_fragment(self, key, fragment):
+        """
+        Guarda `fragment` bajo `key` de forma atómica. No aplica el límite de
+        tamaño: quien guarda varios fragmentos llama a evict() al terminar.
+        """
+        self._store(
+            self._path(key, FRAGMENT_SUFFIX),
+            {"version": COMPILER_VERSION, "fragment": fragment.to_dict()},
+        )
+
+    def _store(self, path, data):
+        """Escribe `data` en `path` de forma atómica."""
+        os.makedirs(self.directory, exist_ok=True)
+        blob = zlib.compress(
+            json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes."""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith((ENTRY_SUFFIX, FRAGMENT_SUFFIX)):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass        # otro proceso ya la borró
+            total -= size
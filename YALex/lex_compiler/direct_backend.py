@@ -0,0 +1,290 @@
+# YALEX/lex_compiler/direct_backend.py
+
+"""
+Backend "direct-coded" del lexer generado.
+
+En lugar de recorrer la tabla de transiciones, el AFD minimizado se emite
+como una única función de Python, `scan_direct`, con un bloque de código por
+estado:
+
+* el lazo sobre sí mismo (si existe) compara el primer carácter contra los
+  rangos del lazo y salta el resto de la racha con el patrón precompilado
+  del estado (CompiledDFA.run_matchers);
+* la salida hacia otro estado es un árbol de ``if`` sobre rangos de
+  caracteres (búsqueda binaria);
+* sólo los estados de aceptación actualizan la última aceptación.
+
+Los estados con un único punto de entrada (típicamente los prefijos de las
+palabras reservadas) y los que no tienen salidas se escriben anidados donde
+se salta a ellos; el resto se alcanza asignando `state` y despachando por
+número de estado. Así el ciclo interno no hace búsquedas en diccionarios ni
+índices en la tabla.
+
+Como `scan_tokens`, lleva la memoria de pares (estado, posición) fallidos
+(ver scanner._mark_failed): cada bloque de un estado de no aceptación con
+salidas se corta si su par ya falló, y tras un retroceso se anotan los pares
+recorridos, así que las entradas adversarias no vuelven a leerse y el
+escaneo sigue siendo lineal.
+"""
+
+from afd_compiler.models.compiled_dfa import DEAD
+
+# Hasta cuántas alternativas se prueban en secuencia antes de partir la
+# comparación en una búsqueda binaria
+LINEAR_BRANCHES = 4
+
+# Profundidad máxima de estados anidados (Python limita la indentación)
+MAX_INLINE_DEPTH = 6
+
+SCAN_DIRECT_GLOBALS = '''RUNS = dfa.run_matchers()
+KEYWORDS = dfa.keywords
+TABLE = dfa.table
+STRIDE = dfa.num_classes
+WIDTH = dfa.num_states
+CLASS_OF = dfa.class_of
+
+
+'''
+
+SCAN_DIRECT_HEAD = '''
+def scan_direct(text, skip=frozenset()):
+    """Igual que scan_tokens(dfa, text, skip), con el AFD escrito como código."""
+    skip_errors = "ERROR" in skip
+    tokens = []
+    append = tokens.append
+    n = len(text)
+    failed = set()
+    high = 0                # posición más lejana leída
+    index = 0
+    while index < n:
+        if text[index] == SENTINEL:
+            break
+        if failed and index >= high:
+            # Ningún escaneo vuelve detrás de la posición más lejana leída
+            failed.clear()
+        i = index
+        last_end = -1
+        last_token = None
+        state = 0
+        while True:
+'''
+
+SCAN_DIRECT_TAIL = '''
+        start = last_end if last_end > index else index
+        if i > start:
+            # Hubo retroceso: se anotan los pares recorridos tras `start`
+            # (como _mark_failed), que no vuelven a leerse
+            state = 0
+            for j in range(index, i):
+                if j >= start:
+                    failed.add(j * WIDTH + state)
+                state = TABLE[state * STRIDE + CLASS_OF(text[j])]
+            failed.add(i * WIDTH + state)
+            if i >= high:
+                high = i + 1
+        if last_end > index:
+            if last_token in KEYWORDS:
+                last_token = KEYWORDS[last_token].get(text[index:last_end], last_token)
+            if last_token not in skip:
+                append((last_token, text[index:last_end]))
+            index = last_end
+        else:
+            if not skip_errors:
+                append(("ERROR", text[index]))
+            index += 1
+    return tokens
+'''
+
+BODY_INDENT = 12
+
+
+def _targets(compiled, state):
+    """Intervalos (lo, hi) de caracteres que llevan a cada estado destino."""
+    stride = compiled.num_classes
+    by_target = {}
+    for k, members in enumerate(compiled.classes):
+        target = compiled.table[state * stride + k]
+        if target == DEAD:
+            continue
+        by_target.setdefault(target, []).extend(members)
+
+    merged = {}
+    for target, intervals in by_target.items():
+        result = []
+        for lo, hi in sorted(intervals):
+            if result and result[-1][1] + 1 >= lo:
+                result[-1] = (result[-1][0], max(result[-1][1], hi))
+            else:
+                result.append((lo, hi))
+        merged[target] = result
+    return merged
+
+
+def _condition(intervals):
+    """Expresión booleana que prueba si `c` cae en alguno de los intervalos."""
+    tests = []
+    for lo, hi in intervals:
+        if lo == hi:
+            tests.append(f"c == {chr(lo)!r}")
+        else:
+            tests.append(f"{chr(lo)!r} <= c <= {chr(hi)!r}")
+    return " or ".join(tests)
+
+
+class _Emitter:
+    """Arma el cuerpo de `scan_direct` a partir de un CompiledDFA."""
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.targets = [_targets(compiled, s) for s in range(compiled.num_states)]
+
+        # Puntos de entrada de cada estado: rangos desde otros estados
+        entries = [0] * compiled.num_states
+        for source, targets in enumerate(self.targets):
+            for target, intervals in targets.items():
+                if target != source:
+                    entries[target] += len(intervals)
+        self.entries = entries
+
+        self.dispatched = self.plan()
+
+    def is_leaf(self, state):
+        return not self.targets[state]
+
+    def plan(self):
+        """
+        Estados que se alcanzan por número (`state = N`) en lugar de anidarse.
+
+        Se anidan los estados sin salidas y los que tienen un único punto de
+        entrada, mientras no superen MAX_INLINE_DEPTH niveles.
+        """
+        inline = [
+            s != 0 and (self.is_leaf(s) or self.entries[s] == 1)
+            for s in range(self.compiled.num_states)
+        ]
+        dispatched = {0}
+        for source, targets in enumerate(self.targets):
+            for target in targets:
+                if target != source and not inline[target]:
+                    dispatched.add(target)
+
+        stack = [(state, 0) for state in dispatched]
+        while stack:
+            state, depth = stack.pop()
+            for target in self.targets[state]:
+                if target == state or target in dispatched or self.is_leaf(target):
+                    continue
+                if depth + 1 > MAX_INLINE_DEPTH:
+                    dispatched.add(target)
+                    stack.append((target, 0))
+                else:
+                    stack.append((target, depth + 1))
+        return dispatched
+
+    def state_block(self, state, indent):
+        """Código del estado: lazo, aceptación y salidas. Termina en break/continue."""
+        pad = " " * indent
+        targets = dict(self.targets[state])
+        loop = targets.pop(state, None)
+        token = self.compiled.accept[state]
+
+        lines = []
+        if loop:
+            # El primer carácter se prueba aquí; si sigue en el lazo, el resto
+            # de la racha lo salta el patrón precompilado del estado
+            lines += [
+                f"{pad}if i < n:",
+                f"{pad}    c = text[i]",
+                f"{pad}    if {_condition(loop)}:",
+                f"{pad}        i = RUNS[{state}](text, i + 1).end()",
+            ]
+        if token is not None:
+            lines += [f"{pad}last_end = i", f"{pad}last_token = {token!r}"]
+        if targets and token is None:
+            # Desde un par ya fallido no se llega a otra aceptación. Tras la
+            # última aceptación todos los estados recorridos son de no
+            # aceptación, así que basta con probar en ellos
+            lines += [
+                f"{pad}if i < high and i * {self.compiled.num_states} + {state} in failed:",
+                f"{pad}    break",
+            ]
+        if targets:
+            ranges = sorted(
+                (lo, hi, target) for target, intervals in targets.items() for lo, hi in intervals
+            )
+            lines += [f"{pad}if i < n:", f"{pad}    c = text[i]"]
+            lines += self.branches(ranges, indent + 4)
+        lines.append(f"{pad}break")
+        return lines
+
+    def jump(self, target, indent):
+        """Código tras consumir el carácter que lleva a `target`."""
+        pad = " " * indent
+        lines = [f"{pad}i += 1"]
+        if target not in self.dispatched:
+            return lines + self.state_block(target, indent)
+        return lines + [f"{pad}state = {target}", f"{pad}continue"]
+
+    def branches(self, ranges, indent):
+        """Árbol de comparaciones sobre los rangos (lo, hi, destino) ordenados."""
+        pad = " " * indent
+        if len(ranges) <= LINEAR_BRANCHES:
+            lines = []
+            for lo, hi, target in ranges:
+                lines.append(f"{pad}if {_condition([(lo, hi)])}:")
+                lines += self.jump(target, indent + 4)
+            return lines
+        mid = len(ranges) // 2
+        return (
+            [f"{pad}if c < {chr(ranges[mid][0])!r}:"]
+            + self.branches(ranges[:mid], indent + 4)
+            + [f"{pad}else:"]
+            + self.branches(ranges[mid:], indent + 4)
+        )
+
+    def dispatch(self, states, indent):
+        """Árbol de comparaciones sobre el número de estado."""
+        pad = " " * indent
+        if len(states) <= LINEAR_BRANCHES:
+            lines = []
+            for k, state in enumerate(states):
+                if k == 0:
+                    lines.append(f"{pad}if state == {state}:")
+                elif k < len(states) - 1:
+                    lines.append(f"{pad}elif state == {state}:")
+                else:
+                    lines.append(f"{pad}else:")
+                lines += self.state_block(state, indent + 4)
+            return lines
+        mid = len(states) // 2
+        return (
+            [f"{pad}if state < {states[mid]}:"]
+            + self.dispatch(states[:mid], indent + 4)
+            + [f"{pad}else:"]
+            + self.dispatch(states[mid:], indent + 4)
+        )
+
+    def body(self):
+        """Cuerpo del `while True` de `scan_direct`; el estado inicial va primero."""
+        pad = " " * BODY_INDENT
+        lines = [f"{pad}if state == 0:"]
+        lines += self.state_block(0, BODY_INDENT + 4)
+        others = sorted(self.dispatched - {0})
+        if others:
+            lines.append(f"{pad}else:")
+            lines += self.dispatch(others, BODY_INDENT + 4)
+        return lines
+
+
+def generate_direct_source(compiled):
+    """
+    Devuelve el código fuente del escáner direct-coded para `compiled`.
+
+    Define `scan_direct(text, skip)`, que produce la misma salida que
+    `scan_tokens(dfa, text, skip)`. El código resultante necesita `SENTINEL`
+    y `dfa` (el mismo autómata, para los patrones de los lazos, la tabla de
+    palabras reservadas y la tabla con la que se anotan los pares fallidos)
+    definidos en el módulo.
+    """
+    body = _Emitter(compiled).body()
+    return (SCAN_DIRECT_GLOBALS + SCAN_DIRECT_HEAD.lstrip("\n")
+            + "\n".join(body) + "\n" + SCAN_DIRECT_TAIL)
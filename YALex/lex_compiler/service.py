@@ -1,54 +1,361 @@
 # YALEX/lex_compiler/service.py
 
-from chain_compiler.tools.super_regex_builder import build_super_regex, DEFAULT_SENTINEL
+import inspect
+import re
 
-def generate_lexer_py(yal_info: dict, output_path: str):
+from chain_compiler.tools.super_regex_builder import rule_patterns, ignored_tokens, DEFAULT_SENTINEL
+from chain_compiler.ast_service import generate_rule_ast
+from afd_compiler.service import AFDService
+from afd_compiler.models import compiled_dfa, lazy_dfa, token_stream
+from afd_compiler.models.fragment import RuleFragment
+from afd_compiler.services import (
+    byte_scanner, lazy_scanner, scanner, stream_scanner
+)
+from lex_compiler.cache import FragmentCache, fragment_key, rules_key
+from lex_compiler.direct_backend import generate_direct_source
+
+# Entrypoints que puede llevar el lexer generado además de entrypoint(); el
+# código de cada uno (ver runtime_modules) sólo se incrusta si se pide
+ENTRYPOINTS = ('entrypoint_offsets', 'entrypoint_stream', 'entrypoint_spans')
+DEFAULT_ENTRYPOINTS = ('entrypoint_offsets',)
+
+# Estados del AFD completo a partir de los cuales se usa un AFD perezoso
+DEFAULT_MAX_STATES = 1 << 15
+
+# Línea "IGNORE A B ..." de una gramática .yalp (misma forma que
+# YAPar.grammar_parser.IGNORE_RE); sólo se buscan antes del separador %%
+IGNORE_RE = re.compile(r'^\s*IGNORE\s+(.+)$')
+SEP_RE = re.compile(r'^\s*%%\s*$')
+
+# Fragmentos de regla ya compilados en este proceso (ver FragmentCache)
+FRAGMENTS = FragmentCache()
+
+
+def read_grammar_ignore(path):
     """
-    Genera un archivo .py que implemente el lexer definido en yal_info,
-    usando el DFA interno para el escaneo.
+    Tipos de token declarados en las líneas IGNORE de una gramática .yalp, o
+    None si no hay ninguna (IGNORE es opcional: se usan los del .yal, ver
+    ignored_tokens).
+    """
+    ignore = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if SEP_RE.match(line):
+                break
+            m = IGNORE_RE.match(line)
+            if m:
+                ignore = (ignore or set()) | set(m.group(1).split())
+    return ignore
+
+
+def compile_fragment(pattern):
+    """Analiza un patrón limpio y calcula su tabla de posiciones."""
+    return RuleFragment.from_ast(generate_rule_ast(pattern))
+
+
+def rule_fragments(patterns, fragments=None, cache=None):
+    """
+    Fragmento de cada patrón, tomado de `fragments` (por defecto, FRAGMENTS)
+    o de la caché en disco `cache` (DFACache), o compilado y guardado en
+    ambas si el patrón no estaba.
+    """
+    if fragments is None:
+        fragments = FRAGMENTS
+    result = []
+    written = False
+    for pattern in patterns:
+        key = fragment_key(pattern)
+        fragment = fragments.get(key)
+        if fragment is None:
+            if cache is not None:
+                fragment = cache.get_fragment(key)
+            if fragment is None:
+                fragment = compile_fragment(pattern)
+                if cache is not None:
+                    cache.put_fragment(key, fragment)
+                    written = True
+            fragments.put(key, fragment)
+        result.append(fragment)
+    if written:
+        cache.evict()
+    return result
+
+
+def keyword_table(patterns, token_names, fragments):
     """
+    Separa las reglas literales que una regla más general ya reconoce.
+
+    Una regla literal (p.ej. "while") que gana por prioridad a otra que
+    también acepta su cadena (típicamente la de identificadores) no aporta
+    lenguaje al AFD, sólo estados: se quita del autómata y se resuelve
+    después del match, buscando el lexema en la tabla de la regla que lo
+    reconoce. Como esa regla es la de mayor prioridad entre las restantes
+    que aceptan la cadena, el resultado es el mismo que con la regla en el
+    autómata.
+
+    Returns:
+        tuple: (índices de las reglas que quedan en el AFD, tabla
+        {token: {lexema: token de la palabra reservada}}).
+    """
+    literals = [fragment.literal() for fragment in fragments]
+    kept = []
+    keywords = {}
+    for i, word in enumerate(literals):
+        matching = None
+        if word is not None:
+            matching = [
+                j for j, other in enumerate(literals) if j != i and (
+                    other == word if other is not None else fragments[j].matches(word)
+                )
+            ]
+        if matching and min(matching) > i:
+            keywords.setdefault(token_names[min(matching)], {})[word] = token_names[i]
+        else:
+            kept.append(i)
+    return kept, keywords
+
+
+def build_lexer_dfa(alternatives, cache=None, fragments=None, max_states=DEFAULT_MAX_STATES,
+                    keywords=False):
+    """
+    Construye y minimiza el AFD de las reglas (pattern, action) de un .yal.
+
+    Cada regla se compila por separado a un RuleFragment, que se reutiliza
+    entre construcciones mientras el patrón no cambie; el AFD se ensambla a
+    partir de los fragmentos (ver build_from_fragments). Si el AFD completo
+    supera `max_states` estados, el servicio queda con un AFD perezoso
+    (afd_service.lazy), que no se minimiza ni se guarda en la caché.
+
+    Args:
+        alternatives (list): reglas (pattern, action) del .yal.
+        cache (DFACache, opcional): si se indica, el AFD compilado se busca
+            primero en la caché y, si no está, se guarda tras construirlo;
+            los fragmentos que falten en `fragments` también se buscan y
+            guardan ahí.
+        fragments (FragmentCache, opcional): caché de fragmentos; por
+            defecto, la del proceso (FRAGMENTS).
+        max_states (int, opcional): límite de estados del AFD completo; None
+            para construirlo siempre.
+        keywords (bool): si es True, las reglas literales que la regla de
+            identificadores ya reconoce quedan fuera del AFD y se resuelven
+            con una tabla de palabras reservadas (ver keyword_table).
+
+    Returns:
+        tuple: (AFDService con el AFD minimizado, token_names en orden de reglas).
+    """
+    patterns, token_names = rule_patterns(alternatives)
+    key = None
+    if cache is not None:
+        key = rules_key(patterns, token_names, keywords)
+        compiled = cache.get(key)
+        if compiled is not None:
+            afd_service = AFDService()
+            afd_service.load_compiled(compiled)
+            return afd_service, token_names
+
+    rules = rule_fragments(patterns, fragments, cache)
+    kept, table = list(range(len(rules))), {}
+    if keywords:
+        kept, table = keyword_table(patterns, token_names, rules)
+
+    afd_service = AFDService()
+    afd_service.build_dfa_from_fragments(
+        [rules[i] for i in kept], [token_names[i] for i in kept], max_states
+    )
+    if afd_service.lazy is not None:
+        afd_service.lazy.keywords = table
+        return afd_service, token_names
+    afd_service.minimize_dfa()
+    afd_service.compiled().keywords = table
+    if cache is not None:
+        cache.put(key, afd_service.compiled())
+    return afd_service, token_names
+
+
+def runtime_modules(entrypoints=DEFAULT_ENTRYPOINTS, backend='table', lazy=False):
+    """
+    Módulos cuyo código necesita el lexer generado, en orden de dependencia.
+
+    Sólo dependen de la librería estándar (y entre sí), por lo que el .py
+    resultante no necesita tener el paquete YALex en sys.path. El AFD
+    perezoso y los escáneres por bloques y sobre bytes se agregan sólo si
+    el AFD superó el límite de estados o se pide su entrypoint; el backend
+    direct sin otros entrypoints no usa ningún escáner de tabla.
+    """
+    modules = [compiled_dfa]
+    if lazy:
+        # Con el AFD perezoso todos los entrypoints pasan por scan_lazy
+        return modules + [lazy_dfa, token_stream, scanner, lazy_scanner]
+    if backend == 'table' or entrypoints:
+        modules += [token_stream, scanner]
+    if 'entrypoint_stream' in entrypoints:
+        modules.append(stream_scanner)
+    if 'entrypoint_spans' in entrypoints:
+        modules.append(byte_scanner)
+    return modules
+
+
+def runtime_source(modules):
+    """
+    Devuelve el código de `modules` a incrustar en el lexer generado,
+    sin las importaciones internas del paquete.
+    """
+    chunks = []
+    for module in modules:
+        lines = [
+            line for line in inspect.getsource(module).splitlines()
+            if not line.startswith('from .')
+        ]
+        chunks.append("\n".join(lines).strip() + "\n")
+    return "\n\n".join(chunks)
+
+
+def _write_table_entrypoints(f, afd_service, backend, entrypoints):
+    """Entrypoints del lexer generado sobre las tablas del AFD completo."""
+    # --- Escáner direct-coded: una función por estado del AFD ---
+    if backend == 'direct':
+        f.write("# " + "-" * 76 + "\n")
+        f.write("# Escáner direct-coded generado por YALex (no editar)\n")
+        f.write("# " + "-" * 76 + "\n\n")
+        f.write(generate_direct_source(afd_service.compiled()))
+        f.write("\n\n")
+    scan_call = "scan_direct(buffer + SENTINEL, SKIP)" if backend == 'direct' \
+        else "scan_tokens(dfa, buffer + SENTINEL, SKIP)"
+
+    # --- entrypoint con filtrado y sentinel fijo para el fin de token ---
+    f.write("def entrypoint(buffer: str):\n")
+    f.write("    \"\"\"Escanea el buffer y devuelve lista de (token, lexeme),\n")
+    f.write("       descartando IGNORED_TOKENS y errores léxicos.\"\"\"\n")
+    f.write("    # agregamos el sentinel para delimitar el final; los tokens de\n")
+    f.write("    # SKIP se saltan dentro del escáner, sin crear tuplas ni lexemas\n")
+    f.write(f"    return {scan_call}\n\n")
+
+    # --- entrypoint_offsets: tokens como offsets, lexemas perezosos ---
+    if 'entrypoint_offsets' in entrypoints:
+        f.write("def entrypoint_offsets(buffer: str, skip=IGNORED_TOKENS):\n")
+        f.write("    \"\"\"Escanea el buffer y devuelve un TokenStream sin los tokens de `skip`\n")
+        f.write("       (los errores se conservan para diagnósticos con línea/columna).\"\"\"\n")
+        f.write("    return scan_offsets(dfa, buffer + SENTINEL, token_names, skip)\n\n")
+
+    # --- entrypoint_stream: misma salida, leyendo el archivo por bloques ---
+    if 'entrypoint_stream' in entrypoints:
+        f.write("def entrypoint_stream(stream, chunk_size=DEFAULT_CHUNK_SIZE):\n")
+        f.write("    \"\"\"Escanea un archivo abierto (texto o binario) por bloques y produce\n")
+        f.write("       (token, lexeme) con el mismo filtrado que entrypoint().\"\"\"\n")
+        f.write("    return iter_tokens(dfa, stream, chunk_size, skip=SKIP)\n\n")
+
+    # --- entrypoint_spans: archivo mapeado en memoria, sólo offsets ---
+    if 'entrypoint_spans' in entrypoints:
+        f.write("def entrypoint_spans(path):\n")
+        f.write("    \"\"\"Escanea un archivo ASCII/UTF-8 sin decodificarlo y devuelve\n")
+        f.write("       (token, start, end) en bytes, con el mismo filtrado que entrypoint().\"\"\"\n")
+        f.write("    return scan_file_spans(dfa, path, SKIP)\n\n")
+
+
+def generate_lexer_py(yal_info: dict, output_path: str, cache=None, backend='table', ignore=None,
+                      max_states=DEFAULT_MAX_STATES, keywords=False,
+                      entrypoints=DEFAULT_ENTRYPOINTS):
+    """
+    Genera un archivo .py que implemente el lexer definido en yal_info.
+
+    El AFD se construye y minimiza aquí, una sola vez (o se toma de `cache`
+    si las reglas no cambiaron); el archivo generado sólo contiene sus tablas
+    y el runtime que usan sus entrypoints (ver runtime_modules).
+
+    Además de entrypoint(), el archivo lleva los `entrypoints` pedidos de
+    ENTRYPOINTS: entrypoint_offsets() (TokenStream), entrypoint_stream()
+    (archivo por bloques) y entrypoint_spans() (archivo mapeado, offsets en
+    bytes).
+
+    Con backend='direct', entrypoint() usa además un escáner con el AFD
+    escrito como código (ver lex_compiler.direct_backend); los escáneres por
+    bloques y sobre bytes siguen usando las tablas.
+
+    `ignore` son los tipos de token que el escáner descarta sin crear sus
+    lexemas (p.ej. el IGNORE de la gramática, ver read_grammar_ignore); por
+    defecto se toman del .yal (ver ignored_tokens).
+
+    Si el AFD completo supera `max_states` estados, el archivo lleva la
+    tabla de posiciones y un AFD perezoso (ver LazyDFA): cargarlo no
+    construye ningún estado. En ese caso el backend 'direct' y
+    entrypoint_spans() no están disponibles, y entrypoint_stream() lee el
+    archivo completo.
+
+    Con keywords=True las palabras reservadas se resuelven con una tabla
+    después de cada match en lugar de ocupar estados del AFD (ver
+    keyword_table).
+    """
+    if backend not in ('table', 'direct'):
+        raise ValueError(f"Backend desconocido: {backend}")
+    entrypoints = tuple(name for name in entrypoints if name != 'entrypoint')
+    unknown = set(entrypoints) - set(ENTRYPOINTS)
+    if unknown:
+        raise ValueError(f"Entrypoints desconocidos: {sorted(unknown)}")
+
     header       = yal_info.get('header', '').strip()
     trailer      = yal_info.get('trailer', '').strip()
     alternatives = yal_info.get('alternatives', [])
+    if ignore is None:
+        ignore = ignored_tokens(alternatives)
 
-    # Construimos super_regex con un sentinel que no existe en el input real:
-    super_regex, token_names = build_super_regex(alternatives)
+    # Construimos el AFD minimizado y lo llevamos a su forma de tablas
+    afd_service, token_names = build_lexer_dfa(
+        alternatives, cache, max_states=max_states, keywords=keywords
+    )
+    lazy = afd_service.lazy
+    if lazy is not None and backend == 'direct':
+        raise ValueError("El backend direct requiere el AFD completo (aumente max_states)")
+    if lazy is not None and 'entrypoint_spans' in entrypoints:
+        raise ValueError("entrypoint_spans requiere el AFD completo (aumente max_states)")
+    dfa_data = lazy.to_dict() if lazy is not None else afd_service.compiled().to_dict()
 
     with open(output_path, 'w', encoding='utf-8') as f:
         # --- Cabecera del usuario ---
         if header:
             f.write(header + "\n\n")
 
-        # --- Cabecera del lexer: nombres y regex serializados con repr() ---
+        # --- Runtime del escáner (copiado de afd_compiler) ---
+        f.write("# " + "-" * 76 + "\n")
+        f.write("# Runtime del escáner generado por YALex (no editar)\n")
+        f.write("# " + "-" * 76 + "\n\n")
+        f.write(runtime_source(runtime_modules(entrypoints, backend, lazy is not None)))
+        f.write("\n\n")
+
+        # --- Tablas precalculadas del AFD minimizado ---
         f.write(f"token_names = {token_names!r}\n")
-        f.write(f"super_regex = {super_regex!r}\n\n")
-
-        # --- Importaciones internas ---
-        f.write("from chain_compiler.normalizer import normalize_regex\n")
-        f.write("from chain_compiler.parser     import parse_tokens\n")
-        f.write("from chain_compiler.ast_service import generate_ast\n")
-        f.write("from afd_compiler.service       import AFDService\n\n")
-
-        # --- Construcción y minimización del DFA ---
-        f.write("afd_service  = AFDService()\n")
-        f.write("tokens_norm  = normalize_regex(super_regex)\n")
-        f.write("postfix      = parse_tokens(tokens_norm)\n")
-        f.write("ast          = generate_ast(postfix)\n")
-        f.write("dfa          = afd_service.build_dfa_from_ast(ast, token_names)\n")
-        f.write("afd_service.minimize_dfa()\n\n")
+        f.write(f"DFA_DATA = {dfa_data!r}\n\n")
+        dfa_class = "LazyDFA" if lazy is not None else "CompiledDFA"
+        f.write(f"dfa = {dfa_class}.from_dict(DFA_DATA)\n\n")
 
         # --- Definimos el mismo sentinel en el .py generado ---
         f.write(f"SENTINEL = {DEFAULT_SENTINEL!r}\n\n")
 
-        # --- entrypoint con filtrado y sentinel fijo para el fin de token ---
-        f.write("def entrypoint(buffer: str):\n")
-        f.write("    \"\"\"Escanea el buffer y devuelve lista de (token, lexeme),\n")
-        f.write("       descartando espacios, comentarios y errores léxicos.\"\"\"\n")
-        f.write("    # agregamos el sentinel para delimitar el final\n")
-        f.write("    tokens = afd_service.scan_input(buffer + SENTINEL)\n")
-        # <<--- Aquí se añade 'ERROR' a la lista de tokens a filtrar --->
-        f.write("    return [(tok, lex) for tok, lex in tokens\n")
-        f.write("            if tok not in ('WHITESPACE','COMMENT','ERROR')]\n\n")
+        # --- Tokens descartados dentro del ciclo de escaneo ---
+        f.write(f"IGNORED_TOKENS = frozenset({sorted(ignore)!r})\n")
+        f.write("SKIP = IGNORED_TOKENS | {'ERROR'}\n\n")
+
+        if lazy is not None:
+            # --- AFD perezoso: todos los entrypoints pasan por scan_lazy ---
+            f.write("def entrypoint(buffer: str):\n")
+            f.write("    \"\"\"Escanea el buffer y devuelve lista de (token, lexeme),\n")
+            f.write("       descartando IGNORED_TOKENS y errores léxicos.\"\"\"\n")
+            f.write("    return list(scan_lazy(dfa, buffer + SENTINEL, token_names, SKIP))\n\n")
+
+            if 'entrypoint_offsets' in entrypoints:
+                f.write("def entrypoint_offsets(buffer: str, skip=IGNORED_TOKENS):\n")
+                f.write("    \"\"\"Escanea el buffer y devuelve un TokenStream sin los tokens de `skip`.\"\"\"\n")
+                f.write("    return scan_lazy(dfa, buffer + SENTINEL, token_names, skip)\n\n")
+
+            if 'entrypoint_stream' in entrypoints:
+                f.write("def entrypoint_stream(stream, chunk_size=None):\n")
+                f.write("    \"\"\"Lee el archivo abierto (texto o binario) completo y produce\n")
+                f.write("       (token, lexeme) con el mismo filtrado que entrypoint().\"\"\"\n")
+                f.write("    text = stream.read()\n")
+                f.write("    if isinstance(text, bytes):\n")
+                f.write("        text = text.decode('utf-8')\n")
+                f.write("    return iter(entrypoint(text))\n\n")
+        else:
+            _write_table_entrypoints(f, afd_service, backend, entrypoints)
 
         # --- Trailer del usuario ---
         if trailer:
@@ -59,6 +366,8 @@ def generate_lexer_py(yal_info: dict, output_path: str):
         # --- Modo standalone ---
         f.write("if __name__ == '__main__':\n")
         f.write("    import sys\n")
-        f.write("    data = sys.stdin.read()\n")
-        f.write("    for tok, lex in entrypoint(data):\n")
+        if 'entrypoint_stream' in entrypoints:
+            f.write("    for tok, lex in entrypoint_stream(sys.stdin):\n")
+        else:
+            f.write("    for tok, lex in entrypoint(sys.stdin.read()):\n")
         f.write("        print(tok, lex)\n")
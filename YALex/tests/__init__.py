@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Para que las pruebas encuentren chain_compiler y afd_compiler dentro de YALex
+yalex_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if yalex_dir not in sys.path:
+    sys.path.insert(0, yalex_dir)
+
+import importlib.util
+
+from chain_compiler.tools.yal_parser import parse_yal_file
+
+# Especificación y entrada de ejemplo que comparten las pruebas
+EXAMPLE_YAL = os.path.join(yalex_dir, "ejemplo3.yal")
+EXAMPLE_INPUT = os.path.join(yalex_dir, "input.txt")
+
+
+def example_yal():
+    """ejemplo3.yal parseado (un dict nuevo en cada llamada)."""
+    return parse_yal_file(EXAMPLE_YAL)
+
+
+def example_input():
+    """Contenido de input.txt."""
+    with open(EXAMPLE_INPUT, encoding="utf-8") as f:
+        return f.read()
+
+
+def load_module(path, name=None):
+    """Carga un lexer generado como módulo, sin agregarlo a sys.modules."""
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,128 @@
+import unittest
+
+from chain_compiler.normalizer import normalize_regex
+from chain_compiler.parser import parse_tokens
+from chain_compiler.ast_service import generate_ast, generate_rule_ast
+from afd_compiler.services.dfa_builder import build_direct_dfa
+from afd_compiler.utils.ast_functions import (
+    traverse_tree, LEAF_TYPES, calculate_node_functions, calculate_followpos
+)
+from afd_compiler.models.position import Position
+from chain_compiler.model.ast_node import ASTNode
+from chain_compiler.tools.ast_builder import balance_alternations
+
+
+def regex_ast(regex):
+    return generate_ast(parse_tokens(normalize_regex(regex)))
+
+
+class CharsetLeafTest(unittest.TestCase):
+    def test_class_is_a_single_interval_leaf(self):
+        ast = regex_ast("[a-c0-9_]")
+        self.assertEqual(ast.type, 'CHARSET')
+        self.assertEqual(ast.value, ((48, 57), (95, 95), (97, 99)))
+        self.assertEqual(repr(ast), "[0-9_a-c]")
+
+    def test_negated_class(self):
+        ast = regex_ast("[^\\n]")
+        self.assertEqual(ast.type, 'CHARSET')
+        codes = [code for lo, hi in ast.value for code in range(lo, hi + 1)]
+        self.assertNotIn(ord('\n'), codes)
+        self.assertIn(ord('a'), codes)
+
+    def test_negation_covers_unicode(self):
+        ast = regex_ast("[^\\n]")
+        self.assertEqual(ast.value, ((1, 9), (11, 0x10FFFF)))
+        dfa = build_direct_dfa(regex_ast("([^\\n]+)\x01"), ["T"])
+        self.assertEqual(dfa.accepts("ñandú — 漢字 🙂"), "T")
+        self.assertIsNone(dfa.accepts("a\nb"))
+        self.assertLessEqual(len(dfa.classes), 3)
+
+    def test_positions_grow_with_classes_not_characters(self):
+        ast = regex_ast("[a-zA-Z_][a-zA-Z0-9_]*")
+        leaves = [node for node in traverse_tree(ast) if node.type in LEAF_TYPES]
+        self.assertEqual(len(leaves), 2)
+
+    def test_dfa_over_charset(self):
+        dfa = build_direct_dfa(regex_ast("([a-z][a-z0-9]*)\x01"), ["ID"])
+        self.assertEqual(dfa.accepts("abc9"), "ID")
+        self.assertIsNone(dfa.accepts("9abc"))
+        self.assertEqual(len(dfa.classes), 3)
+
+
+class PlusOperatorTest(unittest.TestCase):
+    def test_plus_is_a_native_node(self):
+        ast = regex_ast("[0-9]+")
+        self.assertEqual((ast.type, ast.value), ('OPERATOR', '+'))
+        leaves = [node for node in traverse_tree(ast) if node.type in LEAF_TYPES]
+        self.assertEqual(len(leaves), 1)
+
+    def test_plus_language(self):
+        dfa = build_direct_dfa(regex_ast("(ab+)\x01"), ["T"])
+        self.assertEqual(dfa.accepts("ab"), "T")
+        self.assertEqual(dfa.accepts("abbb"), "T")
+        self.assertIsNone(dfa.accepts("a"))
+
+    def test_nested_and_nullable_plus(self):
+        dfa = build_direct_dfa(regex_ast("((a?b?)+)\x01"), ["T"])
+        self.assertEqual(dfa.accepts(""), "T")
+        self.assertEqual(dfa.accepts("abba"), "T")
+        nested = build_direct_dfa(regex_ast("((ab)+)+c\x01"), ["T"])
+        self.assertEqual(nested.accepts("ababc"), "T")
+        self.assertIsNone(nested.accepts("c"))
+
+
+def depth(ast):
+    deepest = 0
+    stack = [(ast, 1)]
+    while stack:
+        node, level = stack.pop()
+        deepest = max(deepest, level)
+        stack.extend((child, level + 1) for child in node.children)
+    return deepest
+
+
+def left_deep(op, leaves):
+    tree = ASTNode('CHAR', leaves[0])
+    for value in leaves[1:]:
+        tree = ASTNode('OPERATOR', op, [tree, ASTNode('CHAR', value)])
+    return tree
+
+
+class DeepTreeTest(unittest.TestCase):
+    SIZE = 50_000   # ~10^5 nodos
+
+    def test_passes_do_not_recurse(self):
+        ast = left_deep('&', ['a'] * self.SIZE)
+        Position.reset_counter()
+        calculate_node_functions(ast)
+        followpos = calculate_followpos(ast)
+        self.assertEqual(len(followpos), self.SIZE - 1)
+        self.assertFalse(ast.nullable)
+        self.assertTrue(repr(ast).startswith("&(&("))
+
+    def test_balanced_alternation(self):
+        leaves = [chr(0x100 + i) for i in range(self.SIZE)]
+        ast = balance_alternations(left_deep('|', leaves))
+        self.assertLessEqual(depth(ast), 17)
+        order = [node.value for node in traverse_tree(ast) if node.type == 'CHAR']
+        self.assertEqual(order, leaves)
+        self.assertEqual(ast.pretty_print().count("\n"), 2 * self.SIZE - 1)
+
+    def test_balanced_and_unbalanced_give_same_dfa(self):
+        regex = "((if|else|while|for|[a-z]+)|([0-9]+|(x|y|z)))\x01"
+        postfix = parse_tokens(normalize_regex(regex))
+        plain = build_direct_dfa(generate_ast(postfix, balanced=False), ["T"])
+        balanced = build_direct_dfa(regex_ast(regex), ["T"])
+        self.assertEqual(len(plain.states), len(balanced.states))
+        for word in ["if", "while", "abc", "42", "x", "", "9a"]:
+            self.assertEqual(plain.accepts(word), balanced.accepts(word))
+
+    def test_rule_alternation_is_balanced_by_default(self):
+        words = [f"w{i}" for i in range(self.SIZE)]
+        ast = generate_rule_ast("|".join(words))
+        self.assertLessEqual(depth(ast), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
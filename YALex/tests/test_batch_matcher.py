@@ -0,0 +1,51 @@
+import unittest
+
+from lex_compiler.service import build_lexer_dfa
+from afd_compiler.services import batch_matcher
+from afd_compiler.services.batch_matcher import kind_names
+
+from tests import example_yal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "requiere NumPy")
+class BatchMatcherTest(unittest.TestCase):
+    STRINGS = [
+        "if", "while", "whilex", "x_1", "123", "12a", ">=", "=", "", " \t ",
+        '"#" ñandú 🙂 n', '"#" sin cierre', "ñ", "@", "a b", "variable_larga_" * 20,
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service, cls.token_names = build_lexer_dfa(example_yal()["alternatives"])
+
+    def tokens(self, kinds):
+        names = kind_names(self.service.compiled(), self.token_names)
+        return [names[k] if k >= 0 else None for k in kinds.tolist()]
+
+    def test_same_as_match(self):
+        kinds = self.service.match_many(self.STRINGS, self.token_names)
+        self.assertEqual(kinds.dtype, numpy.int32)
+        self.assertEqual(self.tokens(kinds), [self.service.match(s) for s in self.STRINGS])
+        self.assertEqual(kinds[0], self.token_names.index("IF"))
+
+    def test_small_blocks(self):
+        strings = self.STRINGS * 5
+        kinds = batch_matcher.match_many(self.service.compiled(), strings, self.token_names, block_rows=3)
+        self.assertEqual(self.tokens(kinds), [self.service.match(s) for s in strings])
+
+    def test_kind_names_without_error(self):
+        names = kind_names(self.service.compiled(), self.token_names)
+        self.assertEqual(names[:len(self.token_names)], self.token_names)
+        self.assertNotIn("ERROR", names)
+
+    def test_empty_input(self):
+        self.assertEqual(len(self.service.match_many([])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from chain_compiler.normalizer import normalize_regex
+from chain_compiler.parser import parse_tokens
+from chain_compiler.ast_service import generate_ast
+from afd_compiler.service import AFDService
+from lex_compiler.service import build_lexer_dfa
+
+from tests import EXAMPLE_INPUT, example_yal
+
+
+class BytesScannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service, _ = build_lexer_dfa(example_yal()["alternatives"])
+        cls.input_path = EXAMPLE_INPUT
+
+    def test_spans_match_text_scan(self):
+        with open(self.input_path, "rb") as f:
+            data = f.read()
+        expected = self.service.scan_input(data.decode("utf-8"))
+        spans = self.service.scan_bytes(data)
+        self.assertEqual(
+            [(tok, data[start:end].decode("utf-8")) for tok, start, end in spans],
+            expected,
+        )
+
+    def test_scan_file_uses_mmap(self):
+        spans = self.service.scan_file(self.input_path)
+        self.assertEqual(spans, self.service.scan_bytes(open(self.input_path, "rb").read()))
+
+    def test_multibyte_error_covers_whole_character(self):
+        data = "x = ñ;".encode("utf-8")
+        spans = self.service.scan_bytes(memoryview(data))
+        self.assertIn(("ERROR", 4, 6), spans)
+        self.assertEqual(spans[-1], ("SEMICOLON", 6, 7))
+
+    def test_comment_spans_multibyte_characters(self):
+        data = '"#" año 🙂 fin;'.encode("utf-8")
+        spans = self.service.scan_bytes(data)
+        text = [(tok, data[start:end].decode("utf-8")) for tok, start, end in spans]
+        self.assertEqual(text, self.service.scan_input(data.decode("utf-8")))
+        self.assertEqual(text[0], ("COMMENT", '"#" año 🙂 fin'))
+
+    def test_non_uniform_unicode_alphabet_is_rejected(self):
+        ast = generate_ast(parse_tokens(normalize_regex("([a-zñ]+)\x01")))
+        service = AFDService()
+        service.build_dfa_from_ast(ast, ["ID"])
+        with self.assertRaises(ValueError):
+            service.scan_bytes(b"abc")
+
+    def test_empty_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            path = f.name
+        try:
+            self.assertEqual(self.service.scan_file(path), [])
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from chain_compiler.normalizer import normalize_regex
+from chain_compiler.parser import parse_tokens
+from chain_compiler.ast_service import generate_ast, generate_rules_ast
+from afd_compiler.service import AFDService
+from afd_compiler.models.compiled_dfa import ASCII_LIMIT, CompiledDFA, DEAD, MAX_WIDE_CLASSES
+
+from tests import example_yal
+
+
+class CompiledDFATest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        info = example_yal()
+        patterns, token_names = rule_patterns(info["alternatives"])
+        ast = generate_rules_ast(patterns)
+        cls.service = AFDService()
+        cls.service.build_dfa_from_ast(ast, token_names)
+        cls.service.minimize_dfa()
+
+    def test_initial_state_is_zero(self):
+        compiled = self.service.compiled()
+        self.assertEqual(compiled.initial, 0)
+        self.assertEqual(len(compiled.table), compiled.num_states * compiled.num_classes)
+
+    def test_equivalent_chars_share_a_class(self):
+        compiled = self.service.compiled()
+        class_map = compiled.class_map
+        self.assertEqual(class_map["a"], class_map["Z"])
+        self.assertEqual(class_map["0"], class_map["9"])
+        # 'i' y 'f' aparecen en la palabra reservada "if"
+        self.assertNotEqual(class_map["i"], class_map["a"])
+        self.assertLess(compiled.num_classes, len(class_map))
+
+    def test_accepts_keywords_and_ids(self):
+        self.assertEqual(self.service.match("if"), "IF")
+        self.assertEqual(self.service.match("iff"), "ID")
+        self.assertEqual(self.service.match("123"), "NUMBER")
+        self.assertIsNone(self.service.match("1a"))
+
+    def test_dead_state_for_unknown_symbol(self):
+        compiled = self.service.compiled()
+        self.assertEqual(compiled.step(compiled.initial, "@"), DEAD)
+
+    def test_scan_input_maximal_munch(self):
+        tokens = self.service.scan_input("while x>=10")
+        self.assertEqual(tokens, [
+            ("WHILE", "while"), ("WHITESPACE", " "), ("ID", "x"),
+            ("GREATEREQ", ">="), ("NUMBER", "10"),
+        ])
+
+    def test_scan_input_reports_errors(self):
+        tokens = self.service.scan_input("a @ b\x00")
+        self.assertIn(("ERROR", "@"), tokens)
+        self.assertEqual(tokens[-1], ("ID", "b"))
+
+
+class UnicodeClassesTest(unittest.TestCase):
+    def build(self, regex):
+        ast = generate_ast(parse_tokens(normalize_regex(regex)))
+        service = AFDService()
+        service.build_dfa_from_ast(ast, ["WORD", "OTHER"])
+        service.minimize_dfa()
+        return service.compiled()
+
+    def test_non_ascii_ranges_use_bisection(self):
+        compiled = self.build("([a-zα-ωА-я]+)\x01|([^a-zα-ωА-я \\n]+)\x02")
+        self.assertEqual(compiled.accepts("αβγ"), "WORD")
+        self.assertEqual(compiled.accepts("привет"), "WORD")
+        self.assertEqual(compiled.accepts("漢字"), "OTHER")
+        # Las clases se guardan como intervalos, no carácter por carácter
+        self.assertLess(sum(len(members) for members in compiled.classes), 20)
+        self.assertEqual(compiled.class_of("語"), compiled.class_of("漢"))
+        # Fuera de ASCII no se agrega nada a la fila rápida (ni a to_dict)
+        self.assertNotIn("語", compiled.class_map)
+
+    def test_non_ascii_lookups_are_bounded(self):
+        compiled = self.build("([^\\n]*)\x01")
+        data = compiled.to_dict()
+        text = "".join(chr(code) for code in range(0x4E00, 0x4E00 + 3 * MAX_WIDE_CLASSES))
+        self.assertEqual(compiled.accepts(text), "WORD")
+        self.assertEqual(len(compiled.class_codes(text)), len(text))
+        self.assertLessEqual(len(compiled._wide), MAX_WIDE_CLASSES)
+        self.assertLessEqual(len(compiled._codes), ASCII_LIMIT)
+        self.assertLessEqual(len(compiled.class_map), ASCII_LIMIT)
+        self.assertEqual(compiled.to_dict(), data)
+
+    def test_round_trip_keeps_intervals(self):
+        compiled = self.build("([^\\n]*)\x01")
+        restored = CompiledDFA.from_dict(compiled.to_dict())
+        self.assertEqual(restored.classes, compiled.classes)
+        self.assertEqual(restored.accepts("día 🙂"), compiled.accepts("día 🙂"))
+
+    def test_run_matchers_follow_self_loops(self):
+        compiled = self.build("([a-zα-ω]+)\x01|([^a-zα-ω \\n]+)\x02")
+        runs = compiled.run_matchers()
+        word = compiled.step(compiled.initial, "a")
+        self.assertEqual(runs[word]("abγδ9x", 0).end(), 4)
+        self.assertIsNone(runs[compiled.initial])
+        other = compiled.step(compiled.initial, "漢")
+        self.assertEqual(runs[other]("漢字🙂!a", 0).end(), 4)
+        # Una racha larga se reconoce igual que carácter por carácter
+        text = "αβ" * 5000 + " " + "9" * 5000
+        self.assertEqual(compiled.accepts(text[:10000]), "WORD")
+        self.assertEqual(self.build_service(compiled).scan_input(text),
+                         [("WORD", text[:10000]), ("ERROR", " "), ("OTHER", text[10001:])])
+
+    def build_service(self, compiled):
+        service = AFDService()
+        service.load_compiled(compiled)
+        return service
+
+
+if __name__ == "__main__":
+    unittest.main()
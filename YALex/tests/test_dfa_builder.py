@@ -0,0 +1,76 @@
+import unittest
+
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from chain_compiler.ast_service import generate_rules_ast
+from afd_compiler.services.dfa_builder import build_direct_dfa
+from lex_compiler.service import build_lexer_dfa
+
+from tests import example_yal
+
+
+def build(rules, mode):
+    patterns, token_names = rule_patterns(rules)
+    ast = generate_rules_ast(patterns)
+    return build_direct_dfa(ast, token_names, mode)
+
+
+class DirectDFABuilderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.rules = example_yal()["alternatives"]
+
+    def test_bitset_states_are_integers(self):
+        dfa = build(self.rules, 'bitset')
+        self.assertTrue(all(isinstance(state, int) for state in dfa.states))
+
+    def test_modes_build_the_same_automaton(self):
+        by_sets = build(self.rules, 'sets')
+        by_bits = build(self.rules, 'bitset')
+        self.assertEqual(len(by_sets.states), len(by_bits.states))
+        self.assertEqual(len(by_sets.transitions), len(by_bits.transitions))
+        self.assertEqual(
+            sorted(by_sets.state_tokens.values()), sorted(by_bits.state_tokens.values())
+        )
+        for word in ["if", "ifx", "while", "==", "=", "abc_12", "42", "  ", "<="]:
+            self.assertEqual(by_sets.accepts(word), by_bits.accepts(word))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            build(self.rules, 'nfa')
+
+
+class EndMarkerTest(unittest.TestCase):
+    """Los fines de regla son hojas END: no ocupan caracteres del alfabeto."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Las reglas 9 y 10 (índices 8 y 9) tenían como marcador '\t' y '\n'
+        cls.rules = [(f'"kw{i}"', f"return KW{i}") for i in range(300)]
+        cls.rules[8] = ('"\t"', "return TAB")
+        cls.rules[9] = ('"\n"', "return NEWLINE")
+        cls.rules.append(("[a-z][a-z0-9]*", "return ID"))
+        cls.service, cls.token_names = build_lexer_dfa(cls.rules)
+
+    def test_rules_past_the_control_characters(self):
+        self.assertEqual(
+            self.service.scan_input("kw7\tkw12\nkw299 kw300"),
+            [("KW7", "kw7"), ("TAB", "\t"), ("KW12", "kw12"), ("NEWLINE", "\n"),
+             ("KW299", "kw299"), ("ERROR", " "), ("ID", "kw300")],
+        )
+
+    def test_markers_are_not_characters(self):
+        compiled = self.service.compiled()
+        for char in "\x01\x02\x1f!@~":
+            self.assertIsNone(compiled.class_of(char))
+
+    def test_both_modes_read_end_leaves(self):
+        patterns, token_names = rule_patterns(self.rules[:40])
+        by_sets = build_direct_dfa(generate_rules_ast(patterns), token_names, 'sets')
+        by_bits = build_direct_dfa(generate_rules_ast(patterns), token_names, 'bitset')
+        for word in ["kw3", "kw33", "\t", "\n", "kw"]:
+            self.assertEqual(by_sets.accepts(word), by_bits.accepts(word))
+        self.assertEqual(by_bits.accepts("kw33"), "KW33")
+
+
+if __name__ == "__main__":
+    unittest.main()
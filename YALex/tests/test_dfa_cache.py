@@ -0,0 +1,82 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from lex_compiler import cache as cache_module
+from lex_compiler.cache import DFACache, default_cache_dir
+from lex_compiler.service import build_lexer_dfa
+
+from tests import example_yal
+
+
+class DFACacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.alternatives = example_yal()["alternatives"]
+        # Fragmentos ya en memoria: en estas pruebas la caché sólo recibe AFDs
+        build_lexer_dfa(cls.alternatives, max_states=None)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DFACache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.tmp.name) if name.endswith(".dfa"))
+
+    def test_hit_returns_same_tables(self):
+        built, names = build_lexer_dfa(self.alternatives, self.cache)
+        self.assertEqual(len(self.entries()), 1)
+        with mock.patch("lex_compiler.service.rule_fragments") as generate:
+            cached, cached_names = build_lexer_dfa(self.alternatives, self.cache)
+            generate.assert_not_called()
+        self.assertEqual(cached_names, names)
+        self.assertEqual(cached.compiled().to_dict(), built.compiled().to_dict())
+        self.assertEqual(cached.scan_input("while x>=10"), built.scan_input("while x>=10"))
+
+    def test_key_depends_on_rules_and_version(self):
+        build_lexer_dfa(self.alternatives, self.cache)
+        build_lexer_dfa(self.alternatives[:-1], self.cache)
+        self.assertEqual(len(self.entries()), 2)
+        with mock.patch.object(cache_module, "COMPILER_VERSION", "test"):
+            build_lexer_dfa(self.alternatives, self.cache)
+        self.assertEqual(len(self.entries()), 3)
+
+    def test_corrupt_entry_is_rebuilt(self):
+        build_lexer_dfa(self.alternatives, self.cache)
+        path = os.path.join(self.tmp.name, self.entries()[0])
+        with open(path, "wb") as f:
+            f.write(b"no es zlib")
+        service, _ = build_lexer_dfa(self.alternatives, self.cache)
+        self.assertEqual(service.match("if"), "IF")
+        self.assertIsNotNone(self.cache.get(self.entries()[0][:-len(".dfa")]))
+
+    def test_lru_eviction_by_size(self):
+        build_lexer_dfa(self.alternatives[:5], self.cache)
+        first = self.entries()[0]
+        size = os.path.getsize(os.path.join(self.tmp.name, first))
+        self.cache.max_bytes = size * 2 + size // 2
+        old = time.time() - 100
+        os.utime(os.path.join(self.tmp.name, first), (old, old))
+        build_lexer_dfa(self.alternatives[:6], self.cache)
+        build_lexer_dfa(self.alternatives[:7], self.cache)
+        self.assertNotIn(first, self.entries())
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_writes_leave_no_temporary_files(self):
+        build_lexer_dfa(self.alternatives, self.cache)
+        names = os.listdir(self.tmp.name)
+        self.assertTrue(all(name.endswith((".dfa", ".frag")) for name in names))
+
+    def test_directory_from_environment(self):
+        with mock.patch.dict(os.environ, {"YALEX_CACHE_DIR": self.tmp.name}):
+            self.assertEqual(default_cache_dir(), self.tmp.name)
+            self.assertEqual(DFACache().directory, self.tmp.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
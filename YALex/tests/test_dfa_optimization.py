@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from afd_compiler.models.dfa import DFA
+from afd_compiler.tools.dfa_optimization import minimize_dfa
+
+
+def random_dfa(num_states, num_symbols, seed):
+    rng = random.Random(seed)
+    states = set(range(num_states))
+    transitions = {
+        (s, a): rng.randrange(num_states)
+        for s in states for a in range(num_symbols) if rng.random() < 0.7
+    }
+    tokens = {s: rng.choice(["A", "B"]) for s in states if rng.random() < 0.3}
+    return DFA(states, set(range(num_symbols)), transitions, 0, set(tokens), tokens)
+
+
+def moore_classes(dfa):
+    """
+    Refinamiento ingenuo (Moore) como referencia: se completa el DFA con un
+    estado muerto y se cuentan las clases que contienen algún estado real.
+    """
+    dead = object()
+    states = list(dfa.states) + [dead]
+    symbols = sorted(dfa.alphabet)
+    delta = {
+        (s, a): dfa.transitions.get((s, a), dead) if s is not dead else dead
+        for s in states for a in symbols
+    }
+    label = {s: dfa.state_tokens.get(s) for s in states}
+    count = len(set(label.values()))
+    while True:
+        signature = {s: (label[s],) + tuple(label[delta[(s, a)]] for a in symbols) for s in states}
+        ids = {}
+        label = {s: ids.setdefault(signature[s], len(ids)) for s in states}
+        if len(ids) == count:
+            break
+        count = len(ids)
+    return len({label[s] for s in states if s is not dead})
+
+
+class MinimizeDFATest(unittest.TestCase):
+    def test_language_is_preserved(self):
+        for seed in range(20):
+            dfa = random_dfa(30, 3, seed)
+            minimized = minimize_dfa(dfa)
+            rng = random.Random(seed)
+            for _ in range(200):
+                word = [rng.randrange(3) for _ in range(rng.randrange(8))]
+                self.assertEqual(minimized.accepts(word), dfa.accepts(word))
+
+    def test_merges_equivalent_states(self):
+        # Dos caminos idénticos hacia estados aceptantes con el mismo token
+        transitions = {(0, 'a'): 1, (0, 'b'): 2, (1, 'c'): 3, (2, 'c'): 4}
+        dfa = DFA({0, 1, 2, 3, 4}, {'a', 'b', 'c'}, transitions, 0, {3, 4}, {3: 'X', 4: 'X'})
+        self.assertEqual(len(minimize_dfa(dfa).states), 3)
+
+    def test_keeps_states_with_different_tokens_apart(self):
+        transitions = {(0, 'a'): 1, (0, 'b'): 2}
+        dfa = DFA({0, 1, 2}, {'a', 'b'}, transitions, 0, {1, 2}, {1: 'X', 2: 'Y'})
+        minimized = minimize_dfa(dfa)
+        self.assertEqual(len(minimized.states), 3)
+        self.assertEqual(minimized.accepts('b'), 'Y')
+
+    def test_state_count_matches_reference(self):
+        for seed in range(10):
+            dfa = random_dfa(40, 2, seed)
+            self.assertEqual(len(minimize_dfa(dfa).states), moore_classes(dfa))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import unittest
+
+from lex_compiler.service import build_lexer_dfa
+from afd_compiler.services.scanner import LexerError
+
+from tests import example_yal
+
+
+class ErrorRecoveryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service, cls.token_names = build_lexer_dfa(example_yal()["alternatives"])
+
+    def test_first_classes(self):
+        dfa = self.service.compiled()
+        first = dfa.first_classes()
+        self.assertTrue(first[dfa.class_of("w")])
+        self.assertTrue(first[dfa.class_of('"')])     # abre un comentario
+        self.assertFalse(first[dfa.class_of("@")])    # sólo dentro de un comentario
+
+    def test_error_run_is_one_token(self):
+        text = "x = @@~~ñ; y" + "\x7f" * 100
+        tokens = self.service.scan_input(text, coalesce_errors=True)
+        self.assertEqual(tokens, [
+            ("ID", "x"), ("WHITESPACE", " "), ("ASSIGN", "="), ("WHITESPACE", " "),
+            ("ERROR", "@@~~ñ"), ("SEMICOLON", ";"), ("WHITESPACE", " "), ("ID", "y"),
+            ("ERROR", "\x7f" * 100),
+        ])
+
+    def test_same_as_merging_single_errors(self):
+        # '"' puede iniciar un comentario que luego falla: la racha sigue
+        text = 'a @"@" b "#" c ~'
+        merged = []
+        for kind, lexeme in self.service.scan_input(text):
+            if kind == "ERROR" and merged and merged[-1][0] == "ERROR":
+                merged[-1] = ("ERROR", merged[-1][1] + lexeme)
+            else:
+                merged.append((kind, lexeme))
+        self.assertEqual(self.service.scan_input(text, coalesce_errors=True), merged)
+        for chunk_size in (1, 4):
+            with self.subTest(chunk_size=chunk_size):
+                stream = self.service.scan_stream(io.StringIO(text), chunk_size, coalesce_errors=True)
+                self.assertEqual(list(stream), merged)
+
+    def test_error_spans_have_offsets(self):
+        text = "if ¿¿ x"
+        stream = self.service.scan_offsets(text, self.token_names, coalesce_errors=True)
+        self.assertEqual(stream.kind(2), "ERROR")
+        self.assertEqual(stream.span(2), (3, 5))
+        spans = self.service.scan_bytes(text.encode("utf-8"), coalesce_errors=True)
+        self.assertEqual(spans[2], ("ERROR", 3, 7))
+
+    def test_max_errors_aborts(self):
+        text = "a @ b @ c @ d"
+        with self.assertRaises(LexerError) as caught:
+            self.service.scan_input(text, max_errors=2)
+        self.assertEqual(caught.exception.offset, 6)
+        self.assertEqual(caught.exception.tokens[-1], ("ERROR", "@"))
+        self.assertEqual(len(self.service.scan_input(text, max_errors=4)), 13)
+        with self.assertRaises(LexerError):
+            list(self.service.scan_stream(io.StringIO(text), 2, max_errors=2))
+        with self.assertRaises(LexerError):
+            self.service.scan_bytes(b"@@ x @", coalesce_errors=True, max_errors=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+
+from chain_compiler.tools.super_regex_builder import ignored_tokens, DEFAULT_IGNORED
+from afd_compiler.services.scanner import LexerError
+from lex_compiler.service import build_lexer_dfa, generate_lexer_py, read_grammar_ignore
+
+from tests import example_yal, load_module
+
+
+class IgnoredTokensTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        here = os.path.dirname(__file__)
+        cls.yal_info = example_yal()
+        cls.service, _ = build_lexer_dfa(cls.yal_info["alternatives"])
+        cls.grammar = os.path.normpath(
+            os.path.join(here, "..", "..", "YAPar", "examples", "demo.yalp")
+        )
+
+    def test_rules_without_return_are_ignored(self):
+        rules = [("[a-z]+", "{ return ID }"), ("[ ]+", "{ }")]
+        self.assertEqual(ignored_tokens(rules), {"UNKNOWN", *DEFAULT_IGNORED})
+        service, _ = build_lexer_dfa(rules)
+        self.assertEqual(service.scan_input("ab cd", ignored_tokens(rules)),
+                         [("ID", "ab"), ("ID", "cd")])
+
+    def test_mixed_spec_keeps_the_defaults(self):
+        rules = [("[ ]+", "{ return WHITESPACE }"), ('"#"', "{ }"), ("[a-z]+", "{ return ID }")]
+        skip = ignored_tokens(rules)
+        self.assertEqual(skip, {"UNKNOWN", "WHITESPACE", "COMMENT"})
+        service, _ = build_lexer_dfa(rules)
+        self.assertEqual(service.scan_input("ab # cd", skip), [("ID", "ab"), ("ID", "cd")])
+
+    def test_default_when_every_rule_returns(self):
+        self.assertEqual(ignored_tokens(self.yal_info["alternatives"]), set(DEFAULT_IGNORED))
+
+    def test_grammar_ignore_line(self):
+        self.assertEqual(read_grammar_ignore(self.grammar), {"WHITESPACE", "COMMENT"})
+
+    def test_skip_in_every_scanner(self):
+        text = "while x  >= 10 @ y"
+        skip = {"WHITESPACE", "ERROR"}
+        expected = [t for t in self.service.scan_input(text) if t[0] not in skip]
+        self.assertEqual(self.service.scan_input(text, skip), expected)
+        self.assertEqual(list(self.service.scan_stream(io.StringIO(text), 4, skip=skip)), expected)
+        data = text.encode("utf-8")
+        spans = self.service.scan_bytes(data, skip)
+        self.assertEqual([(tok, data[a:b].decode()) for tok, a, b in spans], expected)
+
+    def test_skipped_errors_still_count(self):
+        skip = {"WHITESPACE", "ERROR"}
+        offsets = lambda text, skip, **kw: self.service.scan_offsets(text, None, skip, **kw)
+        for scan in (self.service.scan_input, self.service.scan_translated, offsets):
+            with self.assertRaises(LexerError) as ctx:
+                scan("x @ y @ z", skip, max_errors=2)
+            self.assertEqual(ctx.exception.offset, 6)
+            self.assertEqual(list(ctx.exception.tokens), [("ID", "x"), ("ID", "y")])
+
+    def test_generated_lexer_uses_grammar_ignore(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "ignore_lexer.py")
+            generate_lexer_py(self.yal_info, out, ignore={"WHITESPACE"})
+            lexer = load_module(out)
+        self.assertEqual(lexer.IGNORED_TOKENS, frozenset({"WHITESPACE"}))
+        tokens = lexer.entrypoint('x "#" hola n @')
+        self.assertEqual(tokens, [("ID", "x"), ("COMMENT", '"#" hola n')])
+
+    def test_grammar_without_ignore_keeps_the_yal_defaults(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = os.path.join(tmp, "sin_ignore.yalp")
+            with open(grammar, "w", encoding="utf-8") as f:
+                f.write("%token ID\n%%\ns:\n    ID\n;\n")
+            self.assertIsNone(read_grammar_ignore(grammar))
+            out = os.path.join(tmp, "default_lexer.py")
+            generate_lexer_py(self.yal_info, out, ignore=read_grammar_ignore(grammar))
+            lexer = load_module(out)
+        self.assertEqual(lexer.IGNORED_TOKENS, frozenset(DEFAULT_IGNORED))
+        self.assertEqual(lexer.entrypoint('x "#" hola n @'), [("ID", "x")])
+
+
+if __name__ == "__main__":
+    unittest.main()
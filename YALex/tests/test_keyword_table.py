@@ -0,0 +1,143 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from afd_compiler.models.compiled_dfa import CompiledDFA
+from afd_compiler.services import parallel_scanner
+from afd_compiler.services.stream_scanner import iter_tokens
+from afd_compiler.services.byte_scanner import scan_spans
+from lex_compiler.service import build_lexer_dfa, generate_lexer_py, keyword_table, rule_fragments
+
+from tests import example_yal, example_input, load_module
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def sql_rules(count):
+    rules = [(f'"kw{i}"', f"return KW{i}") for i in range(count)]
+    rules += [
+        ("[a-z_][a-z0-9_]*", "return ID"),
+        ("[0-9]+", "return NUMBER"),
+        ('"("', "return LPAREN"),
+        ('")"', "return RPAREN"),
+        ('","', "return COMMA"),
+        ('";"', "return SEMICOLON"),
+        ('"<="', "return LESSEQ"),
+        ('"<"', "return LESS"),
+        ("[ ]+", "return WHITESPACE"),
+    ]
+    return rules
+
+
+class KeywordTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.yal_info = example_yal()
+        rules = cls.yal_info["alternatives"]
+        cls.plain, cls.token_names = build_lexer_dfa(rules)
+        cls.service, _ = build_lexer_dfa(rules, keywords=True)
+        base = example_input()
+        cls.text = base + " ifx whil while_ else1 (x);@ ñ "
+
+    def test_shadowed_literals_leave_the_automaton(self):
+        patterns, token_names = rule_patterns(self.yal_info["alternatives"])
+        kept, table = keyword_table(patterns, token_names, rule_fragments(patterns))
+        self.assertEqual(table, {"ID": {"if": "IF", "else": "ELSE", "while": "WHILE"}})
+        self.assertNotIn(token_names.index("WHILE"), kept)
+        self.assertIn(token_names.index("ASSIGN"), kept)
+        self.assertLess(self.service.compiled().num_states, self.plain.compiled().num_states)
+
+    def test_literal_after_the_general_rule_is_kept(self):
+        rules = [("[a-z]+", "return ID"), ('"if"', "return IF"), ("[ ]+", "return WS")]
+        patterns, token_names = rule_patterns(rules)
+        kept, table = keyword_table(patterns, token_names, rule_fragments(patterns))
+        self.assertEqual((kept, table), ([0, 1, 2], {}))
+
+    def test_same_tokens_as_the_full_automaton(self):
+        dfa, plain = self.service.compiled(), self.plain.compiled()
+        text = self.text + "\x00"
+        self.assertEqual(self.service.scan_input(text), self.plain.scan_input(text))
+        self.assertEqual(
+            list(self.service.scan_offsets(text, self.token_names)),
+            list(self.plain.scan_offsets(text, self.token_names)),
+        )
+        self.assertEqual(
+            list(iter_tokens(dfa, io.StringIO(self.text), 7)),
+            list(iter_tokens(plain, io.StringIO(self.text), 7)),
+        )
+        data = self.text.encode("utf-8")
+        self.assertEqual(scan_spans(dfa, data), scan_spans(plain, data))
+        with mock.patch.object(parallel_scanner, "MIN_PARALLEL_SIZE", 0):
+            stream = parallel_scanner.scan_parallel(
+                dfa, text * 3, self.token_names, workers=2, chunks=5
+            )
+        self.assertEqual(list(stream), list(self.plain.scan_offsets(text * 3, self.token_names)))
+        for word in ["while", "whilex", "if", "=", "<="]:
+            self.assertEqual(self.service.match(word), self.plain.match(word))
+
+    @unittest.skipIf(numpy is None, "requiere NumPy")
+    def test_match_many(self):
+        strings = ["while", "whilex", "else", "if", "(", "x"]
+        self.assertEqual(
+            list(self.service.match_many(strings, self.token_names)),
+            list(self.plain.match_many(strings, self.token_names)),
+        )
+
+    def test_first_character_dispatch(self):
+        dispatch = self.service.compiled().dispatch_table()
+        self.assertEqual(dispatch["("], "LPAREN")
+        self.assertEqual(dispatch[";"], "SEMICOLON")
+        # '=' puede seguir con '=' y 'a' empieza identificadores
+        self.assertNotIn("=", dispatch)
+        self.assertNotIn("a", dispatch)
+
+    def test_round_trip(self):
+        dfa = self.service.compiled()
+        copy = CompiledDFA.from_dict(dfa.to_dict())
+        self.assertEqual(copy.keywords, dfa.keywords)
+        self.assertEqual(copy.accepts("else"), "ELSE")
+        self.assertNotIn("keywords", self.plain.compiled().to_dict())
+
+    def test_many_keywords_compile_to_a_small_dfa(self):
+        rules = sql_rules(300)
+        start = time.perf_counter()
+        service, _ = build_lexer_dfa(rules, max_states=None, keywords=True)
+        elapsed = time.perf_counter() - start
+        dfa = service.compiled()
+        self.assertLess(dfa.num_states, 12)
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(len(dfa.keywords["ID"]), 300)
+        self.assertEqual(
+            service.scan_input("kw12 kw123x (7);"),
+            [("KW12", "kw12"), ("WHITESPACE", " "), ("ID", "kw123x"), ("WHITESPACE", " "),
+             ("LPAREN", "("), ("NUMBER", "7"), ("RPAREN", ")"), ("SEMICOLON", ";")],
+        )
+
+    def test_generated_lexer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lexers = {}
+            for backend in ("table", "direct"):
+                path = os.path.join(tmp, f"{backend}_lexer.py")
+                generate_lexer_py(self.yal_info, path, backend=backend, keywords=True)
+                lexers[backend] = load_module(path)
+            lazy_path = os.path.join(tmp, "lazy_lexer.py")
+            generate_lexer_py(self.yal_info, lazy_path, max_states=10, keywords=True)
+            lazy = load_module(lazy_path)
+        expected = self.plain.scan_input(self.text, lexers["table"].SKIP)
+        for lexer in (*lexers.values(), lazy):
+            self.assertEqual(lexer.entrypoint(self.text), expected)
+        self.assertEqual(
+            list(lazy.entrypoint_offsets(self.text)),
+            list(lexers["table"].entrypoint_offsets(self.text)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
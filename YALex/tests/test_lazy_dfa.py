@@ -0,0 +1,90 @@
+import os
+import random
+import tempfile
+import unittest
+
+from afd_compiler.models.lazy_dfa import LazyDFA
+from afd_compiler.service import AFDService
+from lex_compiler.cache import DFACache
+from lex_compiler.service import build_lexer_dfa, compile_fragment, generate_lexer_py
+
+from tests import example_yal, load_module
+
+
+# (a|b)*a(a|b)^12: el AFD completo tiene 2^13 estados
+TAIL_RULES = [
+    ("[ab]*a" + "[ab]" * 12, "return TAIL"),
+    ("[ab]+", "return AB"),
+    ("[ ]+", "return WS"),
+]
+
+
+class LazyDFATest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(7)
+        cls.text = " ".join(
+            "".join(rng.choice("ab") for _ in range(rng.randint(1, 30))) for _ in range(300)
+        ) + " c"
+        cls.eager, _ = build_lexer_dfa(TAIL_RULES, max_states=None)
+
+    def test_falls_back_past_the_state_limit(self):
+        service, _ = build_lexer_dfa(TAIL_RULES, max_states=256)
+        self.assertIsNone(service.dfa)
+        self.assertIsInstance(service.lazy, LazyDFA)
+        self.assertEqual(service.scan_input(self.text), self.eager.scan_input(self.text))
+        # Sólo los estados que la entrada visita
+        self.assertLess(service.lazy.num_states, self.eager.compiled().num_states)
+        for word in ["a" + "b" * 12, "b" * 13, "ab", "abc"]:
+            self.assertEqual(service.match(word), self.eager.match(word))
+        with self.assertRaises(ValueError):
+            service.compiled()
+
+    def test_bounded_cache_flushes(self):
+        service = AFDService()
+        fragments = [compile_fragment(pattern) for pattern, _ in TAIL_RULES]
+        lazy = service.build_dfa_from_fragments(
+            fragments, ["TAIL", "AB", "WS"], max_states=1, lazy_states=2
+        )
+        self.assertEqual(service.scan_input(self.text), self.eager.scan_input(self.text))
+        self.assertLessEqual(lazy.num_states, 2)
+        self.assertGreater(lazy.flushes, 0)
+
+    def test_coalesced_errors(self):
+        service, _ = build_lexer_dfa(TAIL_RULES, max_states=256)
+        text = "ab cc dd ba"
+        self.assertEqual(
+            list(service.scan_offsets(text, coalesce_errors=True)),
+            list(self.eager.scan_offsets(text, coalesce_errors=True)),
+        )
+
+    def test_round_trip(self):
+        service, _ = build_lexer_dfa(TAIL_RULES, max_states=256)
+        copy = LazyDFA.from_dict(service.lazy.to_dict())
+        self.assertEqual(copy.to_dict(), service.lazy.to_dict())
+        self.assertEqual(copy.accepts("a" * 13), "TAIL")
+
+    def test_lazy_dfa_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            build_lexer_dfa(TAIL_RULES, DFACache(tmp), max_states=256)
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_generated_lazy_lexer(self):
+        yal_info = example_yal()
+        with tempfile.TemporaryDirectory() as tmp:
+            lazy_path = os.path.join(tmp, "lazy_lexer.py")
+            table_path = os.path.join(tmp, "table_lexer.py")
+            generate_lexer_py(yal_info, lazy_path, max_states=10)
+            generate_lexer_py(yal_info, table_path)
+            lazy, table = load_module(lazy_path), load_module(table_path)
+            with self.assertRaises(ValueError):
+                generate_lexer_py(yal_info, lazy_path, backend='direct', max_states=10)
+        self.assertIsInstance(lazy.dfa, lazy.LazyDFA)
+        self.assertEqual(lazy.dfa.num_states, 1)
+        text = "while x >= 10 { y = y - 1; } # fin\n@"
+        self.assertEqual(lazy.entrypoint(text), table.entrypoint(text))
+        self.assertEqual(list(lazy.entrypoint_offsets(text)), list(table.entrypoint_offsets(text)))
+
+
+if __name__ == "__main__":
+    unittest.main()
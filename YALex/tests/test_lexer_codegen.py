@@ -0,0 +1,156 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from lex_compiler.service import generate_lexer_py, build_lexer_dfa
+from lex_compiler.direct_backend import generate_direct_source
+
+from tests import example_yal, load_module
+
+
+class LexerCodegenTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.out = os.path.join(cls.tmpdir.name, "thelexer.py")
+        generate_lexer_py(example_yal(), cls.out)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def run_lexer(self, code):
+        # Se ejecuta en un proceso limpio, sin YALex en sys.path
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=self.tmpdir.name, capture_output=True, text=True,
+            env={"PYTHONPATH": ""},
+        )
+
+    def test_generated_lexer_is_self_contained(self):
+        result = self.run_lexer(
+            "import sys, thelexer\n"
+            "print(thelexer.entrypoint('if x >= 10'))\n"
+            "print('chain_compiler' in sys.modules or 'afd_compiler' in sys.modules)\n"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        lines = result.stdout.splitlines()
+        self.assertEqual(
+            lines[0],
+            "[('IF', 'if'), ('ID', 'x'), ('GREATEREQ', '>='), ('NUMBER', '10')]",
+        )
+        self.assertEqual(lines[1], "False")
+
+    def test_generated_lexer_embeds_tables(self):
+        with open(self.out, encoding="utf-8") as f:
+            source = f.read()
+        self.assertIn("DFA_DATA = ", source)
+        self.assertNotIn("normalize_regex", source)
+
+    def test_runtime_only_for_requested_entrypoints(self):
+        with open(self.out, encoding="utf-8") as f:
+            source = f.read()
+        for name in ("class LazyDFA", "def scan_lazy", "def iter_tokens", "def scan_spans",
+                     "def entrypoint_stream", "def entrypoint_spans"):
+            self.assertNotIn(name, source)
+
+        yal_info = example_yal()
+        path = os.path.join(self.tmpdir.name, "full.py")
+        generate_lexer_py(yal_info, path, entrypoints=("entrypoint_stream", "entrypoint_spans"))
+        full = load_module(path, "full")
+        self.assertFalse(hasattr(full, "entrypoint_offsets"))
+        self.assertEqual(list(full.entrypoint_stream(io.StringIO("if x"))), full.entrypoint("if x"))
+        self.assertFalse(hasattr(full, "LazyDFA"))
+
+        path = os.path.join(self.tmpdir.name, "lazy.py")
+        generate_lexer_py(yal_info, path, max_states=10, entrypoints=("entrypoint_stream",))
+        lazy = load_module(path, "lazy")
+        self.assertTrue(hasattr(lazy, "scan_lazy"))
+        self.assertFalse(hasattr(lazy, "iter_tokens"))
+        self.assertEqual(list(lazy.entrypoint_stream(io.StringIO("if x"))), full.entrypoint("if x"))
+        with self.assertRaises(ValueError):
+            generate_lexer_py(yal_info, path, max_states=10, entrypoints=("entrypoint_spans",))
+        with self.assertRaises(ValueError):
+            generate_lexer_py(yal_info, path, entrypoints=("entrypoint_jit",))
+
+
+class CountingText(str):
+    """Texto que cuenta cuántas veces se lee."""
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return str.__getitem__(self, index)
+
+
+class DirectBackendTest(unittest.TestCase):
+    SAMPLE = (
+        'while (x >= 10) { if x != y: x = x - 1; } else [a, b]\n'
+        '"#" comentario ñandú 🙂 fin whil whilex elsee @ ~ 0123abc'
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.yal_info = example_yal()
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.lexers = {}
+        for backend in ("table", "direct"):
+            path = os.path.join(cls.tmpdir.name, f"lexer_{backend}.py")
+            generate_lexer_py(cls.yal_info, path, backend=backend)
+            cls.lexers[backend] = load_module(path, f"lexer_{backend}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_same_tokens_as_table_backend(self):
+        table, direct = self.lexers["table"], self.lexers["direct"]
+        self.assertEqual(direct.entrypoint(self.SAMPLE), table.entrypoint(self.SAMPLE))
+        text = self.SAMPLE + "\x00"
+        self.assertEqual(direct.scan_direct(text), table.scan_tokens(table.dfa, text))
+
+    def test_no_table_lookups_in_direct_scanner(self):
+        source = generate_direct_source(build_lexer_dfa(self.yal_info["alternatives"])[0].compiled())
+        self.assertNotIn("table[", source)
+        self.assertNotIn("class_map", source)
+
+    def test_deep_keyword_trie(self):
+        # Palabras largas: los estados anidados superan MAX_INLINE_DEPTH
+        words = ["abcdefghijklmnop", "abcdefghijklmnoq", "abcdxyz", "zzzzzzzzzzzzzzzzzzzz"]
+        rules = [(f'"{w}"', f"{{ return K{i} }}") for i, w in enumerate(words)]
+        rules += [("[a-z]+", "{ return ID }"), ("[ ]+", "{ return WHITESPACE }")]
+        path = os.path.join(self.tmpdir.name, "deep.py")
+        generate_lexer_py({"alternatives": rules}, path, backend="direct")
+        deep = load_module(path, "deep")
+        text = " ".join(words + ["abcdefghijklmno", "zzzz", "abcdxyzz"])
+        table_tokens = deep.scan_tokens(deep.dfa, text)
+        self.assertEqual(deep.scan_direct(text), table_tokens)
+        self.assertEqual(table_tokens[0], ("K0", words[0]))
+
+    def test_backtracking_is_linear(self):
+        # Cada 'a' abre un `(ab)+c` que nunca se cierra: sin memoria, n²/2 lecturas
+        rules = [("(ab)+c", "{ return ABC }"), ("a", "{ return A }"), ("b", "{ return B }")]
+        path = os.path.join(self.tmpdir.name, "adversarial.py")
+        generate_lexer_py({"alternatives": rules}, path, backend="direct")
+        lexer = load_module(path, "adversarial")
+
+        def reads(size):
+            text = CountingText("ab" * size + lexer.SENTINEL)
+            tokens = lexer.scan_direct(text)
+            self.assertEqual(tokens, [("A", "a"), ("B", "b")] * size)
+            return text.reads
+
+        small = reads(1000)
+        self.assertLess(reads(2000), 2.1 * small)
+        self.assertLess(small, 10 * 2000)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            generate_lexer_py(self.yal_info, os.path.join(self.tmpdir.name, "x.py"), backend="jit")
+
+
+if __name__ == "__main__":
+    unittest.main()
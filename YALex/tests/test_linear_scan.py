@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from lex_compiler.service import build_lexer_dfa
+from afd_compiler.services.scanner import scan_tokens, scan_offsets
+from afd_compiler.services.stream_scanner import iter_tokens
+from afd_compiler.services.byte_scanner import scan_spans
+
+from tests import example_yal
+
+
+class CountingTable(list):
+    """Tabla de transiciones que cuenta cuántas veces se consulta."""
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return list.__getitem__(self, index)
+
+
+class LinearScanTest(unittest.TestCase):
+    RULES = [("a*b", "{ return AB }"), ("a", "{ return A }")]
+
+    @classmethod
+    def setUpClass(cls):
+        service, cls.token_names = build_lexer_dfa(cls.RULES)
+        cls.dfa = service.compiled()
+
+    def transitions(self, text):
+        counting = CountingTable(self.dfa.table)
+        original, self.dfa.table = self.dfa.table, counting
+        try:
+            tokens = scan_tokens(self.dfa, text)
+        finally:
+            self.dfa.table = original
+        return tokens, counting.reads
+
+    def test_near_miss_run_is_linear(self):
+        # Cada 'a' abre un `a*b` que nunca se cierra: sin memoria, n²/2 pasos
+        tokens, reads = self.transitions("a" * 2000)
+        self.assertEqual(tokens, [("A", "a")] * 2000)
+        _, double = self.transitions("a" * 4000)
+        self.assertLess(double, 2.1 * reads)
+        self.assertLess(reads, 8 * 2000)
+
+    def test_same_tokens_in_every_scanner(self):
+        text = "aaab" + "a" * 50 + "b" + "a" * 7
+        expected = [("AB", "aaab"), ("AB", "a" * 50 + "b")] + [("A", "a")] * 7
+        self.assertEqual(scan_tokens(self.dfa, text), expected)
+        self.assertEqual(list(scan_offsets(self.dfa, text, self.token_names)), expected)
+        for chunk_size in (1, 5, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_tokens(self.dfa, io.StringIO(text), chunk_size)), expected)
+        spans = scan_spans(self.dfa, text.encode("ascii"))
+        self.assertEqual([(kind, text[start:end]) for kind, start, end in spans], expected)
+
+    def test_unterminated_comment(self):
+        service, _ = build_lexer_dfa(
+            example_yal()["alternatives"]
+        )
+        # Sin la 'n' final ningún comentario acepta: cada apertura recorría
+        # el resto de la entrada
+        text = '"#" ' * 500
+        tokens = service.scan_input(text)
+        self.assertEqual(tokens[:4], [("ERROR", '"'), ("ERROR", "#"), ("ERROR", '"'), ("WHITESPACE", " ")])
+        self.assertEqual(len(tokens), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from lex_compiler.service import build_lexer_dfa
+from afd_compiler.services import parallel_scanner
+
+from tests import example_yal, example_input
+
+
+class ParallelScannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service, cls.token_names = build_lexer_dfa(example_yal()["alternatives"])
+        base = example_input()
+        # Comentarios largos y errores que cruzan las costuras entre trozos
+        cls.text = (base + '"#" ' + "comentario " * 40 + "n @@ " + '"#" sin cierre ') * 6
+
+    def assertSameStream(self, stream, expected):
+        self.assertEqual(list(stream.kinds), list(expected.kinds))
+        self.assertEqual(list(stream.starts), list(expected.starts))
+        self.assertEqual(list(stream.ends), list(expected.ends))
+        self.assertEqual(stream.names, expected.names)
+
+    def test_same_tokens_as_scan_offsets(self):
+        dfa = self.service.compiled()
+        for skip in (frozenset(), frozenset({"WHITESPACE", "COMMENT", "ERROR"})):
+            expected = self.service.scan_offsets(self.text, self.token_names, skip)
+            for chunks in (2, 7, 64):
+                with self.subTest(skip=sorted(skip), chunks=chunks), \
+                        mock.patch.object(parallel_scanner, "MIN_PARALLEL_SIZE", 0):
+                    stream = parallel_scanner.scan_parallel(
+                        dfa, self.text, self.token_names, skip, workers=2, chunks=chunks
+                    )
+                    self.assertSameStream(stream, expected)
+
+    def test_small_input_is_scanned_serially(self):
+        with mock.patch.object(parallel_scanner, "ProcessPoolExecutor") as pool:
+            stream = self.service.scan_parallel("if x >= 10", self.token_names, workers=4)
+        pool.assert_not_called()
+        self.assertEqual(list(stream), self.service.scan_input("if x >= 10"))
+
+
+if __name__ == "__main__":
+    unittest.main()
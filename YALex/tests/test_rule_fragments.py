@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from chain_compiler.tools.super_regex_builder import rule_patterns
+from chain_compiler.ast_service import generate_rules_ast
+from afd_compiler.models.fragment import RuleFragment
+from afd_compiler.services.dfa_builder import build_direct_dfa, build_from_fragments
+from lex_compiler import service
+from lex_compiler.cache import DFACache, FragmentCache, fragment_key
+from lex_compiler.service import build_lexer_dfa, compile_fragment, rule_fragments
+
+from tests import example_yal
+
+
+def keyword_rules(count):
+    rules = [(f'"kw{i}"', f"return KW{i}") for i in range(count)]
+    rules.append(("[a-z][a-z0-9]*", "return ID"))
+    rules.append(("[ ]+", "return WHITESPACE"))
+    return rules
+
+
+class RuleFragmentTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.rules = example_yal()["alternatives"]
+
+    def assert_same_as_ast(self, patterns, token_names):
+        by_ast = build_direct_dfa(generate_rules_ast(patterns), token_names)
+        by_fragments = build_from_fragments(
+            [compile_fragment(pattern) for pattern in patterns], token_names
+        )
+        self.assertEqual(by_fragments.compile().to_dict(), by_ast.compile().to_dict())
+
+    def test_assembly_matches_the_rules_ast(self):
+        self.assert_same_as_ast(*rule_patterns(self.rules))
+
+    def test_nullable_rules(self):
+        self.assert_same_as_ast(["a*", "(ab)?c", "[0-9]+"], ["AS", "ABC", "NUM"])
+
+    def test_round_trip(self):
+        fragment = compile_fragment("[a-z][a-z0-9]*|x+")
+        copy = RuleFragment.from_dict(fragment.to_dict())
+        self.assertEqual(copy.to_dict(), fragment.to_dict())
+        self.assertEqual(copy.first, fragment.first)
+        self.assertEqual(copy.symbols, fragment.symbols)
+
+    def test_edit_recompiles_one_fragment(self):
+        cache = FragmentCache()
+        rules = keyword_rules(500)
+        build_lexer_dfa(rules, fragments=cache)
+        self.assertEqual(len(cache), 502)
+
+        rules[250] = ('"renamed"', "return KW250")
+        with mock.patch.object(service, "compile_fragment", wraps=compile_fragment) as compile_:
+            edited, _ = build_lexer_dfa(rules, fragments=cache)
+        compile_.assert_called_once_with("renamed")
+        self.assertEqual(edited.match("renamed"), "KW250")
+        self.assertEqual(edited.match("kw250"), "ID")
+
+    def test_fragments_persist_in_the_disk_cache(self):
+        rules = keyword_rules(20)
+        with tempfile.TemporaryDirectory() as tmp:
+            build_lexer_dfa(rules, DFACache(tmp), FragmentCache())
+            self.assertEqual(len([name for name in os.listdir(tmp) if name.endswith(".frag")]), 22)
+
+            # Otro proceso: memoria vacía, mismos fragmentos en disco
+            rules[3] = ('"renamed"', "return KW3")
+            with mock.patch.object(service, "compile_fragment", wraps=compile_fragment) as compile_:
+                edited, _ = build_lexer_dfa(rules, DFACache(tmp), FragmentCache())
+            compile_.assert_called_once_with("renamed")
+            self.assertEqual(edited.match("renamed"), "KW3")
+            self.assertEqual(
+                DFACache(tmp).get_fragment(fragment_key("renamed")).to_dict(),
+                compile_fragment("renamed").to_dict(),
+            )
+
+    def test_fragment_cache_is_lru(self):
+        cache = FragmentCache(max_entries=2)
+        rule_fragments(["a", "b"], cache)
+        rule_fragments(["a", "c"], cache)
+        self.assertIsNotNone(cache.get(fragment_key("a")))
+        self.assertIsNone(cache.get(fragment_key("b")))
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
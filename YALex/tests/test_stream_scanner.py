@@ -0,0 +1,36 @@
+import io
+import unittest
+
+from lex_compiler.service import build_lexer_dfa
+
+from tests import example_yal, example_input
+
+
+class StreamScannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service, _ = build_lexer_dfa(example_yal()["alternatives"])
+        cls.text = example_input() + "\nvariable_muy_larga >= 12345 ñ <= 7"
+
+    def test_matches_whole_buffer_scan_for_any_chunk_size(self):
+        expected = self.service.scan_input(self.text)
+        for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                tokens = list(self.service.scan_stream(io.StringIO(self.text), chunk_size))
+                self.assertEqual(tokens, expected)
+
+    def test_binary_stream_is_decoded_incrementally(self):
+        expected = self.service.scan_input(self.text)
+        data = io.BytesIO(self.text.encode("utf-8"))
+        # chunk_size=1 parte la 'ñ' (2 bytes) entre dos lecturas
+        self.assertEqual(list(self.service.scan_stream(data, 1)), expected)
+
+    def test_tokens_are_yielded_lazily(self):
+        stream = io.StringIO("if x" + " " * 1000)
+        tokens = self.service.scan_stream(stream, 4)
+        self.assertEqual(next(tokens), ("IF", "if"))
+        self.assertLess(stream.tell(), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
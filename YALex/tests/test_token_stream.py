@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from array import array
+
+from lex_compiler.service import build_lexer_dfa, generate_lexer_py
+from afd_compiler.models.token_stream import TokenStream
+
+from tests import example_yal, example_input, load_module
+
+
+class TokenStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service, cls.token_names = build_lexer_dfa(example_yal()["alternatives"])
+        cls.text = example_input()
+
+    def test_same_tokens_as_scan_input(self):
+        stream = self.service.scan_offsets(self.text, self.token_names)
+        self.assertEqual(list(stream), self.service.scan_input(self.text))
+        self.assertEqual(len(stream), len(self.service.scan_input(self.text)))
+
+    def test_compact_arrays(self):
+        stream = self.service.scan_offsets("while x>=10", self.token_names)
+        self.assertIsInstance(stream.kinds, array)
+        self.assertEqual(stream.kinds.typecode, "H")
+        self.assertEqual(stream.starts.typecode, "I")
+        self.assertEqual(stream.names[: len(self.token_names)], self.token_names)
+        self.assertEqual(stream.names[-1], "ERROR")
+        self.assertEqual(stream[0], ("WHILE", "while"))
+        self.assertEqual(stream.kind(4), "NUMBER")
+        self.assertEqual(stream.span(4), (9, 11))
+        self.assertEqual(stream.lexeme(2), "x")
+
+    def test_line_and_column(self):
+        text = "if x\n  while y\n\nz"
+        stream = self.service.scan_offsets(text)
+        locations = {
+            stream.lexeme(i): stream.location(i)
+            for i in range(len(stream)) if stream.kind(i) == "ID" or stream.kind(i) == "WHILE"
+        }
+        self.assertEqual(locations, {"x": (1, 4), "while": (2, 3), "y": (2, 9), "z": (4, 1)})
+        self.assertEqual(list(stream.line_starts()), [0, 5, 15, 16])
+
+    def test_skip_inside_scanner(self):
+        skip = {"WHITESPACE", "COMMENT"}
+        stream = self.service.scan_offsets(self.text, self.token_names, skip)
+        expected = [t for t in self.service.scan_input(self.text) if t[0] not in skip]
+        self.assertEqual(list(stream), expected)
+        self.assertEqual(self.service.scan_input(self.text, skip), expected)
+
+    def test_empty_stream(self):
+        stream = TokenStream("", ["A"])
+        self.assertEqual(len(stream), 0)
+        self.assertEqual(stream.position(0), (1, 1))
+
+    def test_generated_entrypoint_offsets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "lexer_offsets.py")
+            generate_lexer_py(example_yal(), out)
+            lexer = load_module(out)
+        stream = lexer.entrypoint_offsets("if x >= 10 @")
+        self.assertEqual([stream.kind(i) for i in range(len(stream))],
+                         ["IF", "ID", "GREATEREQ", "NUMBER", "ERROR"])
+        self.assertEqual(stream.lexeme(3), "10")
+        everything = lexer.entrypoint_offsets("if x", skip=())
+        self.assertEqual(list(everything), [("IF", "if"), ("WHITESPACE", " "), ("ID", "x")])
+
+
+if __name__ == "__main__":
+    unittest.main()
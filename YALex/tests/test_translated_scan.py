@@ -0,0 +1,62 @@
+import unittest
+
+from afd_compiler.models.compiled_dfa import NO_CLASS
+from afd_compiler.services.scanner import LexerError, scan_tokens
+from afd_compiler.services.translated_scanner import scan_translated
+from lex_compiler.service import build_lexer_dfa
+
+from tests import example_yal, example_input
+
+
+class TranslatedScanTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.rules = example_yal()["alternatives"]
+        cls.service, _ = build_lexer_dfa(cls.rules)
+        base = example_input()
+        cls.ascii = base + " @@ x1 " + '"#" sin cierre ' + "\x00 despues"
+        cls.text = base + ' ñandú 🙂 "#" ñ n @@ x1 "#" sin cierre'
+
+    def test_class_codes(self):
+        dfa = self.service.compiled()
+        text = "if ñ\n"
+        codes = dfa.class_codes(text)
+        self.assertEqual(len(codes), len(text))
+        self.assertEqual(codes[0], dfa.class_of("i"))
+        self.assertEqual(codes[3], dfa.class_of("ñ"))
+        # '\n' no está en el alfabeto de ejemplo3
+        self.assertEqual(codes[4], NO_CLASS)
+        self.assertEqual(dfa.class_codes("if x"), bytes(dfa.class_of(c) for c in "if x"))
+
+    def test_same_tokens_as_scan_tokens(self):
+        dfa = self.service.compiled()
+        for text in (self.ascii, self.text):
+            for skip in (frozenset(), frozenset({"WHITESPACE", "ERROR"})):
+                for coalesce in (False, True):
+                    with self.subTest(ascii=text.isascii(), skip=sorted(skip), coalesce=coalesce):
+                        self.assertEqual(
+                            scan_translated(dfa, text, skip, coalesce),
+                            scan_tokens(dfa, text, skip, coalesce),
+                        )
+
+    def test_keyword_mode(self):
+        service, _ = build_lexer_dfa(self.rules, keywords=True)
+        self.assertEqual(service.scan_translated(self.text), self.service.scan_input(self.text))
+
+    def test_max_errors(self):
+        with self.assertRaises(LexerError) as ctx:
+            self.service.scan_translated("x @ y @ z", max_errors=2)
+        self.assertEqual(ctx.exception.offset, 6)
+
+    def test_too_many_classes_falls_back(self):
+        rules = [(f"'{chr(0x100 + i)}'", f"return C{i}") for i in range(300)]
+        service, _ = build_lexer_dfa(rules)
+        dfa = service.compiled()
+        self.assertGreaterEqual(dfa.num_classes, NO_CLASS)
+        self.assertIsNone(dfa.class_codes("ā"))
+        text = "".join(chr(0x100 + i) for i in range(0, 300, 7)) + "?"
+        self.assertEqual(service.scan_translated(text), service.scan_input(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -81,7 +81,8 @@ class CompilerPipeline:
             result = subprocess.run(
                 [sys.executable, "-m", "YALex.app", 
                  "--yal", self.yal_file, 
-                 "--out", self.lexer_output],
+                 "--out", self.lexer_output,
+                 "--grammar", self.yalp_file],
                 capture_output=True,
                 text=True
             )